@@ -0,0 +1,216 @@
+# --------------------------------------------------
+# Arithmetic Expression Engine (restricted AST, compiled + vectorized)
+# --------------------------------------------------
+
+import ast
+import math
+import operator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional, FrozenSet
+
+import numpy as np
+
+
+MAX_EXPRESSION_LENGTH = 500
+MAX_NODES = 200
+MAX_INT_BITS = 4096       # ~1,200 decimal digits per integer operand / result
+
+ALLOWED_NODES = (
+    ast.Expression,
+    ast.BinOp, ast.UnaryOp, ast.Call,
+    ast.Constant, ast.Name, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+)
+
+POW_NAME = "__pow__"
+
+
+# --------------------------------------------------
+# Bounded operations
+# --------------------------------------------------
+def _check_int(value: Any) -> Any:
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise OverflowError(f"integer exceeds {MAX_INT_BITS} bits")
+    return value
+
+
+def _bounded_pow(base: Any, exponent: Any) -> Any:
+    """
+    ** without the blowups: an integer result may not exceed
+    MAX_INT_BITS, decided BEFORE computing it (9**9**9 fails fast).
+    """
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        if abs(base) > 1 and exponent * (abs(base).bit_length() - 1) > MAX_INT_BITS:
+            raise OverflowError(f"result exceeds {MAX_INT_BITS} bits")
+    return _check_int(operator.pow(base, exponent))
+
+
+def _vector_pow(base, exponent):
+    return np.power(np.asarray(base, dtype=float), exponent)
+
+
+SCALAR_NAMESPACE = {
+    "pi": math.pi,
+    "e": math.e,
+    "tau": math.tau,
+    "sqrt": math.sqrt,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "log": math.log,
+    "log10": math.log10,
+    "exp": math.exp,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+    "pow": _bounded_pow,
+    POW_NAME: _bounded_pow,
+}
+
+VECTOR_NAMESPACE = {
+    "pi": math.pi,
+    "e": math.e,
+    "tau": math.tau,
+    "sqrt": np.sqrt,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "log": np.log,
+    "log10": np.log10,
+    "exp": np.exp,
+    "floor": np.floor,
+    "ceil": np.ceil,
+    "abs": np.abs,
+    "round": np.round,
+    "min": np.minimum,
+    "max": np.maximum,
+    "pow": _vector_pow,
+    POW_NAME: _vector_pow,
+}
+
+FUNCTIONS = frozenset(
+    name for name, value in SCALAR_NAMESPACE.items()
+    if callable(value) and name != POW_NAME
+)
+CONSTANTS = frozenset(SCALAR_NAMESPACE) - FUNCTIONS - {POW_NAME}
+
+
+# --------------------------------------------------
+# Parsing + validation
+# --------------------------------------------------
+class _PowToCall(ast.NodeTransformer):
+    """a ** b → __pow__(a, b) so every power is bounded."""
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return ast.copy_location(
+                ast.Call(
+                    func=ast.Name(id=POW_NAME, ctx=ast.Load()),
+                    args=[node.left, node.right],
+                    keywords=[]
+                ),
+                node
+            )
+        return node
+
+
+def _parse(expression: str) -> ast.Expression:
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+
+    tree = ast.parse(expression.strip(), mode="eval")
+
+    nodes = list(ast.walk(tree))
+    if len(nodes) > MAX_NODES:
+        raise ValueError(f"Expression has more than {MAX_NODES} nodes")
+
+    for node in nodes:
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise ValueError(f"Unsupported constant: {node.value!r}")
+            _check_int(node.value)
+
+        if isinstance(node, ast.Call):
+            if (
+                not isinstance(node.func, ast.Name)
+                or node.func.id not in FUNCTIONS
+                or node.keywords
+            ):
+                raise ValueError(f"Unsupported function call: {ast.unparse(node.func)}")
+
+        if isinstance(node, ast.Name) and node.id.startswith("__"):
+            raise ValueError(f"Unsupported name: {node.id}")
+
+    return tree
+
+
+# --------------------------------------------------
+# Compiled expression (one per distinct source)
+# --------------------------------------------------
+@dataclass(frozen=True)
+class CompiledExpression:
+    """
+    A validated expression compiled once to a code object.
+
+    variables are the free names (not constants / functions);
+    evaluate() binds them to scalars, evaluate_many() to arrays.
+    """
+    source: str
+    code: Any
+    variables: FrozenSet[str]
+
+    def evaluate(self, variables: Optional[Dict[str, Any]] = None) -> Any:
+        namespace = {"__builtins__": {}, **SCALAR_NAMESPACE}
+        result = eval(self.code, namespace, dict(variables or {}))
+        return _check_int(result)
+
+    def evaluate_many(self, variables: Dict[str, Any]) -> np.ndarray:
+        """
+        One pass over whole input columns (NumPy broadcasting).
+        Float semantics: overflow → inf, x/0 → inf/nan.
+        """
+        arrays = {
+            name: np.asarray(values, dtype=float)
+            for name, values in variables.items()
+        }
+        namespace = {"__builtins__": {}, **VECTOR_NAMESPACE}
+
+        with np.errstate(all="ignore"):
+            result = eval(self.code, namespace, arrays)
+
+        size = max((a.size for a in arrays.values()), default=1)
+        return np.broadcast_to(np.asarray(result, dtype=float), (size,)).copy()
+
+
+@lru_cache(maxsize=4096)
+def compile_expression(expression: str) -> CompiledExpression:
+    tree = _parse(expression)
+
+    variables = frozenset(
+        node.id for node in ast.walk(tree)
+        if isinstance(node, ast.Name)
+        and node.id not in FUNCTIONS
+        and node.id not in CONSTANTS
+    )
+
+    tree = ast.fix_missing_locations(_PowToCall().visit(tree))
+    code = compile(tree, "<expression>", "eval")
+
+    return CompiledExpression(expression, code, variables)
+
+
+def evaluate(expression: str, variables: Optional[Dict[str, Any]] = None) -> Any:
+    return compile_expression(expression).evaluate(variables)
+
+
+def evaluate_many(expression: str, variables: Dict[str, Any]) -> np.ndarray:
+    return compile_expression(expression).evaluate_many(variables)
@@ -1,13 +1,31 @@
 import re
 import math
 
+import numpy as np
+
+from agents.expression_engine import evaluate, evaluate_many
+
+
 def calculator(expression: str) -> str:
     try:
-        return str(eval(expression))
+        return str(evaluate(expression))
     except Exception:
         return "error"
 
 
+def calculator_many(expression: str, **inputs) -> list:
+    """
+    calculator() for one expression over columns of inputs,
+    e.g. calculator_many("pi * r ** 2", r=[1, 2, 3]).
+    """
+    try:
+        results = evaluate_many(expression, inputs)
+    except Exception:
+        return ["error"] * max((len(v) for v in inputs.values()), default=1)
+
+    return [str(float(x)) if np.isfinite(x) else "error" for x in results]
+
+
 def needs_calculator(prompt: str) -> bool:
     # Heuristics — you can improve later
     if any(k in prompt.lower() for k in ["area", "volume", "surface", "sqrt", "^", "π", "pi"]):
@@ -0,0 +1,105 @@
+# --------------------------------------------------
+# Benchmark: GraphiteAdapter.index_dataset scaling
+# --------------------------------------------------
+#
+# python -m benchmarks.bench_graph_indexing
+# python -m benchmarks.bench_graph_indexing --rtt-ms 0.5
+# python -m benchmarks.bench_graph_indexing --live   (needs Neo4j)
+
+import argparse
+import time
+
+from benchmarks.fakes import RecordingDriver
+from retrieval.graphite_adapter import GraphiteAdapter
+
+
+CAPABILITIES = ["arithmetic", "algebra", "geometry", "approximation", "error_handling"]
+
+
+def make_rows(n: int):
+    return [
+        {
+            "input_prompt": f"What is {i} + {i}?",
+            "expected_output": str(2 * i),
+            "expected_tools": ["calculator"] if i % 2 else [],
+            "difficulty": ("easy", "medium", "hard")[i % 3],
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_round_trips(rows, capabilities) -> int:
+    """
+    One auto-commit session.run per core block, capability,
+    row and row-tool pair (the pre-UNWIND implementation).
+    """
+    return (
+        1 +
+        len(capabilities) +
+        len(rows) +
+        sum(len(r.get("expected_tools", [])) for r in rows)
+    )
+
+
+def run(sizes, rtt_ms: float, live: bool):
+    print(
+        f"{'rows':>8} {'legacy_rt':>10} {'unwind_rt':>10} "
+        f"{'statements':>10} {'wall_ms':>10}"
+    )
+
+    for n in sizes:
+        rows = make_rows(n)
+
+        if live:
+            adapter = GraphiteAdapter()
+            recorder = None
+        else:
+            recorder = RecordingDriver(rtt_ms=rtt_ms)
+            adapter = GraphiteAdapter(driver=recorder)
+
+        dataset_id = f"bench-graph-{n}"
+
+        # One-off schema bootstrap is not part of the measurement
+        adapter.ensure_schema()
+        if recorder is not None:
+            recorder.reset()
+
+        start = time.perf_counter()
+        adapter.index_dataset(
+            dataset_id=dataset_id,
+            agent_type="bench",
+            domain="math",
+            intent="benchmark",
+            rows=rows,
+            capabilities=CAPABILITIES
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        if live:
+            with adapter.driver.session() as session:
+                session.run(
+                    "MATCH (n) WHERE n.id = $id OR n.dataset_id = $id "
+                    "DETACH DELETE n",
+                    id=dataset_id
+                )
+            round_trips = statements = "-"
+        else:
+            round_trips = recorder.round_trips
+            statements = len(recorder.queries)
+
+        adapter.close()
+
+        print(
+            f"{n:>8} {legacy_round_trips(rows, CAPABILITIES):>10} "
+            f"{round_trips:>10} {statements:>10} {wall_ms:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    run(args.sizes, args.rtt_ms, args.live)
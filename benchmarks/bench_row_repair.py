@@ -0,0 +1,114 @@
+# --------------------------------------------------
+# Benchmark: row repair vs full regeneration
+# --------------------------------------------------
+#
+# Generates datasets against FakeOllamaServer with bad rows
+# injected (expected_output removed) and compares the cost
+# per accepted dataset.
+#
+# python -m benchmarks.bench_row_repair
+# python -m benchmarks.bench_row_repair --bad-row-rates 0.05 0.1 0.2 --trials 50
+
+import argparse
+import contextlib
+import io
+import time
+
+import llm.dataset_author as dataset_author
+from llm.ollama_client import OllamaClient
+from llm.prompt_builder import PromptBuilder
+from inputs.gravity_rules import GRAVITY_RULES
+from inputs.internet_guidelines import INTERNET_GUIDELINES
+from inputs.domain_expertise import DOMAIN_EXPERTISE
+
+from benchmarks.fakes import FakeOllamaServer
+
+
+# --------------------------------------------------
+# Reference: regenerate the whole dataset on any bad row
+# --------------------------------------------------
+def full_retry(prompt, row_count: int) -> None:
+    for attempt in range(1, dataset_author.MAX_ATTEMPTS + 1):
+        header, accepted, rejected, error = dataset_author._complete(prompt, refresh=attempt > 1)
+        missing = [key for key in dataset_author.HEADER_KEYS if key not in header]
+
+        if error is None and not rejected and not missing and len(accepted) >= row_count:
+            return
+
+    raise RuntimeError(f"Failed to generate valid dataset after {dataset_author.MAX_ATTEMPTS} attempts")
+
+
+def row_repair(prompt, row_count: int) -> None:
+    dataset_author._generate_with_retries(prompt, min_rows=row_count)
+
+
+STRATEGIES = {
+    "full retry": full_retry,
+    "row repair": row_repair,
+}
+
+
+def run(strategy, bad_row_rate: float, args) -> dict:
+    with FakeOllamaServer(
+        args.latency_ms,
+        args.per_row_ms,
+        bad_row_rate=bad_row_rate,
+        seed=args.seed
+    ) as ollama:
+        # Fresh client per run: no response cache shared between strategies
+        dataset_author.llm = OllamaClient(model="benchmark", base_url=ollama.base_url)
+        builder = PromptBuilder(
+            dataset_author._prompt_prefix(GRAVITY_RULES, INTERNET_GUIDELINES, DOMAIN_EXPERTISE)
+        )
+
+        accepted = 0
+        start = time.perf_counter()
+
+        for trial in range(args.trials):
+            prompt = dataset_author._build_prompt(
+                builder, [], f"benchmark trial {trial}", row_count=args.rows
+            )
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    strategy(prompt, args.rows)
+                accepted += 1
+            except RuntimeError:
+                pass
+
+        elapsed = time.perf_counter() - start
+        dataset_author.llm.close()
+
+    per = max(accepted, 1)
+    return {
+        "accepted": accepted,
+        "llm_calls": ollama.requests,
+        "bad_rows": ollama.bad_rows,
+        "chars_per_accepted": (ollama.prompt_chars + ollama.completion_chars) // per,
+        "seconds_per_accepted": round(elapsed / per, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bad-row-rates", type=float, nargs="+", default=[0.05, 0.1])
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--per-row-ms", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.rows}-row datasets, {args.trials} trials\n")
+    print(f"{'bad rows':>8}  {'strategy':<10}  {'accepted':>8}  {'calls':>5}  "
+          f"{'chars/accepted':>14}  {'s/accepted':>10}")
+
+    for rate in args.bad_row_rates:
+        for name, strategy in STRATEGIES.items():
+            r = run(strategy, rate, args)
+            print(f"{rate:>8.0%}  {name:<10}  {r['accepted']:>5}/{args.trials:<2}  "
+                  f"{r['llm_calls']:>5}  {r['chars_per_accepted']:>14,}  "
+                  f"{r['seconds_per_accepted']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# --------------------------------------------------
+# Benchmark: lookup plans before / after migration 7
+# --------------------------------------------------
+#
+# Seeds an embedded Postgres at schema version 6, runs EXPLAIN
+# ANALYZE on the hot lookups, applies the lookup-index migration
+# and runs them again.
+#
+# python -m benchmarks.bench_schema_indexes
+# python -m benchmarks.bench_schema_indexes --datasets 200000 --runs 20000
+
+import argparse
+import json
+
+from benchmarks.fakes import embedded_postgres
+from memory.supabase_client import get_connection
+from scripts.migrate import migrate
+
+
+QUERIES = {
+    # Before migration 7 there is no agent_type column yet
+    "dataset_summaries": (
+        "SELECT id, created_at FROM datasets "
+        "WHERE payload->>'agent_type' = 'agent_7' ORDER BY created_at DESC LIMIT 10",
+        "SELECT id, created_at FROM datasets "
+        "WHERE agent_type = 'agent_7' ORDER BY created_at DESC LIMIT 10",
+    ),
+    "latest_run": (
+        "SELECT id FROM evaluation_runs WHERE dataset_name = 'dataset_7' "
+        "AND agent_type = 'agent_7' AND score IS NOT NULL "
+        "ORDER BY created_at DESC, id DESC LIMIT 1",
+    ) * 2,
+    "runs_by_agent": (
+        "SELECT id, score FROM evaluation_runs WHERE agent_type = 'agent_7' "
+        "ORDER BY created_at DESC LIMIT 20",
+    ) * 2,
+    "rows_of_run": (
+        "SELECT row_index, passed FROM evaluation_rows WHERE run_id = 1234 ORDER BY row_index",
+    ) * 2,
+}
+
+
+def seed(cur, datasets: int, runs: int, rows_per_run: int):
+    cur.execute(
+        """
+        INSERT INTO datasets (id, payload, created_at)
+        SELECT
+            'dataset_' || g,
+            jsonb_build_object('agent_type', 'agent_' || (g %% 50), 'rows', '[]'::jsonb),
+            now() - g * interval '1 second'
+        FROM generate_series(1, %s) g
+        """,
+        (datasets,)
+    )
+    cur.execute(
+        """
+        INSERT INTO evaluation_runs (dataset_name, agent_type, score, passed, created_at)
+        SELECT 'dataset_' || (g %% 1000), 'agent_' || (g %% 50), random(), random() > 0.5,
+               now() - g * interval '1 second'
+        FROM generate_series(1, %s) g
+        """,
+        (runs,)
+    )
+    cur.execute(
+        """
+        INSERT INTO evaluation_rows (run_id, row_index, prompt, expected_output, actual_output, passed)
+        SELECT e.id, i, 'p', 'x', 'y', i %% 2 = 0
+        FROM evaluation_runs e, generate_series(0, %s - 1) i
+        """,
+        (rows_per_run,)
+    )
+    cur.execute("ANALYZE")
+
+
+def explain(cur, query: str) -> dict:
+    cur.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query)
+    plan = cur.fetchone()[0][0]
+
+    nodes = []
+
+    def walk(node):
+        label = node["Node Type"]
+        if "Index Name" in node:
+            label += f" ({node['Index Name']})"
+        elif "Relation Name" in node:
+            label += f" ({node['Relation Name']})"
+        nodes.append(label)
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return {"ms": plan["Execution Time"], "plan": " > ".join(nodes)}
+
+
+def run_queries(cur, phase: int) -> dict:
+    results = {}
+    for name, variants in QUERIES.items():
+        explain(cur, variants[phase])  # warm cache
+        results[name] = explain(cur, variants[phase])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--datasets", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=10_000)
+    parser.add_argument("--rows-per-run", type=int, default=100)
+    parser.add_argument("--json", action="store_true", help="print raw JSON results")
+    args = parser.parse_args()
+
+    with embedded_postgres():
+        migrate(target=6, verbose=False)
+
+        conn = get_connection()
+        conn.autocommit = True
+        cur = conn.cursor()
+
+        print(f"Seeding {args.datasets:,} datasets, {args.runs:,} runs x {args.rows_per_run} rows...")
+        seed(cur, args.datasets, args.runs, args.rows_per_run)
+
+        before = run_queries(cur, 0)
+        migrate(verbose=False)
+        cur.execute("ANALYZE")
+        after = run_queries(cur, 1)
+
+        cur.close()
+        conn.close()
+
+    if args.json:
+        print(json.dumps({"before": before, "after": after}, indent=2))
+        return
+
+    for name in QUERIES:
+        b, a = before[name], after[name]
+        print(f"\n{name}: {b['ms']:.2f} ms → {a['ms']:.2f} ms")
+        print(f"  before: {b['plan']}")
+        print(f"  after : {a['plan']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# --------------------------------------------------
+# Microbenchmark: response scoring on 1M rows
+# --------------------------------------------------
+#
+# python -m benchmarks.bench_scorer
+# python -m benchmarks.bench_scorer --rows 100000
+
+import argparse
+import random
+import re
+import time
+
+import numpy as np
+
+from evaluation.scorer import ScoringPlan, compile_expected
+
+
+# --------------------------------------------------
+# Reference: the original per-row is_correct
+# --------------------------------------------------
+def _legacy_extract_number(text):
+    if not text:
+        return None
+    match = re.search(r"-?\d+(\.\d+)?", text)
+    return float(match.group()) if match else None
+
+
+def legacy_is_correct(expected, actual, tolerance=0.3):
+    if not actual:
+        return False
+
+    exp = str(expected).strip().lower()
+    act = str(actual).strip().lower()
+
+    if exp == act or exp in act or act in exp:
+        return True
+
+    exp_num = _legacy_extract_number(exp)
+    act_num = _legacy_extract_number(act)
+    if exp_num is not None and act_num is not None:
+        if abs(exp_num - act_num) <= tolerance:
+            return True
+
+    if "approx" in exp and exp_num is not None and act_num is not None:
+        return True
+
+    return False
+
+
+# --------------------------------------------------
+# Synthetic workload
+# ~20 distinct expected outputs; half of the actual outputs
+# are unique free-form numeric answers
+# --------------------------------------------------
+EXPECTED = [
+    "5", "3", "50.27", "approximately 3.14", "Error: insufficient information",
+    "Error: conflicting constraints", "12 square meters", "-4", "0.5", "x = 2",
+    "The answer is 42", "approx 2.718", "100", "7.07", "Error: division by zero",
+    "1/3", "9", "314.16", "2.5 hours", "none",
+]
+
+ACTUAL = [
+    "5", "The result is 3", "50.265", "3.1", "Error: insufficient information",
+    "error", "12", "4", "0.49", "", None, "unsupported query", "42.0",
+    "2.71", "99.8", "7", "Error: division by zero", "0.33", "8", "314.159",
+]
+
+
+def make_workload(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    expected = [rng.choice(EXPECTED) for _ in range(n)]
+    actual = [
+        rng.choice(ACTUAL) if rng.random() < 0.5
+        else f"The answer is {rng.uniform(-10, 400):.{rng.randint(0, 4)}f}"
+        for _ in range(n)
+    ]
+    return expected, actual
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(n: int, tolerance: float):
+    expected, actual = make_workload(n)
+
+    legacy, t_legacy = timed(
+        lambda: [legacy_is_correct(e, a, tolerance) for e, a in zip(expected, actual)]
+    )
+    per_row, t_per_row = timed(
+        lambda: [compile_expected(e).matches(a, tolerance) for e, a in zip(expected, actual)]
+    )
+    plan, t_compile = timed(lambda: ScoringPlan(expected, tolerance))
+    batch, t_batch = timed(lambda: plan.score(actual))
+
+    legacy = np.array(legacy)
+    assert (legacy == np.array(per_row)).all(), "per-row matcher diverged"
+    assert (legacy == batch).all(), "batch plan diverged"
+
+    print(f"rows: {n:,}  pass rate: {legacy.mean():.3f}")
+    print(f"{'legacy is_correct loop':<28} {t_legacy:8.3f}s")
+    print(f"{'compiled matcher per row':<28} {t_per_row:8.3f}s")
+    print(f"{'plan compile':<28} {t_compile:8.3f}s")
+    print(f"{'plan batch score':<28} {t_batch:8.3f}s")
+    print(f"{'speedup (compile + batch)':<28} {t_legacy / (t_compile + t_batch):7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    args = parser.parse_args()
+
+    run(args.rows, args.tolerance)
@@ -0,0 +1,364 @@
+# --------------------------------------------------
+# Local stand-ins for external services (benchmarks only)
+# --------------------------------------------------
+
+import itertools
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Any
+
+
+# --------------------------------------------------
+# Recording Neo4j driver
+# --------------------------------------------------
+class RecordingResult:
+    def __init__(self, records: List[Dict] = None):
+        self._records = records or []
+
+    def consume(self):
+        return None
+
+    def single(self):
+        return self._records[0] if self._records else None
+
+    def data(self):
+        return list(self._records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+
+class RecordingTransaction:
+    def __init__(self, driver: "RecordingDriver"):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def commit(self):
+        self.driver._round_trip()
+
+    def run(self, query: str, parameters: Dict = None, **params) -> RecordingResult:
+        return self.driver._record(query, {**(parameters or {}), **params})
+
+
+class RecordingSession:
+    def __init__(self, driver: "RecordingDriver"):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run(self, query: str, parameters: Dict = None, **params) -> RecordingResult:
+        # Auto-commit: statement + implicit commit in one round trip
+        return self.driver._record(query, {**(parameters or {}), **params})
+
+    def _transaction(self, work, *args, **kwargs):
+        self.driver.transactions += 1
+        result = work(RecordingTransaction(self.driver), *args, **kwargs)
+        self.driver._round_trip()  # COMMIT
+        return result
+
+    execute_write = _transaction
+    execute_read = _transaction
+
+    def begin_transaction(self) -> RecordingTransaction:
+        self.driver.transactions += 1
+        return RecordingTransaction(self.driver)
+
+    def close(self):
+        pass
+
+
+class RecordingDriver:
+    """
+    Stand-in for neo4j.Driver that records every statement
+    and counts Bolt round trips. rtt_ms simulates network
+    latency per round trip.
+    """
+
+    def __init__(self, rtt_ms: float = 0.0, responder=None):
+        self.rtt_ms = rtt_ms
+        self.responder = responder
+        self.queries: List[Dict[str, Any]] = []
+        self.round_trips = 0
+        self.transactions = 0
+
+    def session(self, **kwargs) -> RecordingSession:
+        return RecordingSession(self)
+
+    def _round_trip(self):
+        self.round_trips += 1
+        if self.rtt_ms:
+            time.sleep(self.rtt_ms / 1000)
+
+    def _record(self, query: str, params: Dict) -> RecordingResult:
+        self.queries.append({"query": query, "params": params})
+        self._round_trip()
+        records = self.responder(query, params) if self.responder else []
+        return RecordingResult(records)
+
+    def reset(self):
+        self.queries.clear()
+        self.round_trips = 0
+        self.transactions = 0
+
+    def close(self):
+        pass
+
+
+# --------------------------------------------------
+# Fake Ollama HTTP server
+# --------------------------------------------------
+ROW_COUNT_PATTERN = re.compile(r"EXACTLY (\d+) rows")
+
+FAKE_ROW_TEMPLATES = [
+    ("What is {a} + {b}?", lambda a, b: str(a + b), [], "easy"),
+    ("Solve 2x + 5 = 11 (case {a}-{b})", lambda a, b: "3", ["calculator"], "medium"),
+    ("What is the area of a circle with radius 4? (case {a}-{b})",
+     lambda a, b: "50.27", ["calculator"], "medium"),
+    ("Solve x + y = {a} (case {b})",
+     lambda a, b: "Error: insufficient information", [], "hard"),
+]
+
+
+def fake_dataset(row_count: int, seed: int) -> dict:
+    rows = []
+    for i in range(row_count):
+        template, answer, tools, difficulty = FAKE_ROW_TEMPLATES[i % len(FAKE_ROW_TEMPLATES)]
+        a, b = seed, i
+        rows.append({
+            "input_prompt": template.format(a=a, b=b),
+            "expected_output": answer(a, b),
+            "expected_tools": list(tools),
+            "difficulty": difficulty,
+        })
+
+    return {
+        "dataset_name": "Benchmark Dataset",
+        "intent": "benchmark",
+        "agent_type": "mathematical",
+        "rows": rows,
+        "evaluation_rules": {
+            "min_score": 0.7,
+            "tool_accuracy_weight": 0.5,
+            "response_accuracy_weight": 0.5,
+        },
+    }
+
+
+class FakeOllamaServer:
+    """
+    Local HTTP stand-in for Ollama's /api/chat.
+
+    Replies with a valid dataset containing the number of rows
+    the prompt asks for ("EXACTLY N rows") after latency_ms
+    plus per_row_ms * N, to mimic generation time.
+
+    "stream": true requests get NDJSON chunks of chunk_chars
+    characters, with the per-row time spread across them.
+
+    Like Ollama's single-slot KV cache, prompt_eval_count only
+    counts the prompt past the longest common prefix with the
+    previous request (~4 chars per token); prompt_tokens /
+    evaluated_tokens sum them over all requests, prompt_chars /
+    completion_chars the raw text sent and generated.
+
+    Fault injection: each generated row loses its
+    expected_output with probability bad_row_rate (seeded, so
+    runs are reproducible); bad_rows counts them.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        per_row_ms: float = 0.0,
+        chunk_chars: int = 16,
+        bad_row_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.per_row_ms = per_row_ms
+        self.chunk_chars = chunk_chars
+        self.bad_row_rate = bad_row_rate
+        self.requests = 0
+        self.cancelled = 0
+        self.bad_rows = 0
+        self.prompt_tokens = 0
+        self.evaluated_tokens = 0
+        self.prompt_chars = 0
+        self.completion_chars = 0
+        self._rng = random.Random(seed)
+        self._counter = itertools.count()
+        self._last_prompt = ""
+        self._kv_lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    pass  # client dropped an idle keep-alive connection
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+                if body.get("stream"):
+                    self._stream(body)
+                    return
+
+                content, delay = server._respond(body["messages"][-1]["content"])
+                evaluated = server._prompt_eval(body["messages"])
+                time.sleep(delay)
+                out = json.dumps({
+                    "model": body.get("model"),
+                    "message": {"role": "assistant", "content": content},
+                    "done": True,
+                    "prompt_eval_count": evaluated,
+                }).encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def _stream(self, body):
+                content, delay = server._respond(body["messages"][-1]["content"])
+                evaluated = server._prompt_eval(body["messages"])
+                pieces = [
+                    content[i:i + server.chunk_chars]
+                    for i in range(0, len(content), server.chunk_chars)
+                ]
+
+                time.sleep(server.latency_ms / 1000)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                per_piece = (delay - server.latency_ms / 1000) / max(len(pieces), 1)
+                try:
+                    for piece in pieces + [None]:
+                        message = {
+                            "model": body.get("model"),
+                            "message": {"role": "assistant", "content": piece or ""},
+                            "done": piece is None,
+                        }
+                        if piece is None:
+                            message["prompt_eval_count"] = evaluated
+                        line = json.dumps(message).encode() + b"\n"
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                        if piece is not None and per_piece > 0:
+                            time.sleep(per_piece)
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    server.cancelled += 1  # client stopped reading early
+                    self.close_connection = True
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def _prompt_eval(self, messages: List[Dict[str, Any]]) -> int:
+        prompt = "".join(f"<{m['role']}>{m['content']}" for m in messages)
+
+        with self._kv_lock:
+            shared = len(os.path.commonprefix([prompt, self._last_prompt]))
+            self._last_prompt = prompt
+            evaluated = -(-(len(prompt) - shared) // 4)
+            self.prompt_tokens += -(-len(prompt) // 4)
+            self.prompt_chars += len(prompt)
+            self.evaluated_tokens += evaluated
+
+        return evaluated
+
+    def _respond(self, prompt: str):
+        """
+        (content, seconds the real model would have taken)
+        """
+        self.requests += 1
+        match = ROW_COUNT_PATTERN.search(prompt)
+        row_count = int(match.group(1)) if match else 10
+
+        dataset = fake_dataset(row_count, seed=next(self._counter))
+        with self._kv_lock:
+            for row in dataset["rows"]:
+                if self.bad_row_rate and self._rng.random() < self.bad_row_rate:
+                    del row["expected_output"]
+                    self.bad_rows += 1
+
+            content = json.dumps(dataset)
+            self.completion_chars += len(content)
+
+        delay = (self.latency_ms + self.per_row_ms * row_count) / 1000
+        return content, delay
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# --------------------------------------------------
+# Embedded Postgres (optional `pgserver` package)
+# --------------------------------------------------
+@contextmanager
+def embedded_postgres():
+    """
+    Start a throwaway Postgres in a temp dir and point the
+    memory package (SUPABASE_DB_* env vars) at it.
+    """
+    try:
+        import pgserver
+    except ImportError:
+        raise RuntimeError(
+            "Embedded Postgres needs `pip install pgserver`; "
+            "or point SUPABASE_DB_* at a scratch database and use --existing-db"
+        )
+
+    from memory.supabase_client import close_pool
+
+    pgdata = tempfile.mkdtemp(prefix="bench-pg-")
+    server = pgserver.get_server(pgdata, cleanup_mode="delete")
+
+    os.environ.update(
+        SUPABASE_DB_HOST=pgdata,
+        SUPABASE_DB_PORT="5432",
+        SUPABASE_DB_NAME="postgres",
+        SUPABASE_DB_USER="postgres",
+        SUPABASE_DB_PASSWORD="",
+    )
+
+    try:
+        yield server
+    finally:
+        close_pool()
+        server.cleanup()
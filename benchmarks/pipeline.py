@@ -0,0 +1,267 @@
+# --------------------------------------------------
+# Offline end-to-end pipeline benchmark
+# --------------------------------------------------
+#
+# Times every main.py stage against local stand-ins:
+# - Ollama  → benchmarks.fakes.FakeOllamaServer (HTTP, configurable latency)
+# - Postgres → embedded Postgres via `pgserver` (or --existing-db)
+# - Neo4j   → benchmarks.fakes.RecordingDriver
+#
+# python -m benchmarks.pipeline
+# python -m benchmarks.pipeline --sizes 10 1000 --llm-latency-ms 20
+# python -m benchmarks.pipeline --compare benchmarks/results/<old>.json
+
+import argparse
+import contextlib
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from inputs.gravity_rules import GRAVITY_RULES
+from inputs.internet_guidelines import INTERNET_GUIDELINES
+from inputs.domain_expertise import DOMAIN_EXPERTISE
+
+import llm.dataset_author as dataset_author
+from llm.ollama_client import OllamaClient
+from datasets.validator import validate_dataset
+
+from memory.dataset_memory_fetcher import fetch_dataset_summaries
+from memory.dataset_repository import save_dataset
+from memory.evaluation_repository import save_evaluation
+
+from agents.sample_math_agent import run_agent
+from evaluation.runner import evaluate
+import evaluation.evaluation_writer as evaluation_writer
+
+from deployment.gate import should_deploy
+from retrieval.graphite_adapter import GraphiteAdapter
+
+from benchmarks.fakes import FakeOllamaServer, RecordingDriver, embedded_postgres
+
+from scripts.migrate import migrate
+
+
+RESULTS_DIR = Path("benchmarks") / "results"
+
+STAGES = [
+    "history_fetch",
+    "generation",
+    "validation",
+    "save_dataset",
+    "graph_indexing",
+    "evaluation",
+    "persistence",
+]
+
+# --------------------------------------------------
+# Setup helpers
+# --------------------------------------------------
+def bootstrap_schema():
+    migrate(verbose=False)
+
+
+def scaled_gan_plan(rows: int) -> dict:
+    happy = rows * 4 // 9
+    edge = rows * 3 // 9
+    return {
+        "row_distribution": {
+            "happy": happy,
+            "edge": edge,
+            "adversarial": rows - happy - edge,
+        },
+        "edge_patterns": ["ambiguous arithmetic", "conflicting constraints"],
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+class StageTimer:
+    def __init__(self):
+        self.seconds = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = round(time.perf_counter() - start, 6)
+
+
+# --------------------------------------------------
+# One pipeline pass
+# --------------------------------------------------
+def run_pipeline(rows: int, ollama: FakeOllamaServer, args) -> dict:
+    timer = StageTimer()
+    driver = RecordingDriver(rtt_ms=args.neo4j_rtt_ms)
+    requests_before = ollama.requests
+
+    with timer.stage("history_fetch"):
+        history = fetch_dataset_summaries(DOMAIN_EXPERTISE["agent_type"])
+
+    with timer.stage("generation"):
+        if rows <= 10:
+            dataset = dataset_author.write_dataset(
+                gravity=GRAVITY_RULES,
+                internet=INTERNET_GUIDELINES,
+                domain=DOMAIN_EXPERTISE,
+                history=history,
+                gan_plan=scaled_gan_plan(rows)
+            )
+        else:
+            dataset, _ = dataset_author.write_dataset_sharded(
+                gravity=GRAVITY_RULES,
+                internet=INTERNET_GUIDELINES,
+                domain=DOMAIN_EXPERTISE,
+                history=history,
+                gan_plan=scaled_gan_plan(rows),
+                shard_size=args.shard_size,
+                max_workers=args.llm_workers
+            )
+
+    dataset["dataset_name"] = f"bench-{rows}-{uuid.uuid4().hex[:8]}"
+
+    with timer.stage("validation"):
+        validate_dataset(dataset)
+
+    with timer.stage("save_dataset"):
+        save_dataset(dataset)
+
+    with timer.stage("graph_indexing"):
+        GraphiteAdapter(driver=driver).index_dataset(
+            dataset_id=dataset["dataset_name"],
+            agent_type=DOMAIN_EXPERTISE["agent_type"],
+            domain=DOMAIN_EXPERTISE["domain"],
+            intent=dataset["intent"],
+            rows=dataset["rows"],
+            capabilities=DOMAIN_EXPERTISE.get("capabilities", [])
+        )
+
+    with timer.stage("evaluation"):
+        score, row_results = evaluate(run_agent, dataset, verbose=False)
+
+    with timer.stage("persistence"):
+        passed = should_deploy(score)
+        save_evaluation(
+            dataset_name=dataset["dataset_name"],
+            agent_type=DOMAIN_EXPERTISE["agent_type"],
+            score=score,
+            passed=passed,
+            row_results=row_results
+        )
+        evaluation_writer.save_evaluation_artifact(dataset, score, row_results)
+
+    return {
+        "rows": rows,
+        "generated_rows": len(dataset["rows"]),
+        "llm_requests": ollama.requests - requests_before,
+        "graph_round_trips": driver.round_trips,
+        "score": score,
+        "stages": timer.seconds,
+        "total_seconds": round(sum(timer.seconds.values()), 6),
+    }
+
+
+# --------------------------------------------------
+# Reporting
+# --------------------------------------------------
+def print_results(results: list, baseline: dict = None):
+    base = {}
+    if baseline:
+        base = {r["rows"]: r["stages"] for r in baseline["results"]}
+
+    header = f"{'stage':<16}" + "".join(f"{r['rows']:>22,}" for r in results)
+    print(header)
+    print("-" * len(header))
+
+    for stage in STAGES + ["total"]:
+        line = f"{stage:<16}"
+        for r in results:
+            seconds = r["total_seconds"] if stage == "total" else r["stages"][stage]
+            cell = f"{seconds:.3f}s"
+
+            old = base.get(r["rows"], {})
+            old_seconds = sum(old.values()) if stage == "total" else old.get(stage)
+            if old_seconds:
+                cell += f" ({seconds / old_seconds:.2f}x)"
+
+            line += f"{cell:>22}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--llm-per-row-ms", type=float, default=0.0)
+    parser.add_argument("--llm-workers", type=int, default=8)
+    parser.add_argument("--shard-size", type=int, default=50)
+    parser.add_argument("--neo4j-rtt-ms", type=float, default=0.0)
+    parser.add_argument("--existing-db", action="store_true",
+                        help="use the database from SUPABASE_DB_* instead of pgserver")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="previous results JSON to show ratios against")
+    args = parser.parse_args()
+
+    db = contextlib.nullcontext() if args.existing_db else embedded_postgres()
+
+    with db, FakeOllamaServer(args.llm_latency_ms, args.llm_per_row_ms) as ollama, \
+            tempfile.TemporaryDirectory() as artifact_dir:
+
+        # Point the pipeline at the stand-ins (no response cache)
+        dataset_author.llm = OllamaClient(
+            model="benchmark",
+            base_url=ollama.base_url,
+            pool_size=args.llm_workers,
+            max_concurrency=args.llm_workers
+        )
+        evaluation_writer.ARTIFACT_DIR = Path(artifact_dir)
+
+        bootstrap_schema()
+
+        results = []
+        for rows in args.sizes:
+            print(f"Running pipeline with {rows:,} rows...")
+            results.append(run_pipeline(rows, ollama, args))
+
+    report = {
+        "benchmark": "pipeline",
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "config": {
+            k: (str(v) if isinstance(v, Path) else v)
+            for k, v in vars(args).items()
+        },
+        "results": results,
+    }
+
+    output = args.output or RESULTS_DIR / (
+        f"pipeline_{report['commit']}_{datetime.utcnow():%Y%m%d_%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+
+    print()
+    print_results(results, baseline)
+    print(f"\nResults written → {output}")
+
+
+if __name__ == "__main__":
+    main()
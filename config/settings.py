@@ -8,6 +8,57 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
 OLLAMA_BASE_URL = "http://localhost:11434"
 OLLAMA_MODEL = "llama3.1:8b"
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "300"))
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", "10"))
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))
+# Fixed context window: a changing num_ctx reloads the model and drops its KV cache
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "8192"))
+
+# On-disk LLM response cache (OLLAMA_CACHE_REFRESH=1 re-queries and overwrites)
+OLLAMA_CACHE_ENABLED = os.getenv("OLLAMA_CACHE", "1") == "1"
+OLLAMA_CACHE_REFRESH = os.getenv("OLLAMA_CACHE_REFRESH", "0") == "1"
+OLLAMA_CACHE_PATH = os.getenv("OLLAMA_CACHE_PATH", ".cache/ollama_responses.sqlite3")
+OLLAMA_CACHE_MAX_ENTRIES = int(os.getenv("OLLAMA_CACHE_MAX_ENTRIES", "5000"))
+
+# Stream dataset generation: rows are parsed and validated as they arrive,
+# a broken stream is cut short and its valid rows are kept
+DATASET_STREAMING = os.getenv("DATASET_STREAMING", "1") == "1"
+
+
+# Stage-level tracing (TRACE=1). .jsonl → JSON lines, otherwise Chrome trace
+TRACE_ENABLED = os.getenv("TRACE", "0") == "1"
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces/run_{run_id}.trace.json")
+
+# Agent output memoization (AGENT_CACHE=1). AGENT_FINGERPRINT defaults to
+# a hash of the agent module source
+AGENT_CACHE_ENABLED = os.getenv("AGENT_CACHE", "0") == "1"
+AGENT_CACHE_DIR = os.getenv("AGENT_CACHE_DIR", ".cache/agents")
+AGENT_FINGERPRINT = os.getenv("AGENT_FINGERPRINT")
+
+# Re-evaluate only rows changed since the last run of the same dataset
+INCREMENTAL_EVAL = os.getenv("INCREMENTAL_EVAL", "0") == "1"
+
+# Agent execution during evaluation. EVAL_BACKEND=process runs the agent in
+# EVAL_MAX_CONCURRENCY warm worker processes (timeouts kill the worker)
+EVAL_BACKEND = os.getenv("EVAL_BACKEND", "thread")
+EVAL_MAX_CONCURRENCY = int(os.getenv("EVAL_MAX_CONCURRENCY", "1"))
+EVAL_ROW_TIMEOUT = float(os.getenv("EVAL_ROW_TIMEOUT", "0")) or None
+EVAL_MEMORY_LIMIT_MB = int(os.getenv("EVAL_MEMORY_LIMIT_MB", "0")) or None
+
+# Render the human-readable .txt report next to each columnar artifact
+EVAL_TEXT_REPORT = os.getenv("EVAL_TEXT_REPORT", "1") == "1"
+
+# Near-duplicate rejection of generated rows against dataset history
+DEDUP_ENABLED = os.getenv("DEDUP", "1") == "1"
+DEDUP_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", ".cache/prompt_index.pkl")
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+
+# Distributed evaluation (evaluation_jobs queue). A running job whose worker
+# has not heartbeated for EVAL_JOB_LEASE_SECONDS is handed to another worker
+EVAL_JOB_SLICE_SIZE = int(os.getenv("EVAL_JOB_SLICE_SIZE", "500"))
+EVAL_JOB_LEASE_SECONDS = float(os.getenv("EVAL_JOB_LEASE_SECONDS", "300"))
+EVAL_JOB_MAX_ATTEMPTS = int(os.getenv("EVAL_JOB_MAX_ATTEMPTS", "3"))
 
 
 DEPLOY_THRESHOLD = 0.70
@@ -17,16 +17,22 @@ def validate_dataset(dataset: dict):
     # (NOT structural ones)
     # ------------------------------
     for i, row in enumerate(dataset["rows"]):
-        # These MUST exist and MUST NOT be auto-invented
-        if not row.get("input_prompt"):
-            raise ValueError(f"Row {i} has empty or missing input_prompt")
+        validate_row(i, row)
 
-        if not row.get("expected_output"):
-            raise ValueError(f"Row {i} has empty or missing expected_output")
 
-        if row.get("difficulty") not in {"easy", "medium", "hard"}:
-            raise ValueError(f"Row {i} has invalid difficulty")
+def validate_row(i: int, row: dict):
+    # These MUST exist and MUST NOT be auto-invented
+    if not row.get("input_prompt"):
+        raise ValueError(f"Row {i} has empty or missing input_prompt")
 
-        # expected_tools is GUARANTEED by normalizer
-        if not isinstance(row["expected_tools"], list):
-            raise ValueError(f"Row {i} expected_tools must be a list")
+    if not row.get("expected_output"):
+        raise ValueError(f"Row {i} has empty or missing expected_output")
+
+    # Type first: a list / dict difficulty is unhashable
+    difficulty = row.get("difficulty")
+    if not isinstance(difficulty, str) or difficulty not in {"easy", "medium", "hard"}:
+        raise ValueError(f"Row {i} has invalid difficulty")
+
+    # expected_tools is GUARANTEED by normalizer
+    if not isinstance(row["expected_tools"], list):
+        raise ValueError(f"Row {i} expected_tools must be a list")
@@ -0,0 +1,127 @@
+# --------------------------------------------------
+# Agent Result Cache (memoized agent outputs across runs)
+# --------------------------------------------------
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Any, Optional
+
+from memory.disk_cache import DiskCache, make_key
+
+
+def code_fingerprint(agent_fn: Callable) -> str:
+    """
+    Default fingerprint: sha256 of the agent's module source.
+    Supply your own (e.g. a release version) when the agent
+    depends on code or models outside that module.
+    """
+    module = inspect.getmodule(agent_fn)
+    source = inspect.getsource(module if module is not None else agent_fn)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+class AgentResultCache:
+    """
+    Disk cache of raw agent results keyed by (fingerprint, prompt).
+
+    One SQLite file per agent name. Opening the cache with a
+    different fingerprint than the one stored drops every
+    entry, so a changed agent is never scored from stale
+    outputs. Agent calls that raise are not cached.
+
+    The fingerprint lives in a sidecar file, not in the LRU
+    table: as a rarely read entry it would be evicted first,
+    and the next open would then wipe a still-valid cache.
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        fingerprint: str,
+        cache_dir: str = ".cache/agents",
+        max_entries: Optional[int] = 100_000
+    ):
+        self.agent_name = agent_name
+        self.fingerprint = fingerprint
+        self.cache = DiskCache(
+            str(Path(cache_dir) / f"{agent_name}.sqlite3"),
+            max_entries=max_entries
+        )
+        self.fingerprint_path = Path(cache_dir) / f"{agent_name}.fingerprint"
+
+        self._invalidate_if_changed()
+
+    def _invalidate_if_changed(self) -> None:
+        try:
+            stored = self.fingerprint_path.read_text().strip()
+        except FileNotFoundError:
+            stored = None
+
+        if stored != self.fingerprint:
+            self.cache.clear()
+
+            # Atomic replace: a concurrent opener never reads a partial file
+            tmp = self.fingerprint_path.with_suffix(f".fingerprint.{os.getpid()}.tmp")
+            tmp.write_text(self.fingerprint)
+            tmp.replace(self.fingerprint_path)
+
+    def _key(self, prompt: str) -> str:
+        return make_key(fingerprint=self.fingerprint, prompt=prompt)
+
+    def get(self, prompt: str):
+        cached = self.cache.get(self._key(prompt))
+        if cached is None:
+            return None
+        return json.loads(cached)["raw"]
+
+    def set(self, prompt: str, raw: Any, cost_seconds: float = 0.0) -> None:
+        try:
+            value = json.dumps({"raw": raw})
+        except (TypeError, ValueError):
+            return  # not JSON-serialisable → not cacheable
+        self.cache.set(self._key(prompt), value, cost_seconds=cost_seconds)
+
+    def stats(self) -> dict:
+        return {
+            **self.cache.stats(),
+            "agent": self.agent_name,
+            "fingerprint": self.fingerprint,
+        }
+
+    # --------------------------------------------------
+    # Agent wrapper
+    # --------------------------------------------------
+    def wrap(self, agent_fn: Callable[[str], Any]) -> Callable[[str], Any]:
+        """
+        Memoized version of agent_fn (sync or async def),
+        usable with every evaluation entry point.
+        """
+        if inspect.iscoroutinefunction(agent_fn):
+            @functools.wraps(agent_fn)
+            async def cached_async(prompt: str):
+                hit = self.get(prompt)
+                if hit is not None:
+                    return hit
+                start = time.perf_counter()
+                raw = await agent_fn(prompt)
+                self.set(prompt, raw, time.perf_counter() - start)
+                return raw
+
+            return cached_async
+
+        @functools.wraps(agent_fn)
+        def cached(prompt: str):
+            hit = self.get(prompt)
+            if hit is not None:
+                return hit
+            start = time.perf_counter()
+            raw = agent_fn(prompt)
+            self.set(prompt, raw, time.perf_counter() - start)
+            return raw
+
+        return cached
@@ -0,0 +1,250 @@
+# --------------------------------------------------
+# Columnar Evaluation Artifacts (gzip JSONL + index)
+# --------------------------------------------------
+#
+# One artifact per run: <name>.jsonl.gz, a gzip stream of JSON lines
+#
+#   {"type": "header", "format": ..., "dataset_name", "agent_type", "run_id", ...}
+#   {"type": "batch", "rows": n, "columns": {"passed": [...], "prompt": [...], ...}}
+#   ...                                   (one line per flushed batch)
+#   {"type": "footer", "score", "rows", "passed_rows", ...}
+#
+# Each open / append / close writes a separate gzip member, so a
+# run in progress is always a valid (readable) file.
+#
+# Closing an artifact also appends header + footer to
+# <artifact dir>/index.jsonl, so summaries over thousands of
+# artifacts never decompress them.
+
+import gzip
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+FORMAT = "evaluation-artifact/1"
+SUFFIX = ".jsonl.gz"
+INDEX_NAME = "index.jsonl"
+
+COLUMNS = [
+    "row_index",
+    "prompt",
+    "difficulty",
+    "expected_output",
+    "actual_output",
+    "expected_tools",
+    "actual_tools",
+    "tool_expected",
+    "tool_called",
+    "correct_tool_called",
+    "tool_passed",
+    "response_passed",
+    "passed",
+]
+
+BOOL_COLUMNS = {
+    "tool_expected",
+    "tool_called",
+    "correct_tool_called",
+    "tool_passed",
+    "response_passed",
+    "passed",
+}
+
+
+# --------------------------------------------------
+# Writing
+# --------------------------------------------------
+def _write_records(path: Path, records: List[dict], mode: str) -> None:
+    lines = "".join(json.dumps(r, default=str) + "\n" for r in records)
+    with gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6) as f:
+        f.write(lines)
+
+
+def _batch_record(rows: List[dict]) -> dict:
+    return {
+        "type": "batch",
+        "rows": len(rows),
+        "columns": {c: [row.get(c) for row in rows] for c in COLUMNS},
+    }
+
+
+def open_artifact(path, header: dict, rows: List[dict] = ()) -> str:
+    """
+    Create (or rewrite) an artifact with its header and any
+    rows already known (e.g. when resuming a run).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    records = [{
+        "type": "header",
+        "format": FORMAT,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "columns": COLUMNS,
+        **header,
+    }]
+    if rows:
+        records.append(_batch_record(list(rows)))
+
+    _write_records(path, records, "w")
+    return str(path)
+
+
+def append_artifact(path, rows: List[dict]) -> None:
+    if rows:
+        _write_records(Path(path), [_batch_record(rows)], "a")
+
+
+def close_artifact(path, footer: dict) -> None:
+    """
+    Write the footer (score, rows, passed_rows, ...) and
+    register the artifact in the index.
+    """
+    path = Path(path)
+    record = {"type": "footer", **footer}
+    _write_records(path, [record], "a")
+
+    header = next(iter_records(path))
+    entry = {
+        "path": path.name,
+        **{k: v for k, v in header.items() if k not in ("type", "columns")},
+        **{k: v for k, v in record.items() if k != "type"},
+        # A later rewrite (resumed run) makes the entry stale
+        "indexed_mtime": path.stat().st_mtime,
+    }
+
+    # One write per line: O_APPEND keeps concurrent runs from interleaving
+    with open(path.parent / INDEX_NAME, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, default=str) + "\n")
+
+
+# --------------------------------------------------
+# Reading
+# --------------------------------------------------
+def iter_records(path) -> Iterator[dict]:
+    """
+    Stream header / batch / footer records (constant memory).
+    A truncated trailing member (crash mid-write) ends the stream.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        except (EOFError, gzip.BadGzipFile, json.JSONDecodeError):
+            return
+
+
+def load_artifact(path, columns: Optional[List[str]] = None) -> Dict:
+    """
+    {"header", "footer" (None if the run never closed),
+     "columns": {name: values}} with boolean columns as
+    NumPy bool arrays. columns= restricts what is kept.
+    """
+    wanted = columns or COLUMNS
+    header, footer = None, None
+    data = {c: [] for c in wanted}
+
+    for record in iter_records(path):
+        kind = record.get("type")
+        if kind == "header":
+            header = record
+        elif kind == "footer":
+            footer = record
+        elif kind == "batch":
+            for c in wanted:
+                data[c].extend(record["columns"].get(c) or [None] * record["rows"])
+
+    for c in wanted:
+        if c in BOOL_COLUMNS:
+            data[c] = np.array([bool(v) for v in data[c]], dtype=bool)
+
+    return {"header": header, "footer": footer, "columns": data}
+
+
+def read_index(directory) -> Dict[str, dict]:
+    """
+    {artifact file name: latest index entry}.
+    """
+    entries = {}
+    index_path = Path(directory) / INDEX_NAME
+
+    if not index_path.exists():
+        return entries
+
+    with open(index_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn line from a crashed writer
+            entries[entry["path"]] = entry
+
+    return entries
+
+
+def _summarize(path: Path) -> dict:
+    """Index-equivalent entry, computed by streaming the artifact."""
+    header, footer = {}, None
+    rows = passed_rows = 0
+
+    for record in iter_records(path):
+        kind = record.get("type")
+        if kind == "header":
+            header = record
+        elif kind == "footer":
+            footer = record
+        elif kind == "batch":
+            rows += record["rows"]
+            passed_rows += sum(bool(v) for v in record["columns"].get("passed", []))
+
+    return {
+        "path": path.name,
+        "dataset_name": header.get("dataset_name"),
+        "agent_type": header.get("agent_type"),
+        "score": footer.get("score") if footer else None,
+        "rows": rows,
+        "passed_rows": passed_rows,
+    }
+
+
+def dataset_pass_rates(directory, agent_type: Optional[str] = None) -> Dict[str, dict]:
+    """
+    Per-dataset totals over every artifact in directory:
+    {dataset_name: {"runs", "rows", "passed_rows", "pass_rate", "mean_score"}}
+
+    Indexed artifacts cost one index line; only unindexed ones
+    (runs still in progress, copied files) are streamed.
+    """
+    directory = Path(directory)
+    index = read_index(directory)
+    totals: Dict[str, dict] = {}
+
+    for path in sorted(directory.glob("*" + SUFFIX)):
+        entry = index.get(path.name)
+        if entry is None or os.path.getmtime(path) > entry.get("indexed_mtime", float("inf")):
+            entry = _summarize(path)
+
+        if agent_type is not None and entry.get("agent_type") != agent_type:
+            continue
+
+        t = totals.setdefault(entry["dataset_name"], {
+            "runs": 0, "rows": 0, "passed_rows": 0, "scores": [],
+        })
+        t["runs"] += 1
+        t["rows"] += entry["rows"]
+        t["passed_rows"] += entry["passed_rows"]
+        if entry.get("score") is not None:
+            t["scores"].append(entry["score"])
+
+    for t in totals.values():
+        scores = t.pop("scores")
+        t["pass_rate"] = round(t["passed_rows"] / t["rows"], 4) if t["rows"] else None
+        t["mean_score"] = round(sum(scores) / len(scores), 4) if scores else None
+
+    return totals
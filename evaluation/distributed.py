@@ -0,0 +1,310 @@
+# --------------------------------------------------
+# Distributed Evaluation (Postgres job queue)
+# --------------------------------------------------
+#
+# coordinator: start a run, split it into row-range jobs, wait,
+#              then score the run from the stored rows
+# worker:      claim a job, evaluate its rows, append them to
+#              the run via evaluation_repository, repeat
+#
+# Only Postgres is shared: workers need the same SUPABASE_DB_*
+# settings and the agent importable as "module:function".
+
+import importlib
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Any, Dict, Optional
+
+from evaluation.runner import iter_evaluate, compute_score
+from memory.dataset_repository import load_dataset
+from memory.evaluation_repository import (
+    start_evaluation_run,
+    append_evaluation_rows,
+    finish_evaluation_run,
+    fetch_run_totals,
+)
+from memory.job_queue import (
+    enqueue_jobs,
+    claim_job,
+    heartbeat_job,
+    complete_job,
+    fail_job,
+    expire_jobs,
+    fetch_job_counts,
+    fetch_job_errors,
+)
+from deployment.gate import should_deploy
+from config.settings import (
+    EVAL_JOB_SLICE_SIZE,
+    EVAL_JOB_LEASE_SECONDS,
+    EVAL_JOB_MAX_ATTEMPTS,
+)
+
+
+FLUSH_BATCH_SIZE = 50
+POLL_INTERVAL = 2.0
+HEARTBEAT_INTERVAL = EVAL_JOB_LEASE_SECONDS / 3
+
+
+def resolve_agent(spec: str) -> Callable[[str], Any]:
+    """
+    "package.module:function" → the agent callable
+    (function defaults to run_agent).
+    """
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "run_agent")
+
+
+# --------------------------------------------------
+# Coordinator
+# --------------------------------------------------
+def submit_evaluation(
+    dataset_name: str,
+    agent: str,
+    agent_type: str,
+    slice_size: int = EVAL_JOB_SLICE_SIZE
+) -> int:
+    """
+    Create the run and one job per slice_size rows.
+    Returns the run_id.
+    """
+    dataset = load_dataset(dataset_name)
+    if dataset is None:
+        raise ValueError(f"Dataset not found: {dataset_name}")
+
+    total = len(dataset["rows"])
+    ranges = [(start, min(start + slice_size, total)) for start in range(0, total, slice_size)]
+
+    run_id = start_evaluation_run(dataset_name, agent_type)
+    enqueue_jobs(run_id, dataset_name, agent, ranges)
+
+    return run_id
+
+
+def finalize_evaluation(run_id: int, dataset: dict) -> Dict:
+    """
+    Score a run whose jobs are all done; closes the run.
+    """
+    totals = fetch_run_totals(run_id)
+    expected = len(dataset["rows"])
+
+    if totals["rows"] != expected:
+        raise RuntimeError(
+            f"Run {run_id} has {totals['rows']} of {expected} row results"
+        )
+
+    score = compute_score(
+        totals["tool_passed_rows"],
+        totals["response_passed_rows"],
+        expected,
+        dataset.get("evaluation_rules", {})
+    )
+    passed = should_deploy(score)
+
+    finish_evaluation_run(run_id, score, passed)
+
+    return {
+        "run_id": run_id,
+        "score": score,
+        "passed": passed,
+        "failed_rows": totals["failed_rows"],
+    }
+
+
+def coordinate(
+    dataset_name: str,
+    agent: str,
+    agent_type: str,
+    slice_size: int = EVAL_JOB_SLICE_SIZE,
+    run_id: Optional[int] = None,
+    poll_interval: float = POLL_INTERVAL,
+    timeout: Optional[float] = None,
+    verbose: bool = True
+) -> Dict:
+    """
+    Submit (or, with run_id, re-attach to) a distributed run,
+    wait for every slice, then compute the score and the
+    deploy decision once.
+
+    Returns {"run_id", "score", "passed", "failed_rows"}.
+    Raises RuntimeError if a slice exhausted its attempts.
+    """
+    dataset = load_dataset(dataset_name)
+    if dataset is None:
+        raise ValueError(f"Dataset not found: {dataset_name}")
+
+    if run_id is None:
+        run_id = submit_evaluation(dataset_name, agent, agent_type, slice_size)
+
+    if verbose:
+        print(f"Coordinating run_id={run_id} ({len(dataset['rows'])} rows)")
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    while True:
+        expire_jobs(run_id, EVAL_JOB_LEASE_SECONDS, EVAL_JOB_MAX_ATTEMPTS)
+        counts = fetch_job_counts(run_id)
+
+        if counts.get("failed"):
+            raise RuntimeError(
+                f"Run {run_id}: slices failed: {fetch_job_errors(run_id)}"
+            )
+
+        pending = counts.get("pending", 0) + counts.get("running", 0)
+        if pending == 0:
+            break
+
+        if verbose:
+            print(f"  jobs: {counts}")
+
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"Run {run_id} still has {pending} job(s) open")
+
+        time.sleep(poll_interval)
+
+    summary = finalize_evaluation(run_id, dataset)
+
+    if verbose:
+        print(f"Run {run_id} finished: score={summary['score']} passed={summary['passed']}")
+
+    return summary
+
+
+# --------------------------------------------------
+# Worker
+# --------------------------------------------------
+class _LeaseKeeper:
+    """
+    Renews a job's lease every interval seconds on a background
+    thread for as long as the job runs, however slow its rows.
+    .lost is set once another worker owns the job.
+    """
+
+    def __init__(self, job_id: int, worker: str, interval: float = HEARTBEAT_INTERVAL):
+        self.job_id = job_id
+        self.worker = worker
+        self.interval = interval
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"lease-{job_id}", daemon=True
+        )
+
+    def __enter__(self) -> "_LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                renewed = heartbeat_job(self.job_id, self.worker)
+            except Exception as e:
+                # Transient DB error: the lease still has two intervals left
+                print(f"[{self.worker}] job {self.job_id}: heartbeat failed: {e}")
+                continue
+
+            if not renewed:
+                self.lost.set()
+                return
+
+
+def _run_job(
+    job: dict,
+    worker: str,
+    agent_fn: Callable[[str], Any],
+    dataset: dict,
+    max_concurrency: int,
+    row_timeout: Optional[float]
+) -> bool:
+    """
+    Evaluate one slice. False if the lease was lost midway
+    (another worker owns the job now).
+    """
+    batch = []
+
+    with _LeaseKeeper(job["id"], worker) as lease:
+        for result in iter_evaluate(
+            agent_fn,
+            dataset,
+            row_indices=range(job["row_start"], job["row_end"]),
+            max_concurrency=max_concurrency,
+            row_timeout=row_timeout
+        ):
+            if lease.lost.is_set():
+                return False
+
+            batch.append(result)
+
+            if len(batch) >= FLUSH_BATCH_SIZE:
+                append_evaluation_rows(job["run_id"], batch)
+                batch.clear()
+
+        if lease.lost.is_set():
+            return False
+
+        # Re-runs of a slice are idempotent: (run_id, row_index) conflicts are skipped
+        append_evaluation_rows(job["run_id"], batch)
+        return complete_job(job["id"], worker)
+
+
+def run_worker(
+    worker: Optional[str] = None,
+    max_concurrency: int = 1,
+    row_timeout: Optional[float] = None,
+    poll_interval: float = POLL_INTERVAL,
+    exit_when_idle: bool = False,
+    verbose: bool = True
+) -> int:
+    """
+    Claim and evaluate jobs until stopped (or, with
+    exit_when_idle, until the queue is empty).
+    Returns the number of jobs completed.
+    """
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    datasets: Dict[str, dict] = {}
+    agents: Dict[str, Callable[[str], Any]] = {}
+    completed = 0
+
+    while True:
+        job = claim_job(worker, EVAL_JOB_LEASE_SECONDS, EVAL_JOB_MAX_ATTEMPTS)
+
+        if job is None:
+            if exit_when_idle:
+                return completed
+            time.sleep(poll_interval)
+            continue
+
+        if verbose:
+            print(
+                f"[{worker}] job {job['id']}: run {job['run_id']} "
+                f"rows {job['row_start']}-{job['row_end'] - 1}"
+            )
+
+        try:
+            if job["dataset_name"] not in datasets:
+                datasets[job["dataset_name"]] = load_dataset(job["dataset_name"])
+            if job["agent"] not in agents:
+                agents[job["agent"]] = resolve_agent(job["agent"])
+
+            if _run_job(
+                job,
+                worker,
+                agents[job["agent"]],
+                datasets[job["dataset_name"]],
+                max_concurrency,
+                row_timeout
+            ):
+                completed += 1
+
+        except Exception as e:
+            fail_job(job["id"], worker, f"{type(e).__name__}: {e}", EVAL_JOB_MAX_ATTEMPTS)
+            if verbose:
+                print(f"[{worker}] job {job['id']} failed: {e}")
@@ -1,6 +1,10 @@
 from pathlib import Path
 from datetime import datetime
 
+import numpy as np
+
+from evaluation import artifact_store
+
 
 ARTIFACT_DIR = Path("artifacts")
 
@@ -9,60 +13,154 @@ def _ensure_dir():
     ARTIFACT_DIR.mkdir(exist_ok=True)
 
 
+def _write_header(f, dataset: dict, score) -> None:
+    f.write(f"DATASET NAME : {dataset['dataset_name']}\n")
+    f.write(f"AGENT TYPE   : {dataset['agent_type']}\n")
+    f.write(f"SCORE        : {score}\n\n")
+
+    f.write("=" * 70 + "\n")
+    f.write("TEST RESULTS (TOOL-AWARE)\n")
+    f.write("=" * 70 + "\n\n")
+
+
+def _write_row(f, row: dict) -> None:
+    f.write(f"[{row['row_index']}]\n")
+    f.write(f"PROMPT              : {row['prompt']}\n")
+    f.write(f"EXPECTED OUTPUT     : {row['expected_output']}\n")
+    f.write(f"ACTUAL OUTPUT       : {row['actual_output']}\n")
+
+    # Tool section
+    f.write(f"EXPECTED TOOLS      : {row.get('expected_tools', [])}\n")
+    f.write(f"ACTUAL TOOLS        : {row.get('actual_tools', [])}\n")
+    f.write(f"TOOL EXPECTED       : {row.get('tool_expected', False)}\n")
+    f.write(f"TOOL CALLED         : {row.get('tool_called', False)}\n")
+    f.write(
+        f"CORRECT TOOL CALLED : {row.get('correct_tool_called', False)}\n"
+    )
+
+    # Outcome
+    f.write(f"ROW PASSED          : {row['passed']}\n")
+    f.write("-" * 70 + "\n\n")
+
+
+def _artifact_name(dataset: dict) -> str:
+    return dataset["dataset_name"].replace(" ", "_")
+
+
+def _totals(row_results: list) -> dict:
+    return {
+        "rows": len(row_results),
+        "passed_rows": sum(bool(r["passed"]) for r in row_results),
+        "tool_passed_rows": sum(bool(r.get("tool_passed")) for r in row_results),
+        "response_passed_rows": sum(bool(r.get("response_passed")) for r in row_results),
+    }
+
+
 def save_evaluation_artifact(
     dataset: dict,
     score: float,
-    row_results: list
+    row_results: list,
+    text_report: bool = True
 ):
     """
-    Save human-readable evaluation results.
+    Save evaluation results.
 
     Artifacts contain ONLY evaluation results:
     - prompt
     - expected vs actual
     - tool behavior
     - pass/fail reasoning
+
+    The columnar artifact (see artifact_store) is always
+    written; the human-readable .txt is rendered from it when
+    text_report is set. Returns the .txt path if rendered,
+    otherwise the columnar artifact path.
     """
 
     _ensure_dir()
 
     ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    name = dataset["dataset_name"].replace(" ", "_")
-
-    path = ARTIFACT_DIR / f"{name}_evaluation_{ts}.txt"
-
-    with open(path, "w") as f:
-        # --------------------------------------------------
-        # Header
-        # --------------------------------------------------
-        f.write(f"DATASET NAME : {dataset['dataset_name']}\n")
-        f.write(f"AGENT TYPE   : {dataset['agent_type']}\n")
-        f.write(f"SCORE        : {score}\n\n")
-
-        f.write("=" * 70 + "\n")
-        f.write("TEST RESULTS (TOOL-AWARE)\n")
-        f.write("=" * 70 + "\n\n")
-
-        # --------------------------------------------------
-        # Row-level results
-        # --------------------------------------------------
-        for row in row_results:
-            f.write(f"[{row['row_index']}]\n")
-            f.write(f"PROMPT              : {row['prompt']}\n")
-            f.write(f"EXPECTED OUTPUT     : {row['expected_output']}\n")
-            f.write(f"ACTUAL OUTPUT       : {row['actual_output']}\n")
-
-            # Tool section
-            f.write(f"EXPECTED TOOLS      : {row.get('expected_tools', [])}\n")
-            f.write(f"ACTUAL TOOLS        : {row.get('actual_tools', [])}\n")
-            f.write(f"TOOL EXPECTED       : {row.get('tool_expected', False)}\n")
-            f.write(f"TOOL CALLED         : {row.get('tool_called', False)}\n")
-            f.write(
-                f"CORRECT TOOL CALLED : {row.get('correct_tool_called', False)}\n"
-            )
-
-            # Outcome
-            f.write(f"ROW PASSED          : {row['passed']}\n")
-            f.write("-" * 70 + "\n\n")
+    path = ARTIFACT_DIR / f"{_artifact_name(dataset)}_evaluation_{ts}{artifact_store.SUFFIX}"
+
+    artifact_store.open_artifact(
+        path,
+        {"dataset_name": dataset["dataset_name"], "agent_type": dataset["agent_type"]},
+        row_results
+    )
+    artifact_store.close_artifact(path, {"score": score, **_totals(row_results)})
+
+    if text_report:
+        return render_text_report(path)
 
     return str(path)
+
+
+# --------------------------------------------------
+# Text rendering (optional view of a columnar artifact)
+# --------------------------------------------------
+def render_text_report(artifact_path, text_path=None) -> str:
+    """
+    Write the human-readable report for a columnar artifact
+    (rows in row_index order). Defaults to the same name
+    with a .txt suffix.
+    """
+
+    artifact = artifact_store.load_artifact(artifact_path)
+    header = artifact["header"]
+    footer = artifact["footer"]
+    columns = artifact["columns"]
+
+    if text_path is None:
+        text_path = str(artifact_path)[:-len(artifact_store.SUFFIX)] + ".txt"
+
+    score = footer["score"] if footer else "PENDING (run not finished)"
+    order = np.argsort(np.array(columns["row_index"], dtype=float), kind="stable")
+
+    with open(text_path, "w") as f:
+        _write_header(f, header, score)
+        for i in order:
+            _write_row(f, {c: columns[c][i] for c in columns})
+
+    return str(text_path)
+
+
+# --------------------------------------------------
+# Streaming artifacts (written while a run is in progress)
+# --------------------------------------------------
+def open_evaluation_artifact(
+    dataset: dict,
+    run_id: int,
+    existing_rows: list = ()
+) -> str:
+    """
+    Start (or restart, on resume) the columnar artifact for a run.
+
+    The file is rewritten from existing_rows so it always
+    matches what is persisted for run_id. The score is
+    written by close_evaluation_artifact().
+    """
+
+    _ensure_dir()
+
+    path = ARTIFACT_DIR / f"{_artifact_name(dataset)}_evaluation_run{run_id}{artifact_store.SUFFIX}"
+
+    return artifact_store.open_artifact(
+        path,
+        {
+            "dataset_name": dataset["dataset_name"],
+            "agent_type": dataset["agent_type"],
+            "run_id": run_id,
+        },
+        existing_rows
+    )
+
+
+def append_evaluation_artifact(path: str, row_results: list) -> None:
+    artifact_store.append_artifact(path, row_results)
+
+
+def close_evaluation_artifact(path: str, score: float, totals: dict) -> None:
+    """
+    totals: rows, passed_rows, tool_passed_rows, response_passed_rows.
+    """
+    artifact_store.close_artifact(path, {"score": score, **totals})
@@ -0,0 +1,162 @@
+# --------------------------------------------------
+# Matrix Evaluation (many agents × many stored datasets)
+# --------------------------------------------------
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Any, Dict, List, Optional
+
+from evaluation.runner import iter_evaluate_async, compute_score
+from memory.dataset_repository import load_datasets
+from memory.evaluation_repository import save_evaluations
+from deployment.gate import should_deploy
+from tracing.tracer import span
+
+
+async def _run_cell(
+    agent_name: str,
+    agent_fn: Callable[[str], Any],
+    dataset: dict,
+    executor: ThreadPoolExecutor,
+    semaphore: asyncio.Semaphore,
+    row_timeout: Optional[float]
+) -> Dict:
+    start = time.perf_counter()
+
+    with span("matrix.cell", agent=agent_name, dataset=dataset["dataset_name"]):
+        results = [
+            result async for result in iter_evaluate_async(
+                agent_fn,
+                dataset,
+                row_timeout=row_timeout,
+                executor=executor,
+                semaphore=semaphore
+            )
+        ]
+    results.sort(key=lambda r: r["row_index"])
+
+    rules = dataset.get("evaluation_rules", {})
+    score = compute_score(
+        sum(r["tool_passed"] for r in results),
+        sum(r["response_passed"] for r in results),
+        len(results),
+        rules
+    ) if results else 0.0
+
+    return {
+        "agent": agent_name,
+        "dataset_name": dataset["dataset_name"],
+        # Same key as the main pipeline's runs; the name tells agents apart
+        "agent_type": dataset.get("agent_type"),
+        "agent_name": agent_name,
+        "score": score,
+        "passed": should_deploy(score),
+        "rows": len(results),
+        "failed_rows": sum(not r["passed"] for r in results),
+        "seconds": round(time.perf_counter() - start, 3),
+        "row_results": results,
+    }
+
+
+async def evaluate_matrix_async(
+    agents: Dict[str, Callable[[str], Any]],
+    datasets: List[dict],
+    max_concurrency: int = 8,
+    row_timeout: Optional[float] = None
+) -> List[Dict]:
+    """
+    Evaluate every agent on every dataset in one event loop.
+
+    All cells share ONE thread pool and ONE limit of
+    max_concurrency in-flight agent calls, so rows from
+    different cells interleave and no cell idles the pool.
+
+    The pool has exactly max_concurrency threads: a slot is only
+    freed when its thread returns (a timed-out call still holds
+    it), so a row never waits in the pool queue with its timeout
+    already running.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    try:
+        return list(await asyncio.gather(*(
+            _run_cell(name, agent_fn, dataset, executor, semaphore, row_timeout)
+            for name, agent_fn in agents.items()
+            for dataset in datasets
+        )))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_matrix(
+    agents: Dict[str, Callable[[str], Any]],
+    dataset_ids: List[str],
+    max_concurrency: int = 8,
+    row_timeout: Optional[float] = None,
+    persist: bool = True,
+    verbose: bool = True
+) -> List[Dict]:
+    """
+    Evaluate agents × stored datasets in this process.
+
+    - datasets are loaded once, in one query
+    - cells run on a shared worker pool (evaluate_matrix_async);
+      an AgentProcessPool is a valid agent for CPU-bound code
+    - all runs and rows are persisted in one transaction
+
+    agents: {name: agent_fn}. Runs are stored under the dataset's
+    agent_type (like the main pipeline's runs) with the agent's
+    name as agent_name, so trends can be read per agent type or
+    per agent (rollup_repository agent_name filter).
+
+    Returns one dict per cell, agents-major: agent, dataset_name,
+    score, passed, rows, failed_rows, seconds, row_results, run_id.
+    """
+
+    stored = load_datasets(dataset_ids)
+    missing = [d for d in dataset_ids if d not in stored]
+    if missing:
+        raise ValueError(f"Datasets not found: {missing}")
+
+    datasets = [stored[d] for d in dict.fromkeys(dataset_ids)]
+
+    if verbose:
+        print(
+            f"\nRunning matrix: {len(agents)} agent(s) × {len(datasets)} dataset(s), "
+            f"{max_concurrency} worker(s)\n"
+        )
+
+    cells = asyncio.run(evaluate_matrix_async(
+        agents,
+        datasets,
+        max_concurrency=max_concurrency,
+        row_timeout=row_timeout
+    ))
+
+    run_ids = [None] * len(cells)
+    if persist:
+        run_ids = save_evaluations(cells)
+
+    for cell, run_id in zip(cells, run_ids):
+        cell["run_id"] = run_id
+
+    if verbose:
+        print_matrix(cells)
+
+    return cells
+
+
+def print_matrix(cells: List[Dict]) -> None:
+    datasets = list(dict.fromkeys(c["dataset_name"] for c in cells))
+    agents = list(dict.fromkeys(c["agent"] for c in cells))
+    scores = {(c["agent"], c["dataset_name"]): c["score"] for c in cells}
+
+    width = max([len(a) for a in agents] + [5])
+    print(f"{'agent':<{width}}  " + "  ".join(f"{d[:24]:>24}" for d in datasets))
+    for agent in agents:
+        print(
+            f"{agent:<{width}}  "
+            + "  ".join(f"{scores[(agent, d)]:>24.3f}" for d in datasets)
+        )
@@ -0,0 +1,281 @@
+# --------------------------------------------------
+# Process-Pool Agent Backend (CPU-bound / untrusted agents)
+# --------------------------------------------------
+
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Callable, Any, Optional
+
+
+STARTUP_TIMEOUT = 60.0
+SHUTDOWN_TIMEOUT = 5.0
+
+_READY = "ready"
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+class RowTimeout(RuntimeError):
+    pass
+
+
+# --------------------------------------------------
+# Worker side
+# --------------------------------------------------
+def _address_space_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _limit_memory(memory_limit_mb: int) -> None:
+    """
+    Cap the worker's address space at its warm footprint plus
+    memory_limit_mb. Allocations beyond it raise MemoryError.
+    """
+    try:
+        import resource
+    except ImportError:
+        return  # not available on this platform
+
+    limit = _address_space_bytes() + memory_limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _worker_main(agent_fn: Callable[[str], Any], conn, memory_limit_mb: Optional[int]):
+    if memory_limit_mb:
+        _limit_memory(memory_limit_mb)
+
+    conn.send((_READY, os.getpid()))
+
+    while True:
+        try:
+            prompt = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        if prompt is None:
+            return
+
+        try:
+            reply = ("ok", agent_fn(prompt))
+        except BaseException as e:  # MemoryError, RecursionError, SystemExit, ...
+            reply = ("error", str(e) or type(e).__name__)
+
+        try:
+            conn.send(reply)
+        except Exception as e:  # unpicklable agent output
+            conn.send(("error", f"unpicklable agent output: {e}"))
+
+
+# --------------------------------------------------
+# Parent side
+# --------------------------------------------------
+class _Worker:
+    def __init__(self, ctx, agent_fn, memory_limit_mb):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(agent_fn, child_conn, memory_limit_mb),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self) -> None:
+        if not self.conn.poll(STARTUP_TIMEOUT):
+            self.kill()
+            raise WorkerCrashed(f"worker did not start within {STARTUP_TIMEOUT}s")
+
+        try:
+            self.conn.recv()
+        except EOFError:
+            self.kill()
+            raise WorkerCrashed(
+                f"worker exited during startup (exit code {self.process.exitcode})"
+            )
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(SHUTDOWN_TIMEOUT)
+        self.kill()
+
+
+class AgentProcessPool:
+    """
+    Warm worker processes that each run agent_fn.
+
+    The pool is itself a sync agent (pool(prompt)), so it plugs
+    into the runner's thread-backed concurrent engine: each
+    in-flight row holds one worker, so CPU-bound agents run in
+    parallel instead of serializing on the GIL.
+
+    - row_timeout: a row still running after row_timeout seconds
+      is killed with its worker, a fresh worker takes its place
+      and the call raises RowTimeout
+    - memory_limit_mb: per-worker address-space headroom; an agent
+      exceeding it gets a MemoryError (or the worker dies)
+    - a worker that dies mid-row is replaced and the call raises
+      WorkerCrashed
+
+    Either way the runner records "error: ..." for the row and
+    the run continues.
+
+    agent_fn must be picklable (a module-level function).
+    Workers use the "spawn" start method by default, so the
+    parent's threads, DB pools and sockets are never inherited.
+    """
+
+    def __init__(
+        self,
+        agent_fn: Callable[[str], Any],
+        workers: int = 4,
+        row_timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+        start_method: str = "spawn"
+    ):
+        self.agent_fn = agent_fn
+        self.workers = max(1, workers)
+        self.row_timeout = row_timeout
+        self.memory_limit_mb = memory_limit_mb
+
+        self._ctx = multiprocessing.get_context(start_method)
+        self._idle = queue.Queue()
+        self._all = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.timeouts = 0
+        self.crashes = 0
+
+        # Start every worker first: imports overlap across processes
+        started = [self._spawn(wait=False) for _ in range(self.workers)]
+        for worker in started:
+            worker.wait_ready()
+            self._idle.put(worker)
+
+    # --------------------------------------------------
+    # Worker lifecycle
+    # --------------------------------------------------
+    def _spawn(self, wait: bool = True) -> _Worker:
+        worker = _Worker(self._ctx, self.agent_fn, self.memory_limit_mb)
+        with self._lock:
+            self._all.add(worker)
+        if wait:
+            try:
+                worker.wait_ready()
+            except WorkerCrashed:
+                with self._lock:
+                    self._all.discard(worker)
+                raise
+        return worker
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.kill()
+        with self._lock:
+            self._all.discard(worker)
+        return self._spawn()
+
+    def _take_idle(self) -> _Worker:
+        """
+        Wait for an idle worker; callers fail instead of blocking
+        forever once failed replacements have emptied the pool.
+        """
+        while True:
+            with self._lock:
+                if not self._all:
+                    raise WorkerCrashed("AgentProcessPool has no workers left")
+            try:
+                return self._idle.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+    # --------------------------------------------------
+    # Agent call
+    # --------------------------------------------------
+    def __call__(self, prompt: str) -> Any:
+        if self._closed:
+            raise RuntimeError("AgentProcessPool is closed")
+
+        worker = self._take_idle()
+        error = None
+
+        try:
+            worker.conn.send(prompt)
+
+            if worker.conn.poll(self.row_timeout):
+                status, value = worker.conn.recv()
+            else:
+                self.timeouts += 1
+                error = RowTimeout(f"timed out after {self.row_timeout}s")
+
+        except (EOFError, OSError):
+            self.crashes += 1
+            worker.process.join(SHUTDOWN_TIMEOUT)
+            error = WorkerCrashed(
+                f"agent worker crashed (exit code {worker.process.exitcode})"
+            )
+
+        finally:
+            # Only a worker that answered goes back as it is
+            if error is None:
+                self._idle.put(worker)
+
+        if error is not None:
+            try:
+                self._idle.put(self._replace(worker))
+            except WorkerCrashed as e:
+                # The pool shrinks instead of recycling a dead worker
+                raise WorkerCrashed(f"{error}; replacement failed: {e}") from e
+            raise error
+
+        if status == "error":
+            raise RuntimeError(value)
+
+        return value
+
+    # --------------------------------------------------
+    # Shutdown
+    # --------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            alive = len(self._all)
+        return {
+            "workers": self.workers,
+            "alive": alive,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+        }
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+
+        with self._lock:
+            workers = list(self._all)
+            self._all.clear()
+
+        for worker in workers:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -2,47 +2,154 @@
 # Evaluation Runner (Tool-Aware, Stable)
 # --------------------------------------------------
 
-import re
-from typing import Callable, Tuple, List, Dict, Any
+import asyncio
+import contextvars
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Tuple, List, Dict, Any, Optional, AsyncIterator, Iterator
+
+from evaluation.scorer import ScoringPlan, compile_expected
+from evaluation.process_pool import AgentProcessPool
+from tracing.tracer import span
+
+
+# Finished rows scored together by ScoringPlan (serial path)
+SCORE_BATCH_SIZE = 50
 
 
 # --------------------------------------------------
 # Helpers
 # --------------------------------------------------
-def _extract_number(text: str):
-    if not text:
-        return None
-    match = re.search(r"-?\d+(\.\d+)?", text)
-    return float(match.group()) if match else None
+def is_correct(expected: str, actual: str, tolerance: float = 0.3) -> bool:
+    return compile_expected(expected).matches(actual, tolerance)
 
 
-def _normalize(text: str) -> str:
-    return str(text).strip().lower()
+# --------------------------------------------------
+# Row execution + scoring
+# --------------------------------------------------
+def _unpack_agent_output(raw: Any) -> Tuple[Any, set]:
+    if isinstance(raw, dict):
+        return raw.get("output"), set(raw.get("tools_called", []))
+    return str(raw), set()
+
+
+def _score_row(
+    index: int,
+    row: dict,
+    actual_output: Any,
+    actual_tools: set,
+    response_passed: bool
+) -> Dict:
+    prompt = row["input_prompt"]
+    expected_output = row["expected_output"]
+    expected_tools = set(row.get("expected_tools", []))
+
+    # -----------------------------
+    # Tool evaluation
+    # -----------------------------
+    tool_expected = len(expected_tools) > 0
+    tool_called = len(actual_tools) > 0
+
+    if tool_expected:
+        correct_tool_called = expected_tools.issubset(actual_tools)
+        tool_passed = correct_tool_called
+    else:
+        correct_tool_called = not tool_called
+        tool_passed = not tool_called
+
+    # -----------------------------
+    # Final row result
+    # -----------------------------
+    return {
+        "row_index": index,
+        "prompt": prompt,
+        "difficulty": row.get("difficulty"),
+        "expected_output": expected_output,
+        "actual_output": actual_output,
+        "expected_tools": list(expected_tools),
+        "actual_tools": list(actual_tools),
+        "tool_expected": tool_expected,
+        "tool_called": tool_called,
+        "correct_tool_called": correct_tool_called,
+        "tool_passed": tool_passed,
+        "response_passed": response_passed,
+        "passed": tool_passed and response_passed
+    }
 
 
-def is_correct(expected: str, actual: str, tolerance: float = 0.3) -> bool:
-    if not actual:
-        return False
+def _score_batch(
+    plan: ScoringPlan,
+    rows: List[dict],
+    batch: List[Tuple[int, int, Any, set]]
+) -> List[Dict]:
+    """
+    Score finished rows in one ScoringPlan call. batch holds
+    (row index, plan position, actual output, actual tools).
+    """
+    if not batch:
+        return []
 
-    exp = _normalize(expected)
-    act = _normalize(actual)
+    response_passed = plan.score(
+        [actual_output for _, _, actual_output, _ in batch],
+        positions=[position for _, position, _, _ in batch]
+    )
 
-    # Exact / substring
-    if exp == act or exp in act or act in exp:
-        return True
+    return [
+        _score_row(i, rows[i], actual_output, actual_tools, bool(passed))
+        for (i, _, actual_output, actual_tools), passed in zip(batch, response_passed)
+    ]
+
+
+def print_row(result: Dict) -> None:
+    print(f"--- ROW {result['row_index']} ---")
+    print("PROMPT              :", result["prompt"])
+    print("EXPECTED OUTPUT     :", result["expected_output"])
+    print("ACTUAL OUTPUT       :", result["actual_output"])
+    print("EXPECTED TOOLS      :", result["expected_tools"])
+    print("ACTUAL TOOLS        :", result["actual_tools"])
+    print("TOOL EXPECTED       :", result["tool_expected"])
+    print("TOOL CALLED         :", result["tool_called"])
+    print("CORRECT TOOL CALLED :", result["correct_tool_called"])
+    print("PASSED              :", result["passed"])
+    print()
+
+
+def compute_score(
+    tool_correct: int,
+    response_correct: int,
+    total: int,
+    rules: dict
+) -> float:
+    tool_weight = rules.get("tool_accuracy_weight", 0.5)
+    response_weight = rules.get("response_accuracy_weight", 0.5)
 
-    # Numeric tolerance
-    exp_num = _extract_number(exp)
-    act_num = _extract_number(act)
-    if exp_num is not None and act_num is not None:
-        if abs(exp_num - act_num) <= tolerance:
-            return True
+    tool_score = tool_correct / total
+    response_score = response_correct / total
 
-    # Approximate answers
-    if "approx" in exp and exp_num is not None and act_num is not None:
-        return True
+    final_score = (
+        tool_score * tool_weight +
+        response_score * response_weight
+    )
+
+    return round(final_score, 3)
+
+
+def _final_score(results: List[Dict], rules: dict) -> float:
+    return compute_score(
+        sum(r["tool_passed"] for r in results),
+        sum(r["response_passed"] for r in results),
+        len(results),
+        rules
+    )
 
-    return False
+
+def _run_row(agent_fn: Callable[[str], Any], prompt: str) -> Tuple[Any, set]:
+    try:
+        raw = agent_fn(prompt)
+        return _unpack_agent_output(raw)
+
+    except Exception as e:
+        return f"error: {e}", set()
 
 
 # --------------------------------------------------
@@ -63,111 +170,423 @@ def evaluate(
     Legacy agents returning strings are supported.
     """
 
-    rows = dataset["rows"]
     rules = dataset.get("evaluation_rules", {})
 
-    tolerance = rules.get("numeric_tolerance", 0.3)
-    tool_weight = rules.get("tool_accuracy_weight", 0.5)
-    response_weight = rules.get("response_accuracy_weight", 0.5)
-
-    tool_correct = 0
-    response_correct = 0
-
     results = []
 
     if verbose:
         print("\nRunning Evaluation\n")
 
-    for i, row in enumerate(rows):
-        prompt = row["input_prompt"]
-        expected_output = row["expected_output"]
-        expected_tools = set(row.get("expected_tools", []))
-
-        # -----------------------------
-        # Run agent
-        # -----------------------------
-        try:
-            raw = agent_fn(prompt)
-
-            if isinstance(raw, dict):
-                actual_output = raw.get("output")
-                actual_tools = set(raw.get("tools_called", []))
-            else:
-                actual_output = str(raw)
-                actual_tools = set()
-
-        except Exception as e:
-            actual_output = f"error: {e}"
-            actual_tools = set()
-
-        # -----------------------------
-        # Tool evaluation
-        # -----------------------------
-        tool_expected = len(expected_tools) > 0
-        tool_called = len(actual_tools) > 0
-
-        if tool_expected:
-            correct_tool_called = expected_tools.issubset(actual_tools)
-            tool_passed = correct_tool_called
+    for result in iter_evaluate(agent_fn, dataset):
+        results.append(result)
+
+        if verbose:
+            print_row(result)
+
+    return _final_score(results, rules), results
+
+
+# --------------------------------------------------
+# Concurrent Evaluation (I/O-bound agents)
+# --------------------------------------------------
+def _is_async_agent(agent_fn: Callable) -> bool:
+    return (
+        inspect.iscoroutinefunction(agent_fn) or
+        inspect.iscoroutinefunction(getattr(agent_fn, "__call__", None))
+    )
+
+
+def _mark_started(started: asyncio.Future) -> None:
+    if not started.done():
+        started.set_result(None)
+
+
+async def _run_row_async(
+    agent_fn: Callable,
+    prompt: str,
+    executor: ThreadPoolExecutor,
+    row_timeout: Optional[float],
+    release: Callable[[], None]
+) -> Tuple[Any, set]:
+    """
+    Run one agent call, sync agents on the thread pool.
+    Timeouts and agent errors become "error: ..." outputs.
+
+    The timeout counts from when a thread starts the call, not
+    from when it is queued. release() is called once the call
+    has really finished: a timed-out sync call cannot be stopped,
+    so its concurrency slot stays taken until its thread returns
+    (use backend="process" to kill hung agents).
+    """
+    loop = asyncio.get_running_loop()
+    thread_call = None
+
+    try:
+        if _is_async_agent(agent_fn):
+            raw = await asyncio.wait_for(agent_fn(prompt), timeout=row_timeout)
         else:
-            correct_tool_called = not tool_called
-            tool_passed = not tool_called
-
-        # -----------------------------
-        # Response evaluation
-        # -----------------------------
-        response_passed = is_correct(
-            expected=expected_output,
-            actual=actual_output,
-            tolerance=tolerance
+            started = loop.create_future()
+            # Copy the context so spans inside the agent nest under the row
+            ctx = contextvars.copy_context()
+
+            def call():
+                loop.call_soon_threadsafe(_mark_started, started)
+                return ctx.run(agent_fn, prompt)
+
+            thread_call = loop.run_in_executor(executor, call)
+            await asyncio.wait({started, thread_call}, return_when=asyncio.FIRST_COMPLETED)
+
+            # shield: a timeout must not mark the still-running call done
+            raw = await asyncio.wait_for(asyncio.shield(thread_call), timeout=row_timeout)
+
+        # Sync wrappers around async agents
+        if inspect.isawaitable(raw):
+            raw = await asyncio.wait_for(raw, timeout=row_timeout)
+
+        return _unpack_agent_output(raw)
+
+    except asyncio.TimeoutError:
+        return f"error: timed out after {row_timeout}s", set()
+
+    except Exception as e:
+        return f"error: {e}", set()
+
+    finally:
+        if thread_call is None or thread_call.done():
+            release()
+        else:
+            thread_call.add_done_callback(lambda _: release())
+
+
+async def iter_evaluate_async(
+    agent_fn: Callable[[str], Any],
+    dataset: dict,
+    max_concurrency: int = 8,
+    row_timeout: Optional[float] = None,
+    row_indices: Optional[List[int]] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+    semaphore: Optional[asyncio.Semaphore] = None
+) -> AsyncIterator[Dict]:
+    """
+    Yield scored row results as soon as each row finishes
+    (completion order, NOT row_index order). Rows finishing
+    together are scored in one ScoringPlan call.
+
+    At most max_concurrency agent calls are in flight, counting
+    timed-out sync calls whose threads are still running.
+    Sync agents run on a bounded thread pool; async agents
+    run on the event loop.
+
+    Pass executor + semaphore to share one worker pool and
+    one concurrency limit across several evaluations (see
+    evaluation.matrix); they are then left open.
+    """
+
+    rows = dataset["rows"]
+
+    if row_indices is None:
+        row_indices = range(len(rows))
+    row_indices = list(row_indices)
+
+    plan = ScoringPlan.from_dataset(dataset, row_indices)
+
+    owns_executor = executor is None
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max_concurrency)
+    if owns_executor:
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    async def run(i: int, position: int) -> Tuple[int, int, Any, set]:
+        # Released by _run_row_async once the agent call has really ended
+        await semaphore.acquire()
+        with span("evaluation.row", row_index=i):
+            actual_output, actual_tools = await _run_row_async(
+                agent_fn,
+                rows[i]["input_prompt"],
+                executor,
+                row_timeout,
+                semaphore.release
+            )
+            return i, position, actual_output, actual_tools
+
+    # Finished tasks queue up; each wakeup scores all of them at once
+    finished: asyncio.Queue = asyncio.Queue()
+    tasks = []
+    for position, i in enumerate(row_indices):
+        task = asyncio.ensure_future(run(i, position))
+        task.add_done_callback(finished.put_nowait)
+        tasks.append(task)
+
+    try:
+        remaining = len(tasks)
+        while remaining:
+            done = [await finished.get()]
+            while not finished.empty():
+                done.append(finished.get_nowait())
+            remaining -= len(done)
+
+            for result in _score_batch(plan, rows, [task.result() for task in done]):
+                yield result
+
+    finally:
+        for task in tasks:
+            task.cancel()
+
+        # Timed-out sync calls cannot be interrupted; don't wait for them
+        if owns_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def evaluate_async(
+    agent_fn: Callable[[str], Any],
+    dataset: dict,
+    max_concurrency: int = 8,
+    row_timeout: Optional[float] = None,
+    verbose: bool = True
+) -> Tuple[float, List[Dict]]:
+    """
+    Concurrent counterpart of evaluate().
+
+    Same row results and score as the serial loop,
+    returned in row_index order.
+    """
+
+    if verbose:
+        print("\nRunning Evaluation (concurrent)\n")
+
+    results = [
+        result async for result in iter_evaluate_async(
+            agent_fn,
+            dataset,
+            max_concurrency=max_concurrency,
+            row_timeout=row_timeout
         )
+    ]
+    results.sort(key=lambda r: r["row_index"])
 
-        # -----------------------------
-        # Final row result
-        # -----------------------------
-        row_passed = tool_passed and response_passed
-
-        if tool_passed:
-            tool_correct += 1
-        if response_passed:
-            response_correct += 1
-
-        results.append({
-            "row_index": i,
-            "prompt": prompt,
-            "expected_output": expected_output,
-            "actual_output": actual_output,
-            "expected_tools": list(expected_tools),
-            "actual_tools": list(actual_tools),
-            "tool_expected": tool_expected,
-            "tool_called": tool_called,
-            "correct_tool_called": correct_tool_called,
-            "tool_passed": tool_passed,
-            "response_passed": response_passed,
-            "passed": row_passed
-        })
+    if verbose:
+        for result in results:
+            print_row(result)
 
-        if verbose:
-            print(f"--- ROW {i} ---")
-            print("PROMPT              :", prompt)
-            print("EXPECTED OUTPUT     :", expected_output)
-            print("ACTUAL OUTPUT       :", actual_output)
-            print("EXPECTED TOOLS      :", list(expected_tools))
-            print("ACTUAL TOOLS        :", list(actual_tools))
-            print("TOOL EXPECTED       :", tool_expected)
-            print("TOOL CALLED         :", tool_called)
-            print("CORRECT TOOL CALLED :", correct_tool_called)
-            print("PASSED              :", row_passed)
-            print()
-
-    total = len(rows)
+    rules = dataset.get("evaluation_rules", {})
+    return _final_score(results, rules), results
 
-    tool_score = tool_correct / total
-    response_score = response_correct / total
 
-    final_score = (
-        tool_score * tool_weight +
-        response_score * response_weight
+def evaluate_concurrent(
+    agent_fn: Callable[[str], Any],
+    dataset: dict,
+    max_concurrency: int = 8,
+    row_timeout: Optional[float] = None,
+    verbose: bool = True
+) -> Tuple[float, List[Dict]]:
+    """
+    Blocking entry point for evaluate_async().
+    Accepts both sync and `async def` agents.
+    """
+    return asyncio.run(
+        evaluate_async(
+            agent_fn,
+            dataset,
+            max_concurrency=max_concurrency,
+            row_timeout=row_timeout,
+            verbose=verbose
+        )
     )
 
-    return round(final_score, 3), results
+
+# --------------------------------------------------
+# Streaming Evaluation
+# --------------------------------------------------
+def iter_evaluate(
+    agent_fn: Callable[[str], Any],
+    dataset: dict,
+    row_indices: Optional[List[int]] = None,
+    max_concurrency: int = 1,
+    row_timeout: Optional[float] = None,
+    backend: str = "thread",
+    memory_limit_mb: Optional[int] = None
+) -> Iterator[Dict]:
+    """
+    Yield each scored row result once it finishes. Responses
+    are scored in bulk by a ScoringPlan: the serial path yields
+    every SCORE_BATCH_SIZE rows, the concurrent engine whatever
+    finished since its last wakeup.
+
+    Serial (row order) by default. With max_concurrency > 1,
+    a row_timeout or an async agent, rows come from the
+    concurrent engine in completion order.
+
+    backend="process" runs a sync agent_fn on max_concurrency
+    warm worker processes for the duration of the run (see
+    AgentProcessPool): row_timeout and memory_limit_mb are
+    enforced per worker, and runaway or crashed rows are
+    recorded as failed instead of stalling the run.
+
+    row_indices restricts the run to a subset of rows
+    (e.g. resuming an interrupted run).
+    """
+
+    if backend == "process":
+        with AgentProcessPool(
+            agent_fn,
+            workers=max_concurrency,
+            row_timeout=row_timeout,
+            memory_limit_mb=memory_limit_mb
+        ) as pool:
+            # The pool enforces the timeout by killing the worker
+            yield from iter_evaluate(
+                pool,
+                dataset,
+                row_indices=row_indices,
+                max_concurrency=pool.workers
+            )
+        return
+
+    if backend != "thread":
+        raise ValueError(f"Unknown evaluation backend: {backend}")
+
+    rows = dataset["rows"]
+
+    if row_indices is None:
+        row_indices = range(len(rows))
+
+    if max_concurrency <= 1 and row_timeout is None and not _is_async_agent(agent_fn):
+        row_indices = list(row_indices)
+        plan = ScoringPlan.from_dataset(dataset, row_indices)
+        batch = []
+
+        for position, i in enumerate(row_indices):
+            with span("evaluation.row", row_index=i):
+                actual_output, actual_tools = _run_row(agent_fn, rows[i]["input_prompt"])
+            batch.append((i, position, actual_output, actual_tools))
+
+            if len(batch) >= SCORE_BATCH_SIZE:
+                yield from _score_batch(plan, rows, batch)
+                batch = []
+
+        yield from _score_batch(plan, rows, batch)
+        return
+
+    # Pump the async engine from a plain generator
+    loop = asyncio.new_event_loop()
+    results = iter_evaluate_async(
+        agent_fn,
+        dataset,
+        max_concurrency=max_concurrency,
+        row_timeout=row_timeout,
+        row_indices=list(row_indices)
+    )
+
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
+
+
+# --------------------------------------------------
+# Incremental Evaluation (carry forward unchanged rows)
+# --------------------------------------------------
+def _row_signature(prompt: Any, expected_output: Any, expected_tools: Any) -> tuple:
+    return (str(prompt), str(expected_output), tuple(sorted(expected_tools or [])))
+
+
+def carry_forward_results(
+    dataset: dict,
+    previous_results: List[Dict],
+    rerun_if: Optional[Callable[[dict], bool]] = None
+) -> Tuple[List[Dict], List[int]]:
+    """
+    Diff dataset rows against a previous run's row results.
+
+    A row whose prompt, expected output and expected tools all
+    match a previous row is carried forward: the stored agent
+    output is re-scored with the current rules, without calling
+    the agent. rerun_if(row) forces a row to be re-run anyway
+    (e.g. rows exercising a capability that changed).
+
+    Agent changes are not detected here: previous_results must
+    come from the same agent version (streaming picks the
+    previous run by agent_fingerprint).
+
+    Returns (carried results, row indices that must be re-run).
+    """
+
+    rows = dataset["rows"]
+
+    previous = {}
+    for r in previous_results:
+        key = _row_signature(r["prompt"], r["expected_output"], r.get("expected_tools"))
+        previous.setdefault(key, r)
+
+    matched = []
+    pending = []
+
+    for i, row in enumerate(rows):
+        prev = None
+        if rerun_if is None or not rerun_if(row):
+            prev = previous.get(_row_signature(
+                row["input_prompt"],
+                row["expected_output"],
+                row.get("expected_tools")
+            ))
+
+        if prev is None:
+            pending.append(i)
+            continue
+
+        matched.append((i, prev))
+
+    plan = ScoringPlan.from_dataset(dataset, [i for i, _ in matched])
+    carried = _score_batch(plan, rows, [
+        (i, position, prev["actual_output"], set(prev.get("actual_tools") or []))
+        for position, (i, prev) in enumerate(matched)
+    ])
+    for result in carried:
+        result["carried_forward"] = True
+
+    return carried, pending
+
+
+def evaluate_incremental(
+    agent_fn: Callable[[str], Any],
+    dataset: dict,
+    previous_results: List[Dict],
+    rerun_if: Optional[Callable[[dict], bool]] = None,
+    max_concurrency: int = 1,
+    row_timeout: Optional[float] = None,
+    verbose: bool = True
+) -> Tuple[float, List[Dict]]:
+    """
+    evaluate(), but only rows that changed since previous_results
+    are sent to the agent. Score comes from the merged results.
+    previous_results must come from the same agent version.
+    """
+
+    carried, pending = carry_forward_results(dataset, previous_results, rerun_if)
+
+    if verbose:
+        print(
+            f"\nRunning Evaluation (incremental: {len(pending)} changed, "
+            f"{len(carried)} carried forward)\n"
+        )
+
+    results = carried + list(iter_evaluate(
+        agent_fn,
+        dataset,
+        row_indices=pending,
+        max_concurrency=max_concurrency,
+        row_timeout=row_timeout
+    ))
+    results.sort(key=lambda r: r["row_index"])
+
+    if verbose:
+        for result in results:
+            print_row(result)
+
+    rules = dataset.get("evaluation_rules", {})
+    return _final_score(results, rules), results
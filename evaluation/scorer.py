@@ -1,2 +1,217 @@
+# --------------------------------------------------
+# Response Scoring Engine (compiled + vectorized)
+# --------------------------------------------------
+
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+NUMBER_PATTERN = re.compile(r"-?\d+(\.\d+)?")
+
+KIND_EXACT = "exact"
+KIND_NUMERIC = "numeric"
+KIND_APPROX = "approximate"
+KIND_ERROR = "error"
+
+
 def score_row(expected, actual):
     return 1.0 if actual == expected else 0.0
+
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+def normalize(text: Any) -> str:
+    return str(text).strip().lower()
+
+
+def extract_number(text: str) -> Optional[float]:
+    if not text:
+        return None
+    match = NUMBER_PATTERN.search(text)
+    return float(match.group()) if match else None
+
+
+# --------------------------------------------------
+# Compiled matcher (one per expected output)
+# --------------------------------------------------
+@dataclass(frozen=True)
+class Matcher:
+    """
+    Expected output compiled once.
+
+    kind is descriptive (exact / numeric / approximate / error);
+    every kind applies the same rules as runner.is_correct:
+    substring either way, numeric tolerance, "approx" wildcard.
+    """
+    text: str
+    number: float          # NaN when the expected output has no number
+    approx: bool
+    kind: str
+
+    def matches(self, actual: Any, tolerance: float = 0.3) -> bool:
+        if not actual:
+            return False
+
+        act = normalize(actual)
+
+        # Exact / substring
+        if self.text == act or self.text in act or act in self.text:
+            return True
+
+        if math.isnan(self.number):
+            return False
+
+        act_num = extract_number(act)
+        if act_num is None:
+            return False
+
+        # Numeric tolerance
+        if abs(self.number - act_num) <= tolerance:
+            return True
+
+        # Approximate answers
+        return self.approx
+
+
+@lru_cache(maxsize=65536)
+def _compile(text: str) -> Matcher:
+    number = extract_number(text)
+
+    if text.startswith("error"):
+        kind = KIND_ERROR
+    elif number is None:
+        kind = KIND_EXACT
+    elif "approx" in text:
+        kind = KIND_APPROX
+    else:
+        kind = KIND_NUMERIC
+
+    return Matcher(
+        text=text,
+        number=math.nan if number is None else number,
+        approx="approx" in text,
+        kind=kind
+    )
+
+
+def compile_expected(expected: Any) -> Matcher:
+    return _compile(normalize(expected))
+
+
+# --------------------------------------------------
+# Scoring plan (whole batch at once)
+# --------------------------------------------------
+class ScoringPlan:
+    """
+    Matchers for a list of expected outputs, scored in bulk.
+
+    Text checks run once per row; number extraction only runs
+    for rows that still need it, and all numeric comparisons
+    are done as NumPy array operations.
+    """
+
+    def __init__(self, expected_outputs: Iterable[Any], tolerance: float = 0.3):
+        self.matchers: List[Matcher] = [compile_expected(e) for e in expected_outputs]
+        self.tolerance = tolerance
+
+        self._texts = [m.text for m in self.matchers]
+        self._numbers = np.array([m.number for m in self.matchers], dtype=float)
+        self._approx = np.array([m.approx for m in self.matchers], dtype=bool)
+        self._has_number = ~np.isnan(self._numbers)
+
+    @classmethod
+    def from_dataset(
+        cls,
+        dataset: dict,
+        row_indices: Optional[Sequence[int]] = None
+    ) -> "ScoringPlan":
+        """
+        Plan for dataset rows (all, or row_indices in that
+        order: plan position k is row row_indices[k]).
+        """
+        rows = dataset["rows"]
+        if row_indices is None:
+            row_indices = range(len(rows))
+
+        rules = dataset.get("evaluation_rules", {})
+        return cls(
+            (rows[i]["expected_output"] for i in row_indices),
+            tolerance=rules.get("numeric_tolerance", 0.3)
+        )
+
+    def __len__(self) -> int:
+        return len(self.matchers)
+
+    def score(
+        self,
+        actual_outputs: List[Any],
+        positions: Optional[Sequence[int]] = None
+    ) -> np.ndarray:
+        """
+        Boolean pass/fail per row, same semantics as is_correct.
+
+        positions selects the plan rows actual_outputs belong to
+        (default: all of them, in order), so finished rows can
+        be scored batch by batch.
+        """
+        if positions is None:
+            if len(actual_outputs) != len(self.matchers):
+                raise ValueError(
+                    f"Expected {len(self.matchers)} outputs, got {len(actual_outputs)}"
+                )
+            texts, numbers, approx = self._texts, self._numbers, self._approx
+            has_number = self._has_number
+        else:
+            if len(actual_outputs) != len(positions):
+                raise ValueError(
+                    f"Expected {len(positions)} outputs, got {len(actual_outputs)}"
+                )
+            index = np.asarray(positions, dtype=np.intp)
+            texts = [self._texts[p] for p in positions]
+            numbers, approx = self._numbers[index], self._approx[index]
+            has_number = self._has_number[index]
+
+        present = np.fromiter(
+            (bool(a) for a in actual_outputs),
+            dtype=bool,
+            count=len(actual_outputs)
+        )
+        actual = [str(a).strip().lower() if a else "" for a in actual_outputs]
+
+        # Exact / substring
+        text_ok = np.fromiter(
+            (e == a or e in a or a in e for e, a in zip(texts, actual)),
+            dtype=bool,
+            count=len(actual)
+        )
+        text_ok &= present
+
+        # Numeric tolerance + approximate answers
+        pending = np.flatnonzero(present & ~text_ok & has_number).tolist()
+
+        # Outputs repeat a lot (errors, refusals): extract each once
+        seen = {}
+        values = []
+        for i in pending:
+            text = actual[i]
+            value = seen.get(text)
+            if value is None:
+                match = NUMBER_PATTERN.search(text)
+                value = float(match.group()) if match else math.nan
+                seen[text] = value
+            values.append(value)
+
+        act_numbers = np.full(len(actual), np.nan)
+        act_numbers[pending] = values
+
+        has_act = ~np.isnan(act_numbers)
+        with np.errstate(invalid="ignore"):
+            numeric_ok = np.abs(numbers - act_numbers) <= self.tolerance
+
+        return text_ok | (has_act & (numeric_ok | approx))
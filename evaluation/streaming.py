@@ -0,0 +1,214 @@
+# --------------------------------------------------
+# Streaming Evaluation (incremental persistence + resume)
+# --------------------------------------------------
+
+from typing import Callable, Any, Optional, Dict
+
+from evaluation.runner import (
+    iter_evaluate,
+    compute_score,
+    carry_forward_results,
+    print_row,
+)
+from evaluation.evaluation_writer import (
+    open_evaluation_artifact,
+    append_evaluation_artifact,
+    close_evaluation_artifact,
+    render_text_report,
+)
+from memory.evaluation_repository import (
+    start_evaluation_run,
+    append_evaluation_rows,
+    finish_evaluation_run,
+    fetch_evaluation_run,
+    fetch_evaluation_rows,
+    fetch_latest_run_id,
+)
+from memory.dataset_repository import load_dataset
+from deployment.gate import should_deploy
+
+
+FLUSH_BATCH_SIZE = 50
+
+
+def run_streaming_evaluation(
+    agent_fn: Callable[[str], Any],
+    dataset: dict,
+    agent_type: str,
+    agent_name: Optional[str] = None,
+    agent_fingerprint: Optional[str] = None,
+    run_id: Optional[int] = None,
+    batch_size: int = FLUSH_BATCH_SIZE,
+    max_concurrency: int = 1,
+    row_timeout: Optional[float] = None,
+    incremental: bool = False,
+    rerun_if: Optional[Callable[[dict], bool]] = None,
+    backend: str = "thread",
+    memory_limit_mb: Optional[int] = None,
+    text_report: bool = True,
+    verbose: bool = True
+) -> Dict:
+    """
+    Evaluate while persisting.
+
+    Row results are flushed every batch_size rows to
+    evaluation_rows and to the run's columnar artifact, so only
+    counters are kept in memory. text_report renders the
+    .txt report from the artifact once the run closes. Pass run_id to resume an
+    interrupted run: rows already stored are not re-run.
+
+    agent_type is the dataset's agent type; agent_name (optional)
+    tells agents of that type apart in evaluation_runs.
+
+    agent_fingerprint (e.g. agent_cache.code_fingerprint) is
+    stored on the run. incremental=True starts from the last
+    finished run of the same dataset_name + agent_type
+    (+ agent_name) AND agent_fingerprint: unchanged rows are
+    carried forward (see runner.carry_forward_results) and only
+    changed rows reach the agent. Outputs of a different agent
+    version are never reused; without a fingerprint every row
+    is re-run.
+
+    backend / memory_limit_mb are passed to runner.iter_evaluate
+    ("process" isolates each row in a warm worker process).
+
+    Returns {"run_id", "score", "passed", "failed_rows",
+    "artifact_path", "report_path" (None without text_report)}.
+    """
+
+    rows = dataset["rows"]
+    rules = dataset.get("evaluation_rules", {})
+
+    # --------------------------------------------------
+    # New run or resume
+    # --------------------------------------------------
+    if run_id is None:
+        previous_run_id = None
+        if incremental and agent_fingerprint is None:
+            if verbose:
+                print("Incremental evaluation needs an agent fingerprint; re-running every row")
+        elif incremental:
+            previous_run_id = fetch_latest_run_id(
+                dataset["dataset_name"], agent_type, agent_name, agent_fingerprint
+            )
+
+        run_id = start_evaluation_run(
+            dataset["dataset_name"], agent_type, agent_name, agent_fingerprint
+        )
+        done = []
+
+        if previous_run_id is not None:
+            done, _ = carry_forward_results(
+                dataset,
+                fetch_evaluation_rows(previous_run_id),
+                rerun_if
+            )
+            append_evaluation_rows(run_id, done)
+
+            if verbose:
+                print(
+                    f"Carried forward {len(done)} unchanged row(s) "
+                    f"from run_id={previous_run_id}"
+                )
+    else:
+        done = fetch_evaluation_rows(run_id)
+
+    artifact_path = open_evaluation_artifact(dataset, run_id, done)
+
+    completed = {r["row_index"] for r in done}
+    pending = [i for i in range(len(rows)) if i not in completed]
+
+    tool_correct = sum(bool(r["tool_passed"]) for r in done)
+    response_correct = sum(bool(r["response_passed"]) for r in done)
+    failed_rows = sum(not r["passed"] for r in done)
+
+    if verbose:
+        print(
+            f"\nRunning Evaluation (run_id={run_id}, "
+            f"{len(pending)} of {len(rows)} rows pending)\n"
+        )
+
+    # --------------------------------------------------
+    # Evaluate + flush in batches
+    # --------------------------------------------------
+    batch = []
+
+    def flush():
+        append_evaluation_rows(run_id, batch)
+        append_evaluation_artifact(artifact_path, batch)
+        batch.clear()
+
+    for result in iter_evaluate(
+        agent_fn,
+        dataset,
+        row_indices=pending,
+        max_concurrency=max_concurrency,
+        row_timeout=row_timeout,
+        backend=backend,
+        memory_limit_mb=memory_limit_mb
+    ):
+        tool_correct += result["tool_passed"]
+        response_correct += result["response_passed"]
+        failed_rows += not result["passed"]
+
+        batch.append(result)
+        if len(batch) >= batch_size:
+            flush()
+
+        if verbose:
+            print_row(result)
+
+    flush()
+
+    # --------------------------------------------------
+    # Close the run
+    # --------------------------------------------------
+    score = compute_score(tool_correct, response_correct, len(rows), rules)
+    passed = should_deploy(score)
+
+    finish_evaluation_run(run_id, score, passed)
+    close_evaluation_artifact(artifact_path, score, {
+        "rows": len(rows),
+        "passed_rows": len(rows) - failed_rows,
+        "tool_passed_rows": tool_correct,
+        "response_passed_rows": response_correct,
+    })
+
+    report_path = render_text_report(artifact_path) if text_report else None
+
+    return {
+        "run_id": run_id,
+        "score": score,
+        "passed": passed,
+        "failed_rows": failed_rows,
+        "artifact_path": artifact_path,
+        "report_path": report_path,
+    }
+
+
+def resume_streaming_evaluation(
+    agent_fn: Callable[[str], Any],
+    run_id: int,
+    **kwargs
+) -> Dict:
+    """
+    Resume an interrupted run using the dataset stored
+    under the run's dataset_name.
+    """
+    run = fetch_evaluation_run(run_id)
+    if run is None:
+        raise ValueError(f"Unknown evaluation run: {run_id}")
+
+    dataset = load_dataset(run["dataset_name"])
+    if dataset is None:
+        raise ValueError(f"Dataset not found: {run['dataset_name']}")
+
+    return run_streaming_evaluation(
+        agent_fn,
+        dataset,
+        agent_type=run["agent_type"],
+        agent_name=run["agent_name"],
+        agent_fingerprint=run["agent_fingerprint"],
+        run_id=run_id,
+        **kwargs
+    )
@@ -1,19 +1,31 @@
 import json
 import re
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Tuple
 
-from llm.ollama_client import OllamaClient
-from config.settings import OLLAMA_BASE_URL, OLLAMA_MODEL
+from llm.ollama_client import get_shared_client
+from llm.json_stream import DatasetStreamParser, StreamError
+from llm.prompt_builder import Prompt, PromptBuilder, estimate_tokens
+from datasets.validator import validate_dataset, validate_row
+from config.settings import OLLAMA_MAX_CONCURRENCY, DATASET_STREAMING
+from memory.dedup_index import PromptIndex
+from tracing.tracer import span
 
 # --------------------------------------------------
-# Ollama client
+# Ollama client (shared, pooled)
 # --------------------------------------------------
-llm = OllamaClient(
-    model=OLLAMA_MODEL,
-    base_url=OLLAMA_BASE_URL
-)
+llm = get_shared_client()
 
 MAX_ATTEMPTS = 3
+MAX_REPAIR_ROUNDS = 2
+
+# Output budget reserved in the context window
+OUTPUT_TOKENS_PER_ROW = 80
+OUTPUT_TOKENS_OVERHEAD = 200
+
+# Top-level keys validate_dataset requires besides rows
+HEADER_KEYS = ["dataset_name", "intent", "agent_type", "evaluation_rules"]
 
 
 # --------------------------------------------------
@@ -35,70 +47,55 @@ def _extract_json(text: str) -> dict:
 # --------------------------------------------------
 # Dataset normalization (STRUCTURAL ONLY)
 # --------------------------------------------------
-def _normalize_dataset(dataset: dict) -> dict:
+def _normalize_row(i: int, row) -> dict:
     """
-    Enforce REQUIRED structure.
+    Enforce REQUIRED structure of one row.
     Never invent or auto-fill ground truth.
     """
-    if "rows" not in dataset or not isinstance(dataset["rows"], list):
-        raise ValueError("Dataset missing 'rows' list")
+    if not isinstance(row, dict):
+        raise ValueError(f"Row {i} is not an object")
 
-    for i, row in enumerate(dataset["rows"]):
-        if "input_prompt" not in row:
-            raise ValueError(f"Row {i} missing input_prompt")
+    if "input_prompt" not in row:
+        raise ValueError(f"Row {i} missing input_prompt")
 
-        if "expected_output" not in row:
-            # 🚫 NEVER auto-fill gold answers
-            raise ValueError(f"Row {i} missing expected_output")
+    if "expected_output" not in row:
+        # 🚫 NEVER auto-fill gold answers
+        raise ValueError(f"Row {i} missing expected_output")
 
-        if "difficulty" not in row:
-            raise ValueError(f"Row {i} missing difficulty")
+    if "difficulty" not in row:
+        raise ValueError(f"Row {i} missing difficulty")
 
-        # Auto-fix expected_tools ONLY (safe)
-        if "expected_tools" not in row or row["expected_tools"] is None:
-            row["expected_tools"] = []
+    # Auto-fix expected_tools ONLY (safe)
+    if "expected_tools" not in row or row["expected_tools"] is None:
+        row["expected_tools"] = []
 
-        if not isinstance(row["expected_tools"], list):
-            raise ValueError(
-                f"Row {i} expected_tools must be a list"
-            )
+    if not isinstance(row["expected_tools"], list):
+        raise ValueError(
+            f"Row {i} expected_tools must be a list"
+        )
 
-    return dataset
+    return row
 
 
 # --------------------------------------------------
-# Dataset writer (LLM + optional human guidance)
+# Prompt construction
 # --------------------------------------------------
-def write_dataset(
-    gravity,
-    internet,
-    domain,
-    history,
-    gan_plan,
-    human_feedback: Optional[dict] = None
-):
-    """
-    Generate a GOLD-STANDARD test dataset.
-
-    Human feedback is OPTIONAL:
-    - If provided and send_to_llm=true, it influences generation
-    - Human overrides are applied OUTSIDE this file
-    """
-
-    # ----------------------------------------------
-    # Optional human guidance to LLM
-    # ----------------------------------------------
-    human_prompt = ""
+def _human_prompt(human_feedback: Optional[dict]) -> str:
     if human_feedback and human_feedback.get("send_to_llm"):
-        human_prompt = f"""
+        return f"""
 HUMAN DOMAIN EXPERT GUIDANCE (HIGH PRIORITY):
 {json.dumps(human_feedback.get("llm_guidance", {}), indent=2)}
 """
+    return ""
 
-    # ----------------------------------------------
-    # Base prompt
-    # ----------------------------------------------
-    base_prompt = f"""
+
+def _prompt_prefix(gravity, internet, domain) -> str:
+    """
+    Everything that is the same for every call of a process:
+    role, rules, domain, constraints and the format spec.
+    Sent as the system message so Ollama encodes it once.
+    """
+    return f"""
 You are a senior QA engineer designing GOLD-STANDARD test datasets
 for evaluating an AI agent.
 
@@ -107,20 +104,16 @@ Your task:
 - The dataset must be realistic, precise, and human-like
 - The dataset will be used for automated evaluation and deployment gating
 
-CONTEXT
--------
+RULES AND DOMAIN
+----------------
 Rules: {gravity}
 Guidelines: {internet}
 Agent Domain: {domain}
-Previous datasets (do NOT duplicate): {history}
-Edge-case plan (GAN-inspired): {gan_plan}
-
-{human_prompt}
 
 CRITICAL CONSTRAINTS
 -------------------
 1. Output ONLY valid JSON
-2. Use EXACTLY 10 rows
+2. Use EXACTLY the number of rows the request asks for
 3. Every row MUST include:
    - input_prompt
    - expected_output
@@ -158,25 +151,283 @@ DATASET FORMAT
 }}
 """
 
-    last_error = None
 
-    # ----------------------------------------------
-    # Retry loop (STRICT)
-    # ----------------------------------------------
-    for attempt in range(1, MAX_ATTEMPTS + 1):
-        try:
-            response = llm.generate(base_prompt)
+def _prompt_suffix(
+    history: list,
+    gan_plan,
+    human_prompt: str,
+    row_count: int,
+    shard_prompt: str
+) -> str:
+    return f"""
+REQUEST
+-------
+Previous datasets (do NOT duplicate): {json.dumps(history, default=str)}
+Edge-case plan (GAN-inspired): {gan_plan}
+{human_prompt}{shard_prompt}
+Use EXACTLY {row_count} rows.
+"""
 
-            dataset = _extract_json(response)
-            dataset = _normalize_dataset(dataset)
 
-            return dataset
+def _build_prompt(
+    builder: PromptBuilder,
+    history,
+    gan_plan,
+    human_prompt: str = "",
+    row_count: int = 10,
+    shard_prompt: str = ""
+) -> Prompt:
+    """
+    Fit the request into the context window: the oldest
+    history entries are dropped first, output is reserved
+    at OUTPUT_TOKENS_PER_ROW per row.
+    """
+    return builder.build(
+        lambda items: _prompt_suffix(items, gan_plan, human_prompt, row_count, shard_prompt),
+        items=history if isinstance(history, list) else [history],
+        reserve_tokens=OUTPUT_TOKENS_PER_ROW * row_count + OUTPUT_TOKENS_OVERHEAD
+    )
 
+
+# --------------------------------------------------
+# One LLM completion, checked row by row
+# --------------------------------------------------
+def _check_row(i: int, row) -> dict:
+    row = _normalize_row(i, row)
+    validate_row(i, row)
+    return row
+
+
+def _check_rows(rows: list) -> Tuple[List[Tuple[int, dict]], List[Dict]]:
+    """
+    Split rows into accepted (index, row) pairs and rejected
+    {"index", "error", "text"} entries.
+    """
+    accepted, rejected = [], []
+
+    for i, row in enumerate(rows):
+        try:
+            accepted.append((i, _check_row(i, row)))
         except ValueError as e:
-            last_error = e
+            rejected.append({"index": i, "error": str(e), "text": json.dumps(row)})
+
+    return accepted, rejected
+
+
+def _stream_dataset(prompt: Prompt, refresh: bool) -> Tuple[DatasetStreamParser, Optional[StreamError]]:
+    """
+    Feed one streamed generation through the parser.
+
+    On an unrecoverable structural error the HTTP stream is
+    closed right away (Ollama stops generating) and the error
+    is returned next to the rows parsed so far.
+    """
+    parser = DatasetStreamParser(_check_row)
+    usage: Dict[str, int] = {}
+    chunks = llm.stream(prompt.suffix, refresh=refresh, system=prompt.prefix, usage=usage)
+    error = None
+
+    with span("llm.stream", model=llm.model) as s:
+        try:
+            for chunk in chunks:
+                parser.feed(chunk)
+            parser.finish()
+        except StreamError as e:
+            error = e
+        finally:
+            chunks.close()
+
+        s.set(
+            rows=len(parser.rows),
+            rejected=len(parser.rejected),
+            error=error is not None,
+            **usage
+        )
+
+    return parser, error
+
+
+def _complete(
+    prompt: Prompt,
+    refresh: bool
+) -> Tuple[dict, List[Tuple[int, dict]], List[Dict], Optional[ValueError]]:
+    """
+    One generation → (top-level keys, accepted (index, row) pairs,
+    rejected rows, structural error or None).
+
+    Streams when DATASET_STREAMING is on; otherwise parses the
+    full response.
+    """
+    if DATASET_STREAMING:
+        parser, error = _stream_dataset(prompt, refresh)
+        return parser.header, list(zip(parser.indices, parser.rows)), parser.rejected, error
+
+    response = llm.generate(prompt.suffix, refresh=refresh, system=prompt.prefix)
+
+    try:
+        data = _extract_json(response)
+    except ValueError as e:  # includes JSONDecodeError
+        return {}, [], [], e
+
+    rows = data.pop("rows", None)
+    if not isinstance(rows, list):
+        return data, [], [], ValueError("Dataset missing 'rows' list")
+
+    accepted, rejected = _check_rows(rows)
+    return data, accepted, rejected, None
+
+
+# --------------------------------------------------
+# Row repair (regenerate only the rejected rows)
+# --------------------------------------------------
+def _repair_prompt(header: dict, rejected: List[Dict]) -> str:
+    listing = "\n".join(
+        f"{n}. error: {item['error']}\n   row: {item['text']}"
+        for n, item in enumerate(rejected, start=1)
+    )
+
+    # Rules and row format come from the shared prefix
+    return f"""
+REPAIR REQUEST
+--------------
+These rows of the dataset "{header.get("dataset_name", "")}"
+(intent: {header.get("intent", "")}, agent type: {header.get("agent_type", "")})
+were rejected by validation. Fix each row, keeping its scenario;
+change only what the error requires.
+
+{listing}
+
+Output ONLY valid JSON: {{"rows": [...]}} with EXACTLY {len(rejected)} rows,
+one per rejected row, in the same order.
+"""
+
+
+def _repair_rows(
+    prompt: Prompt,
+    header: dict,
+    rejected: List[Dict],
+    label: str
+) -> Tuple[List[Tuple[int, dict]], List[Dict]]:
+    """
+    Ask the LLM to regenerate only the rejected rows (with
+    their errors), up to MAX_REPAIR_ROUNDS times. The request
+    reuses the generation prompt's prefix (and its KV cache).
+
+    Returns (repaired (index, row) pairs, rows still rejected).
+    """
+    repaired = []
+
+    for round_ in range(1, MAX_REPAIR_ROUNDS + 1):
+        if not rejected:
+            break
+
+        _, accepted, failed, error = _complete(
+            prompt.with_suffix(_repair_prompt(header, rejected)),
+            refresh=round_ > 1
+        )
+
+        # Positions in the repair response → original row indices
+        fixed = {rejected[pos]["index"]: row for pos, row in accepted if pos < len(rejected)}
+        failures = {item["index"]: item for item in failed}
+
+        remaining = []
+        for pos, item in enumerate(rejected):
+            if item["index"] in fixed:
+                continue
+            if pos in failures:
+                item = {**item, "error": failures[pos]["error"], "text": failures[pos]["text"]}
+            remaining.append(item)
+
+        print(
+            f"{label}: repair round {round_} fixed {len(fixed)}/{len(rejected)} row(s)"
+            + (f" ({error})" if error else "")
+        )
+
+        repaired.extend(fixed.items())
+        rejected = remaining
+
+    return repaired, rejected
+
+
+# --------------------------------------------------
+# LLM call with retries
+# --------------------------------------------------
+def _drop_near_duplicates(dataset: dict, dedup_index: PromptIndex, label: str) -> None:
+    if not isinstance(dataset.get("rows"), list):
+        return  # structural problem, reported by _normalize_row
+
+    dataset["rows"], rejected = dedup_index.filter_rows(dataset["rows"])
+    if rejected:
+        print(f"{label}: rejected {len(rejected)} near-duplicate row(s)")
+
+
+def _generate_with_retries(
+    prompt: Prompt,
+    label: str = "Dataset",
+    dedup_index: Optional[PromptIndex] = None,
+    min_rows: int = 0
+) -> Tuple[dict, int]:
+    """
+    Returns (normalized dataset, attempts used).
+
+    Rows failing normalization / validation are repaired in
+    place (_repair_rows) instead of regenerating the dataset;
+    rows that cannot be repaired are dropped. Valid rows and
+    top-level keys are kept across attempts, so a full retry
+    only happens when required keys are missing or fewer than
+    min_rows (at least 1) rows survive.
+
+    With a dedup_index, near-duplicate rows are dropped as well.
+    """
+    header: Dict = {}
+    rows: List[Dict] = []
+    seen = set()
+    last_error = None
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        # A retry must not be served the rejected cached response
+        part, accepted, rejected, error = _complete(prompt, refresh=attempt > 1)
+
+        for key, value in part.items():
+            header.setdefault(key, value)
+
+        if error is not None:
             print(
-                f"Dataset generation attempt {attempt} failed: {e}"
+                f"{label} generation attempt {attempt} stopped early: {error} "
+                f"(kept {len(accepted)} row(s))"
+            )
+
+        if rejected:
+            for item in rejected:
+                print(f"{label}: {item['error']}")
+
+            repaired, rejected = _repair_rows(prompt, header, rejected, label)
+            accepted = sorted(accepted + repaired, key=lambda pair: pair[0])
+
+            if rejected:
+                print(f"{label}: dropped {len(rejected)} unrepairable row(s)")
+
+        for _, row in accepted:
+            key = _dedupe_key(row)
+            if key not in seen:
+                seen.add(key)
+                rows.append(row)
+
+        dataset = {**header, "rows": rows}
+        if dedup_index is not None:
+            _drop_near_duplicates(dataset, dedup_index, label)
+
+        missing = [key for key in HEADER_KEYS if key not in header]
+        if missing:
+            last_error = ValueError(f"Dataset missing required key(s): {missing}")
+        elif len(dataset["rows"]) < max(min_rows, 1):
+            last_error = ValueError(
+                f"Only {len(dataset['rows'])} valid rows, need {max(min_rows, 1)}"
             )
+        else:
+            return dataset, attempt
+
+        print(f"{label} generation attempt {attempt} failed: {last_error}")
 
     # ----------------------------------------------
     # Hard fail after retries
@@ -185,3 +436,226 @@ DATASET FORMAT
         f"Failed to generate valid dataset after {MAX_ATTEMPTS} attempts.\n"
         f"Last error: {last_error}"
     )
+
+
+# --------------------------------------------------
+# Dataset writer (LLM + optional human guidance)
+# --------------------------------------------------
+def write_dataset(
+    gravity,
+    internet,
+    domain,
+    history,
+    gan_plan,
+    human_feedback: Optional[dict] = None,
+    dedup_index: Optional[PromptIndex] = None
+):
+    """
+    Generate a GOLD-STANDARD test dataset.
+
+    Human feedback is OPTIONAL:
+    - If provided and send_to_llm=true, it influences generation
+    - Human overrides are applied OUTSIDE this file
+
+    dedup_index (optional) rejects rows that near-duplicate
+    historical prompts before validation.
+    """
+
+    base_prompt = _build_prompt(
+        PromptBuilder(_prompt_prefix(gravity, internet, domain)),
+        history,
+        gan_plan,
+        human_prompt=_human_prompt(human_feedback)
+    )
+
+    dataset, _ = _generate_with_retries(
+        base_prompt,
+        dedup_index=dedup_index,
+        min_rows=10
+    )
+    return dataset
+
+
+# --------------------------------------------------
+# Sharded writer (large datasets, concurrent LLM calls)
+# --------------------------------------------------
+def _plan_shards(gan_plan: dict, shard_size: int) -> List[Dict]:
+    """
+    Split gan_plan["row_distribution"] into jobs of at most
+    shard_size rows, one row category per job.
+    """
+    shards = []
+
+    for category, count in gan_plan.get("row_distribution", {}).items():
+        remaining = int(count)
+        while remaining > 0:
+            size = min(shard_size, remaining)
+            shards.append({"category": category, "row_count": size})
+            remaining -= size
+
+    for i, shard in enumerate(shards):
+        shard["shard"] = i
+
+    return shards
+
+
+def _shard_prompt(shard: dict, total_shards: int, edge_patterns: list) -> str:
+    return f"""
+SHARD INSTRUCTIONS
+------------------
+This request is shard {shard["shard"] + 1} of {total_shards} of ONE larger dataset.
+Generate ONLY "{shard["category"]}" rows.
+Edge patterns to draw from: {edge_patterns}
+Vary scenarios and wording; other shards cover the same category.
+"""
+
+
+def _fit_shard_size(
+    builder: PromptBuilder,
+    gan_plan: dict,
+    human_prompt: str,
+    edge_patterns: list,
+    shard_size: int
+) -> int:
+    """
+    Largest shard size (up to shard_size) whose output reserve
+    fits num_ctx next to the prefix and a history-free suffix.
+    """
+    categories = list(gan_plan.get("row_distribution", {})) or [""]
+    # Total rows bounds the shard count rendered in the shard prompt
+    total = sum(int(c) for c in gan_plan.get("row_distribution", {}).values()) or 1
+    probe = {"shard": total - 1, "category": max(categories, key=len)}
+
+    suffix = _prompt_suffix(
+        [], gan_plan, human_prompt, shard_size,
+        _shard_prompt(probe, total, edge_patterns)
+    )
+    free = builder.num_ctx - builder.prefix_tokens - estimate_tokens(suffix) - OUTPUT_TOKENS_OVERHEAD
+    fit = free // OUTPUT_TOKENS_PER_ROW
+
+    if fit < 1:
+        raise ValueError(
+            f"Dataset prompt leaves no room for output rows in num_ctx={builder.num_ctx}"
+        )
+
+    if fit < shard_size:
+        print(f"Shard size {shard_size} exceeds the context budget, using {fit}")
+        return fit
+
+    return shard_size
+
+
+def _dedupe_key(row: dict) -> str:
+    return " ".join(str(row["input_prompt"]).lower().split())
+
+
+def write_dataset_sharded(
+    gravity,
+    internet,
+    domain,
+    history,
+    gan_plan,
+    human_feedback: Optional[dict] = None,
+    shard_size: int = 10,
+    max_workers: int = OLLAMA_MAX_CONCURRENCY,
+    dedup_index: Optional[PromptIndex] = None
+) -> Tuple[dict, List[Dict]]:
+    """
+    Generate a large dataset as many small concurrent LLM jobs.
+
+    The gan_plan row_distribution is split into shards of at
+    most shard_size rows (lowered to what fits num_ctx). Shards are generated in parallel,
+    each with its own retry budget, then merged and
+    de-duplicated on input_prompt (and, with a dedup_index,
+    against near-duplicates of history and of other shards).
+
+    Returns (dataset, shard_reports). Each report records the
+    shard's category, requested / returned rows, attempts,
+    wall time in seconds and error (if the shard failed).
+    """
+
+    human_prompt = _human_prompt(human_feedback)
+    builder = PromptBuilder(_prompt_prefix(gravity, internet, domain))
+    edge_patterns = gan_plan.get("edge_patterns", [])
+    shard_size = _fit_shard_size(builder, gan_plan, human_prompt, edge_patterns, shard_size)
+    shards = _plan_shards(gan_plan, shard_size)
+
+    if not shards:
+        raise ValueError("gan_plan row_distribution is empty")
+
+    def run_shard(shard: dict) -> Tuple[Optional[dict], Dict]:
+        prompt = _build_prompt(
+            builder,
+            history,
+            gan_plan,
+            human_prompt=human_prompt,
+            row_count=shard["row_count"],
+            shard_prompt=_shard_prompt(shard, len(shards), edge_patterns)
+        )
+
+        report = {
+            "shard": shard["shard"],
+            "category": shard["category"],
+            "requested_rows": shard["row_count"],
+            "returned_rows": 0,
+            "attempts": MAX_ATTEMPTS,
+            "seconds": 0.0,
+            "error": None,
+        }
+
+        start = time.perf_counter()
+        try:
+            part, report["attempts"] = _generate_with_retries(
+                prompt,
+                label=f"Shard {shard['shard']}"
+            )
+            report["returned_rows"] = len(part["rows"])
+        except RuntimeError as e:
+            part = None
+            report["error"] = str(e)
+
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        return part, report
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        outcomes = list(pool.map(run_shard, shards))
+
+    # ----------------------------------------------
+    # Merge + de-duplicate
+    # ----------------------------------------------
+    parts = [part for part, _ in outcomes if part is not None]
+    reports = [report for _, report in outcomes]
+
+    for report in reports:
+        print(
+            f"Shard {report['shard']} ({report['category']}): "
+            f"{report['returned_rows']}/{report['requested_rows']} rows "
+            f"in {report['seconds']}s"
+            + (f" — FAILED: {report['error']}" if report["error"] else "")
+        )
+
+    if not parts:
+        raise RuntimeError("All dataset shards failed")
+
+    merged = {
+        key: value
+        for key, value in parts[0].items()
+        if key != "rows"
+    }
+    merged["rows"] = []
+
+    seen = set()
+    for part in parts:
+        for row in part["rows"]:
+            key = _dedupe_key(row)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged["rows"].append(row)
+
+    if dedup_index is not None:
+        _drop_near_duplicates(merged, dedup_index, "Merged shards")
+
+    validate_dataset(merged)
+
+    return merged, reports
@@ -0,0 +1,218 @@
+# --------------------------------------------------
+# Incremental dataset JSON parser (streamed LLM output)
+# --------------------------------------------------
+#
+# Fed chunk by chunk, it tracks just enough JSON structure
+# (strings, escapes, bracket stack) to cut out each element of
+# the top-level "rows" array the moment its object closes, and
+# each other top-level member once its value ends. Rows are
+# json.loads-ed and checked one by one; a bad row is rejected
+# without losing its neighbours. Errors that make the rest of
+# the stream unparseable raise StreamError.
+
+import json
+import re
+from typing import Callable, Dict, List, Optional
+
+
+class StreamError(ValueError):
+    """
+    The stream cannot be parsed any further.
+    """
+
+
+_CLOSERS = {"}": "{", "]": "["}
+_STRING_BODY = re.compile(r'[^"\\\n]+')
+
+
+class DatasetStreamParser:
+    """
+    Push parser for {"dataset_name": ..., "rows": [{...}, ...], ...}.
+
+    - text before the first "{" is skipped (LLM preamble)
+    - check_row(index, row) returns the row to keep or raises
+      ValueError; rejected rows land in .rejected as
+      {"index", "error", "text"} (text: the row as generated)
+    - .indices[k] is the position of .rows[k] in the generated array
+    - feed() returns the rows accepted by that chunk
+    - finish() raises StreamError if the object never closed
+    """
+
+    def __init__(self, check_row: Optional[Callable[[int, dict], dict]] = None):
+        self.check_row = check_row
+        self.header: dict = {}
+        self.rows: List[dict] = []
+        self.indices: List[int] = []
+        self.rejected: List[Dict] = []
+        self.done = False
+
+        self._text = ""   # unconsumed tail: from the oldest open key / value / row
+        self._base = 0    # stream offset of self._text[0]
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._started = False
+
+        self._key: Optional[str] = None
+        self._key_start = -1
+        self._value_start = -1
+        self._row_start = -1
+        self._row_index = 0
+
+    # --------------------------------------------------
+    # Public API
+    # --------------------------------------------------
+    def feed(self, chunk: str) -> List[dict]:
+        if self.done or not chunk:
+            return []
+
+        accepted_before = len(self.rows)
+        text = self._text + chunk
+        i = len(self._text)
+
+        while i < len(text) and not self.done:
+            if self._in_string and not self._escape:
+                body = _STRING_BODY.match(text, i)
+                if body:
+                    i = body.end()
+                    continue
+            self._step(text, i, text[i])
+            i += 1
+
+        self._trim(text)
+        return self.rows[accepted_before:]
+
+    def finish(self) -> None:
+        if not self._started:
+            raise StreamError("LLM output did not contain a JSON object")
+        if not self.done:
+            raise StreamError(
+                f"LLM output ended inside the JSON object "
+                f"after {self._row_index} row(s)"
+            )
+
+    def _trim(self, text: str) -> None:
+        """
+        Drop consumed text so long streams stay O(n).
+        """
+        starts = [
+            pos for pos in (
+                self._key_start if self._key is None else -1,
+                self._value_start if self._key != "rows" else -1,
+                self._row_start,
+            )
+            if pos >= 0
+        ]
+        keep = min(starts, default=len(text))
+
+        self._text = text[keep:]
+        self._base += keep
+        if self._key_start >= 0:
+            self._key_start -= keep
+        if self._value_start >= 0:
+            # Only "rows" can start before keep; its text is never re-read
+            self._value_start = max(self._value_start - keep, 0)
+        if self._row_start >= 0:
+            self._row_start -= keep
+
+    # --------------------------------------------------
+    # Scanner
+    # --------------------------------------------------
+    def _step(self, text: str, i: int, c: str) -> None:
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif c == "\\":
+                self._escape = True
+            elif c == '"':
+                self._in_string = False
+                if len(self._stack) == 1 and self._key is None:
+                    self._key = json.loads(text[self._key_start:i + 1])
+                    self._key_start = -1
+            elif c == "\n":
+                # Raw newlines are invalid in JSON strings: a quote went missing
+                raise StreamError(f"Unterminated string at offset {self._base + i}")
+            return
+
+        if not self._started:
+            if c == "{":
+                self._started = True
+                self._stack.append(c)
+            return
+
+        depth = len(self._stack)
+
+        if c == '"':
+            self._in_string = True
+            if depth == 1 and self._key is None:
+                self._key_start = i
+            elif depth == 2 and self._in_rows():
+                raise StreamError(f"Row {self._row_index} is not an object")
+            return
+
+        if c == ":" and depth == 1:
+            if self._key is None or self._value_start >= 0:
+                raise StreamError(f"Expected a key at offset {self._base + i}")
+            self._value_start = i + 1
+
+        elif c == "," and depth == 1:
+            self._end_member(text, i)
+
+        elif c in "{[":
+            if depth == 2 and self._in_rows():
+                if c != "{":
+                    raise StreamError(f"Row {self._row_index} is not an object")
+                self._row_start = i
+            self._stack.append(c)
+
+        elif c in "}]":
+            if self._stack[-1] != _CLOSERS[c]:
+                raise StreamError(f"Mismatched '{c}' at offset {self._base + i}")
+
+            if depth == 1:
+                self._end_member(text, i)
+                self._stack.pop()
+                self.done = True
+                return
+
+            self._stack.pop()
+            if depth == 3 and self._in_rows():
+                self._end_row(text[self._row_start:i + 1])
+
+        elif depth == 2 and self._in_rows() and c not in ", \t\r\n":
+            raise StreamError(f"Row {self._row_index} is not an object")
+
+    def _in_rows(self) -> bool:
+        return self._key == "rows" and self._stack[1:2] == ["["]
+
+    def _end_member(self, text: str, i: int) -> None:
+        if self._key is None:
+            return  # "{}" or a trailing comma
+
+        if self._value_start < 0:
+            raise StreamError(f"Key {self._key!r} has no value")
+
+        if self._key != "rows":
+            try:
+                self.header[self._key] = json.loads(text[self._value_start:i])
+            except json.JSONDecodeError as e:
+                raise StreamError(f"Invalid value for {self._key!r}: {e}")
+
+        self._key = None
+        self._value_start = -1
+
+    def _end_row(self, row_text: str) -> None:
+        index = self._row_index
+        self._row_index += 1
+        self._row_start = -1
+
+        try:
+            row = json.loads(row_text)
+            if self.check_row is not None:
+                row = self.check_row(index, row)
+        except ValueError as e:  # includes JSONDecodeError
+            self.rejected.append({"index": index, "error": str(e), "text": row_text})
+            return
+
+        self.rows.append(row)
+        self.indices.append(index)
@@ -1,28 +1,302 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import weakref
+from typing import Optional, Dict, Any, Iterator, Union
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    OLLAMA_BASE_URL,
+    OLLAMA_MODEL,
+    OLLAMA_TIMEOUT,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_POOL_SIZE,
+    OLLAMA_MAX_CONCURRENCY,
+    OLLAMA_NUM_CTX,
+    OLLAMA_CACHE_ENABLED,
+    OLLAMA_CACHE_PATH,
+    OLLAMA_CACHE_MAX_ENTRIES,
+    OLLAMA_CACHE_REFRESH,
+)
+from memory.disk_cache import DiskCache, make_key
+from tracing.tracer import span
+
+DEFAULT_OPTIONS = {"temperature": 0.2}
+
 
 class OllamaClient:
+    """
+    Ollama chat client with a pooled keep-alive HTTP session.
+
+    - One requests.Session per client (TCP connections are reused)
+    - keep_alive keeps the model loaded between calls
+    - options are passed straight to Ollama (temperature, num_ctx, ...)
+    - agenerate() is the coroutine API, bounded by max_concurrency
+    - stream() yields content chunks as Ollama generates them;
+      closing the iterator early closes the connection, which
+      stops generation
+    - system= is sent as a leading system message: keep it
+      identical across calls so Ollama reuses its KV cache for
+      that prefix (see llm.prompt_builder)
+    - optional DiskCache keyed by model + prompt hash + options
+      (use_cache=False bypasses it, refresh=True re-queries and
+      overwrites the entry)
+    """
+
     def __init__(
         self,
         model: str,
-        base_url: str = "http://localhost:11434"
+        base_url: str = "http://localhost:11434",
+        timeout: float = 300,
+        keep_alive: Optional[Union[str, int]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        pool_size: int = 10,
+        max_concurrency: int = 4,
+        cache: Optional[DiskCache] = None,
+        refresh_cache: bool = False
     ):
         self.model = model
         self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.options = {**DEFAULT_OPTIONS, **(options or {})}
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.refresh_cache = refresh_cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # asyncio.Semaphore is bound to one event loop
+        self._loop_limits = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    # Request helpers
+    # --------------------------------------------------
+    def _payload(
+        self,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        system: Optional[str] = None
+    ) -> dict:
+        messages = [{"role": "user", "content": prompt}]
+        if system is not None:
+            messages.insert(0, {"role": "system", "content": system})
 
-    def generate(self, prompt: str) -> str:
         payload = {
             "model": self.model,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.2,
+            "messages": messages,
+            "stream": stream,
+            "options": {**self.options, **(options or {})},
         }
 
-        r = requests.post(
-            f"{self.base_url}/v1/chat/completions",
-            json=payload,
-            timeout=300,
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+
+        return payload
+
+    def _cache_key(self, payload: dict) -> str:
+        # A single user message hashes as before (existing entries stay valid)
+        prompt = "\0".join(m["content"] for m in payload["messages"])
+        return make_key(
+            model=self.model,
+            prompt_sha256=hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+            options=payload["options"]
         )
 
-        r.raise_for_status()
-        return r.json()["choices"][0]["message"]["content"]
+    @staticmethod
+    def _usage(body: dict) -> Dict[str, int]:
+        """
+        Token counts of a finished response. prompt_tokens only
+        counts tokens Ollama actually evaluated (not the reused
+        KV-cache prefix).
+        """
+        return {
+            "prompt_tokens": body.get("prompt_eval_count", 0),
+            "completion_tokens": body.get("eval_count", 0),
+        }
+
+    def _limit(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sem = self._loop_limits.get(loop)
+            if sem is None:
+                sem = asyncio.Semaphore(self.max_concurrency)
+                self._loop_limits[loop] = sem
+        return sem
+
+    # --------------------------------------------------
+    # Public API
+    # --------------------------------------------------
+    def generate(
+        self,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        refresh: bool = False,
+        system: Optional[str] = None
+    ) -> str:
+        with span("llm.generate", model=self.model) as s:
+            payload = self._payload(prompt, options, system=system)
+
+            cache = self.cache if use_cache else None
+            key = self._cache_key(payload) if cache else None
+
+            if cache and not (refresh or self.refresh_cache):
+                cached = cache.get(key)
+                if cached is not None:
+                    s.set(cached=True)
+                    return cached
+
+            start = time.perf_counter()
+            r = self.session.post(
+                f"{self.base_url}/api/chat",
+                json=payload,
+                timeout=self.timeout,
+            )
+
+            r.raise_for_status()
+            body = r.json()
+            content = body["message"]["content"]
+
+            if cache:
+                cache.set(key, content, cost_seconds=time.perf_counter() - start)
+
+            s.set(cached=False, **self._usage(body))
+            return content
+
+    def stream(
+        self,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        refresh: bool = False,
+        system: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None
+    ) -> Iterator[str]:
+        """
+        Yield the response content chunk by chunk.
+
+        A cache hit is yielded as one chunk. Only a response
+        that ends with Ollama's "done" message is written to the
+        cache. No span
+        here: it would stay open across yields (trace the
+        consuming loop instead). A usage dict is filled with
+        the token counts once the response is done.
+        """
+        payload = self._payload(prompt, options, stream=True, system=system)
+
+        cache = self.cache if use_cache else None
+        key = self._cache_key(payload) if cache else None
+
+        if cache and not (refresh or self.refresh_cache):
+            cached = cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        start = time.perf_counter()
+        parts = []
+        completed = False
+
+        with self.session.post(
+            f"{self.base_url}/api/chat",
+            json=payload,
+            timeout=self.timeout,
+            stream=True,
+        ) as r:
+            r.raise_for_status()
+
+            for line in r.iter_lines():
+                if not line:
+                    continue
+
+                message = json.loads(line)
+                if "error" in message:
+                    raise RuntimeError(f"Ollama error: {message['error']}")
+
+                content = message.get("message", {}).get("content", "")
+                if content:
+                    parts.append(content)
+                    yield content
+
+                if message.get("done"):
+                    completed = True
+                    if usage is not None:
+                        usage.update(self._usage(message))
+                    break
+
+        # A body that ended without "done" (disconnect, truncation) is partial
+        if cache and completed:
+            cache.set(key, "".join(parts), cost_seconds=time.perf_counter() - start)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        refresh: bool = False,
+        system: Optional[str] = None
+    ) -> str:
+        async with self._limit():
+            return await asyncio.to_thread(
+                self.generate,
+                prompt,
+                options,
+                use_cache,
+                refresh,
+                system
+            )
+
+    def close(self):
+        self.session.close()
+
+
+# --------------------------------------------------
+# Shared process-wide client
+# --------------------------------------------------
+_shared_client: Optional[OllamaClient] = None
+_shared_lock = threading.Lock()
+
+
+def _build_cache() -> Optional[DiskCache]:
+    if not OLLAMA_CACHE_ENABLED:
+        return None
+    return DiskCache(
+        OLLAMA_CACHE_PATH,
+        max_entries=OLLAMA_CACHE_MAX_ENTRIES
+    )
+
+
+def get_shared_client() -> OllamaClient:
+    """
+    Client configured from config.settings, shared by the
+    dataset author and LLM-backed agents.
+    """
+    global _shared_client
+
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = OllamaClient(
+                model=OLLAMA_MODEL,
+                base_url=OLLAMA_BASE_URL,
+                timeout=OLLAMA_TIMEOUT,
+                keep_alive=OLLAMA_KEEP_ALIVE,
+                options={"num_ctx": OLLAMA_NUM_CTX},
+                pool_size=OLLAMA_POOL_SIZE,
+                max_concurrency=OLLAMA_MAX_CONCURRENCY,
+                cache=_build_cache(),
+                refresh_cache=OLLAMA_CACHE_REFRESH
+            )
+        return _shared_client
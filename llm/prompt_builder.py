@@ -0,0 +1,82 @@
+# --------------------------------------------------
+# Prefix-stable prompt assembly
+# --------------------------------------------------
+#
+# Ollama keeps the KV cache of the previous request per slot
+# (while the model stays loaded, see OLLAMA_KEEP_ALIVE) and only
+# evaluates the tokens after the longest common prefix. A prompt
+# is therefore split into:
+#
+#   prefix  static instructions + format spec, byte-identical on
+#           every call → sent as the system message, encoded once
+#   suffix  run / shard specific context → the user message
+#
+# and fitted into a fixed num_ctx (changing num_ctx reloads the
+# model, and Ollama silently truncates overlong prompts from the
+# front — i.e. it would cut the cached prefix).
+
+from typing import Any, Callable, List, NamedTuple, Optional
+
+from config.settings import OLLAMA_NUM_CTX
+
+# Llama-3-style BPE averages ~4 characters per token on English / JSON
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+class Prompt(NamedTuple):
+    prefix: str
+    suffix: str
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.prefix) + estimate_tokens(self.suffix)
+
+    def with_suffix(self, suffix: str) -> "Prompt":
+        """
+        Same cached prefix, different request (e.g. row repair).
+        """
+        return Prompt(self.prefix, suffix)
+
+
+class PromptBuilder:
+    """
+    Builds Prompts sharing one prefix, within a token budget:
+
+        prompt tokens + reserve_tokens (expected output) <= num_ctx
+
+    The suffix is rendered by a callable from a list of
+    trimmable items (e.g. history, newest first); items are
+    dropped from the end until the prompt fits.
+    """
+
+    def __init__(self, prefix: str, num_ctx: int = OLLAMA_NUM_CTX):
+        self.prefix = prefix
+        self.num_ctx = num_ctx
+        self.prefix_tokens = estimate_tokens(prefix)
+
+    def build(
+        self,
+        render_suffix: Callable[[List[Any]], str],
+        items: Optional[List[Any]] = None,
+        reserve_tokens: int = 0
+    ) -> Prompt:
+        items = list(items or [])
+        budget = self.num_ctx - reserve_tokens - self.prefix_tokens
+
+        while True:
+            suffix = render_suffix(items)
+            if estimate_tokens(suffix) <= budget:
+                return Prompt(self.prefix, suffix)
+
+            if not items:
+                raise ValueError(
+                    f"Prompt needs ~{self.prefix_tokens + estimate_tokens(suffix) + reserve_tokens} "
+                    f"tokens (incl. {reserve_tokens} reserved for output), "
+                    f"num_ctx is {self.num_ctx}"
+                )
+
+            items.pop()
@@ -1,6 +1,10 @@
 # --------------------------------------------------
 # Imports
 # --------------------------------------------------
+import argparse
+import atexit
+from typing import Optional
+
 from inputs.gravity_rules import GRAVITY_RULES
 from inputs.internet_guidelines import INTERNET_GUIDELINES
 from inputs.domain_expertise import DOMAIN_EXPERTISE
@@ -12,134 +16,266 @@ from datasets.validator import validate_dataset
 
 from memory.dataset_memory_fetcher import fetch_dataset_summaries
 from memory.dataset_repository import save_dataset
-from memory.evaluation_repository import save_evaluation
 
 from agents.sample_math_agent import run_agent
-from evaluation.runner import evaluate
-from evaluation.evaluation_writer import save_evaluation_artifact
+from evaluation.streaming import (
+    run_streaming_evaluation,
+    resume_streaming_evaluation,
+)
+
+from llm.ollama_client import get_shared_client
 
-from deployment.gate import should_deploy
+from memory.evaluation_repository import save_run_timings
+from scripts.migrate import check_schema, SchemaOutOfDate
+from tracing.tracer import span, enable as enable_tracing, get_tracer
+from config.settings import (
+    TRACE_ENABLED,
+    TRACE_EXPORT_PATH,
+    AGENT_CACHE_ENABLED,
+    AGENT_CACHE_DIR,
+    AGENT_FINGERPRINT,
+    INCREMENTAL_EVAL,
+    EVAL_BACKEND,
+    EVAL_MAX_CONCURRENCY,
+    EVAL_ROW_TIMEOUT,
+    EVAL_MEMORY_LIMIT_MB,
+    EVAL_TEXT_REPORT,
+    DEDUP_ENABLED,
+    DEDUP_INDEX_PATH,
+    DEDUP_THRESHOLD,
+)
+from memory.dedup_index import load_prompt_index
+from evaluation.agent_cache import AgentResultCache, code_fingerprint
+from evaluation.process_pool import AgentProcessPool
 
 # Graph (Neo4j)
 from retrieval.graphite_adapter import GraphiteAdapter
 
 
+# --------------------------------------------------
+# Run report + deployment decision
+# --------------------------------------------------
+def _report(summary: dict):
+    print("\nAgent score:", summary["score"])
+    print(f"Evaluation results saved (run_id={summary['run_id']})")
+    print(f"Evaluation artifact saved → {summary['artifact_path']}")
+    if summary["report_path"]:
+        print(f"Evaluation report saved → {summary['report_path']}")
+
+    if summary["passed"]:
+        print("\nDEPLOY AGENT")
+    else:
+        print(f"\nBLOCK DEPLOYMENT — {summary['failed_rows']} failed test(s)")
+
+
+# --------------------------------------------------
+# Tracing output (only when TRACE=1)
+# --------------------------------------------------
+def _save_trace(run_id: int):
+    tracer = get_tracer()
+    if tracer is None:
+        return
+
+    timings = tracer.summary()
+    save_run_timings(run_id, timings)
+
+    path = tracer.export(TRACE_EXPORT_PATH.format(run_id=run_id))
+    print(f"Trace saved → {path}")
+
+    for name, t in sorted(timings.items()):
+        print(f"  {name:<32} {t['count']:>6}x {t['total_ms']:>12.1f} ms")
+
+
+# --------------------------------------------------
+# Agent under test
+# (EVAL_BACKEND=process → worker processes,
+#  AGENT_CACHE=1 → memoized in front of them)
+# --------------------------------------------------
+AGENT_NAME = run_agent.__module__.rsplit(".", 1)[-1]
+
+
+def _agent_fingerprint() -> str:
+    return AGENT_FINGERPRINT or code_fingerprint(run_agent)
+
+
+def _build_agent():
+    agent = run_agent
+
+    if EVAL_BACKEND == "process":
+        agent = AgentProcessPool(
+            run_agent,
+            workers=EVAL_MAX_CONCURRENCY,
+            row_timeout=EVAL_ROW_TIMEOUT,
+            memory_limit_mb=EVAL_MEMORY_LIMIT_MB
+        )
+        atexit.register(agent.close)
+
+    if not AGENT_CACHE_ENABLED:
+        return agent, None
+
+    agent_cache = AgentResultCache(
+        agent_name=AGENT_NAME,
+        fingerprint=_agent_fingerprint(),
+        cache_dir=AGENT_CACHE_DIR
+    )
+    return agent_cache.wrap(agent), agent_cache
+
+
+def _eval_options() -> dict:
+    # The process pool enforces its own row timeout
+    return {
+        "max_concurrency": EVAL_MAX_CONCURRENCY,
+        "row_timeout": None if EVAL_BACKEND == "process" else EVAL_ROW_TIMEOUT,
+        "text_report": EVAL_TEXT_REPORT,
+    }
+
+
 # --------------------------------------------------
 # MAIN PIPELINE
 # --------------------------------------------------
-def main():
+def main(resume_run_id: Optional[int] = None):
     print("\n🚀 Starting Agent Evaluation Pipeline\n")
 
+    # Persistence and history lookups need every migration applied
+    with span("stage.schema_check"):
+        check_schema()
+
+    agent, agent_cache = _build_agent()
+
+    # --------------------------------------------------
+    # Resume an interrupted evaluation run
+    # --------------------------------------------------
+    if resume_run_id is not None:
+        with span("stage.evaluation", resumed=True):
+            summary = resume_streaming_evaluation(
+                agent,
+                resume_run_id,
+                **_eval_options()
+            )
+        _report(summary)
+        _save_trace(summary["run_id"])
+        return
+
     # --------------------------------------------------
     # Fetch previous dataset memory (avoid duplicates)
     # --------------------------------------------------
-    history = fetch_dataset_summaries(
-        DOMAIN_EXPERTISE["agent_type"]
-    )
+    with span("stage.history_fetch"):
+        history = fetch_dataset_summaries(
+            DOMAIN_EXPERTISE["agent_type"]
+        )
 
     # --------------------------------------------------
     # Plan edge cases (GAN-inspired)
     # --------------------------------------------------
     gan_plan = plan_edge_dataset()
 
+    # --------------------------------------------------
+    # Near-duplicate index over historical prompts
+    # --------------------------------------------------
+    dedup_index = None
+    if DEDUP_ENABLED:
+        with span("stage.dedup_index"):
+            dedup_index = load_prompt_index(DEDUP_INDEX_PATH, DEDUP_THRESHOLD)
+
     # --------------------------------------------------
     # Generate dataset (LLM as dataset author)
     # --------------------------------------------------
-    dataset = write_dataset(
-        gravity=GRAVITY_RULES,
-        internet=INTERNET_GUIDELINES,
-        domain=DOMAIN_EXPERTISE,
-        history=history,
-        gan_plan=gan_plan
-    )
+    with span("stage.generation"):
+        dataset = write_dataset(
+            gravity=GRAVITY_RULES,
+            internet=INTERNET_GUIDELINES,
+            domain=DOMAIN_EXPERTISE,
+            history=history,
+            gan_plan=gan_plan,
+            dedup_index=dedup_index
+        )
 
     # --------------------------------------------------
     # Validate dataset structure
     # --------------------------------------------------
-    validate_dataset(dataset)
+    with span("stage.validation"):
+        validate_dataset(dataset)
 
     # --------------------------------------------------
     # Persist dataset (DB only)
     # --------------------------------------------------
-    save_dataset(dataset)
+    with span("stage.save_dataset"):
+        save_dataset(dataset)
 
     # --------------------------------------------------
     # Index dataset into Graphite (Neo4j)
     # --------------------------------------------------
-    try:
-        graph = GraphiteAdapter()
+    with span("stage.graph_indexing"):
+        try:
+            graph = GraphiteAdapter()
 
-        graph.index_dataset(
-            dataset_id=dataset["dataset_name"],
-            agent_type=DOMAIN_EXPERTISE["agent_type"],
-            domain=DOMAIN_EXPERTISE["domain"],
-            intent=dataset["intent"],
-            rows=dataset["rows"],
-            capabilities=DOMAIN_EXPERTISE.get("capabilities", [])
-        )
+            graph.index_dataset(
+                dataset_id=dataset["dataset_name"],
+                agent_type=DOMAIN_EXPERTISE["agent_type"],
+                domain=DOMAIN_EXPERTISE["domain"],
+                intent=dataset["intent"],
+                rows=dataset["rows"],
+                capabilities=DOMAIN_EXPERTISE.get("capabilities", [])
+            )
 
-        print("Dataset indexed into Graphite")
+            print("Dataset indexed into Graphite")
 
-    except Exception as e:
-        print(f"Graph indexing skipped: {e}")
+        except Exception as e:
+            print(f"Graph indexing skipped: {e}")
 
-    finally:
-        try:
-            graph.close()
-        except Exception:
-            pass
+        finally:
+            try:
+                graph.close()
+            except Exception:
+                pass
 
     # --------------------------------------------------
     # Evaluate agent on dataset
+    # (rows + artifact are persisted while the run is in progress)
     # --------------------------------------------------
-    score, row_results = evaluate(
-        run_agent,
-        dataset
-    )
-
-    print("\nAgent score:", score)
-
-    # --------------------------------------------------
-    # Deployment gate decision
-    # --------------------------------------------------
-    passed = should_deploy(score)
-
-    # --------------------------------------------------
-    # Persist evaluation results (DB)
-    # --------------------------------------------------
-    run_id = save_evaluation(
-        dataset_name=dataset["dataset_name"],
-        agent_type=DOMAIN_EXPERTISE["agent_type"],
-        score=score,
-        passed=passed,
-        row_results=row_results
-    )
+    with span("stage.evaluation"):
+        summary = run_streaming_evaluation(
+            agent,
+            dataset,
+            agent_type=DOMAIN_EXPERTISE["agent_type"],
+            agent_name=AGENT_NAME,
+            # Carry-forward only reuses outputs of this exact agent version
+            agent_fingerprint=_agent_fingerprint(),
+            incremental=INCREMENTAL_EVAL,
+            **_eval_options()
+        )
 
-    print(f"Evaluation results saved (run_id={run_id})")
+    _report(summary)
+    _save_trace(summary["run_id"])
 
     # --------------------------------------------------
-    # Persist evaluation artifact (TEXT FILE)
+    # LLM response cache stats
     # --------------------------------------------------
-    artifact_path = save_evaluation_artifact(
-        dataset,
-        score,
-        row_results
-    )
+    cache = get_shared_client().cache
+    if cache is not None:
+        print(f"\nLLM cache: {cache.stats()}")
 
-    print(f"Evaluation artifact saved → {artifact_path}")
-
-    # --------------------------------------------------
-    # Final deployment decision
-    # --------------------------------------------------
-    if passed:
-        print("\nDEPLOY AGENT")
-    else:
-        failed = [r for r in row_results if not r["passed"]]
-        print(f"\nBLOCK DEPLOYMENT — {len(failed)} failed test(s)")
+    if agent_cache is not None:
+        print(f"Agent cache: {agent_cache.stats()}")
 
 
 # --------------------------------------------------
 # Entry point
 # --------------------------------------------------
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--resume",
+        type=int,
+        metavar="RUN_ID",
+        help="resume an interrupted evaluation run"
+    )
+    args = parser.parse_args()
+
+    if TRACE_ENABLED:
+        enable_tracing()
+
+    try:
+        main(resume_run_id=args.resume)
+    except SchemaOutOfDate as e:
+        raise SystemExit(f"❌ {e}")
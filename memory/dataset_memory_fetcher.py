@@ -1,25 +1,60 @@
-from memory.supabase_client import get_connection
+from memory.supabase_client import connection
+from tracing.tracer import traced
 
+@traced("db.fetch_dataset_summaries")
 def fetch_dataset_summaries(agent_type: str, limit: int = 10):
     """
     Fetch lightweight dataset summaries filtered by agent_type.
-    """
-    conn = get_connection()
-    cur = conn.cursor()
 
-    cur.execute(
-        """
-        SELECT id, created_at
-        FROM datasets
-        WHERE payload->>'agent_type' = %s
-        ORDER BY created_at DESC
-        LIMIT %s
-        """,
-        (agent_type, limit)
-    )
+    agent_type is the generated column over payload->>'agent_type'
+    (index datasets_agent_type_created_at, see scripts/migrate.py).
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT id, created_at
+            FROM datasets
+            WHERE agent_type = %s
+            ORDER BY created_at DESC
+            LIMIT %s
+            """,
+            (agent_type, limit)
+        )
 
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
+        rows = cur.fetchall()
 
     return [{"dataset_id": r[0], "created_at": r[1]} for r in rows]
+
+
+@traced("db.fetch_dataset_prompts")
+def fetch_dataset_prompts(since=None):
+    """
+    (dataset_id, created_at, [input_prompt, ...]) for every dataset
+    created at or after `since` (all datasets when None), oldest first.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT
+                d.id,
+                d.created_at,
+                COALESCE(
+                    array_agg(r->>'input_prompt') FILTER (WHERE r IS NOT NULL),
+                    '{}'
+                )
+            FROM datasets d
+            LEFT JOIN LATERAL jsonb_array_elements(
+                CASE
+                    WHEN jsonb_typeof(d.payload::jsonb->'rows') = 'array'
+                    THEN d.payload::jsonb->'rows'
+                    ELSE '[]'::jsonb
+                END
+            ) AS r ON TRUE
+            WHERE %(since)s IS NULL OR d.created_at >= %(since)s
+            GROUP BY d.id, d.created_at
+            ORDER BY d.created_at
+            """,
+            {"since": since}
+        )
+
+        return cur.fetchall()
@@ -1,6 +1,9 @@
-from memory.supabase_client import get_connection
+from memory.supabase_client import connection
 from psycopg2.extras import Json
+from memory.dedup_index import index_saved_dataset
+from tracing.tracer import traced
 
+@traced("db.save_dataset")
 def save_dataset(dataset: dict):
     """
     Persist dataset JSON into Postgres (Supabase DB).
@@ -11,18 +14,46 @@ def save_dataset(dataset: dict):
     if not dataset_id:
         raise ValueError("Dataset missing 'dataset_name'")
 
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        INSERT INTO datasets (id, payload)
-        VALUES (%s, %s)
-        ON CONFLICT (id) DO NOTHING
-        """,
-        (dataset_id, Json(dataset))
-    )
-
-    conn.commit()
-    cur.close()
-    conn.close()
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO datasets (id, payload)
+            VALUES (%s, %s)
+            ON CONFLICT (id) DO NOTHING
+            """,
+            (dataset_id, Json(dataset))
+        )
+
+    index_saved_dataset(dataset)
+
+
+@traced("db.load_dataset")
+def load_dataset(dataset_id: str):
+    """
+    Load a stored dataset payload by id (dataset_name).
+    Returns None if it does not exist.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT payload FROM datasets WHERE id = %s",
+            (dataset_id,)
+        )
+        row = cur.fetchone()
+
+    return row[0] if row else None
+
+
+@traced("db.load_datasets")
+def load_datasets(dataset_ids: list) -> dict:
+    """
+    Load many stored datasets in one query.
+    Returns {dataset_id: payload}; missing ids are absent.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT id, payload FROM datasets WHERE id = ANY(%s)",
+            (list(dataset_ids),)
+        )
+        rows = cur.fetchall()
+
+    return {r[0]: r[1] for r in rows}
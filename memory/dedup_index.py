@@ -0,0 +1,250 @@
+# --------------------------------------------------
+# Near-Duplicate Prompt Index (MinHash + LSH)
+# --------------------------------------------------
+
+import os
+import pickle
+import re
+import tempfile
+import threading
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import List, Tuple, Optional, Iterable
+
+import numpy as np
+
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+_WORDS = re.compile(r"[a-z0-9π]+")
+
+
+def _normalize(prompt: str) -> str:
+    return " ".join(_WORDS.findall(str(prompt).lower()))
+
+
+def _shingles(text: str, k: int) -> np.ndarray:
+    """
+    crc32 of character k-grams (deterministic across processes,
+    unlike hash()).
+    """
+    if len(text) <= k:
+        grams = {text}
+    else:
+        grams = {text[i:i + k] for i in range(len(text) - k + 1)}
+    return np.fromiter(
+        (zlib.crc32(g.encode("utf-8")) for g in grams),
+        dtype=np.uint64,
+        count=len(grams)
+    )
+
+
+class PromptIndex:
+    """
+    MinHash signatures of input prompts, bucketed with LSH.
+
+    - add() is O(bands); is_duplicate() looks up bands, then
+      confirms candidates by estimated Jaccard similarity
+    - threshold is the Jaccard similarity (of character
+      shingles) at or above which a prompt is a near-duplicate
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.85,
+        shingle_size: int = 4,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self.signatures: List[np.ndarray] = []
+        self.refs: List[str] = []
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+
+        # Sync bookkeeping (see load_prompt_index)
+        self.dataset_ids = set()
+        self.watermark = None
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    # --------------------------------------------------
+    # MinHash + LSH
+    # --------------------------------------------------
+    def signature(self, prompt: str) -> np.ndarray:
+        hashes = _shingles(_normalize(prompt), self.shingle_size)
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME
+        return (permuted & MAX_HASH).min(axis=0)
+
+    def _band_keys(self, sig: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        r = self.rows_per_band
+        for band in range(self.bands):
+            yield band, sig[band * r:(band + 1) * r].tobytes()
+
+    def _add_signature(self, sig: np.ndarray, ref: str) -> None:
+        idx = len(self.signatures)
+        self.signatures.append(sig)
+        self.refs.append(ref)
+        for band, key in self._band_keys(sig):
+            self.buckets[band][key].append(idx)
+
+    def add(self, prompt: str, ref: str = "") -> None:
+        self._add_signature(self.signature(prompt), ref)
+
+    def _match(self, sig: np.ndarray) -> Optional[Tuple[str, float]]:
+        seen = set()
+        for band, key in self._band_keys(sig):
+            for idx in self.buckets[band].get(key, ()):
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                similarity = float(np.mean(self.signatures[idx] == sig))
+                if similarity >= self.threshold:
+                    return self.refs[idx], similarity
+        return None
+
+    def find_duplicate(self, prompt: str) -> Optional[Tuple[str, float]]:
+        """
+        (ref, estimated similarity) of an indexed near-duplicate, or None.
+        """
+        return self._match(self.signature(prompt))
+
+    def is_duplicate(self, prompt: str) -> bool:
+        return self.find_duplicate(prompt) is not None
+
+    # --------------------------------------------------
+    # Generated rows
+    # --------------------------------------------------
+    def filter_rows(self, rows: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """
+        Split generated rows into (kept, rejected).
+
+        A row is rejected if its input_prompt near-duplicates
+        history OR an earlier row of the same batch. The index
+        itself is not modified.
+        """
+        batch = PromptIndex(
+            self.num_perm, self.bands, self.threshold, self.shingle_size
+        )
+        batch._a, batch._b = self._a, self._b
+
+        kept, rejected = [], []
+        for row in rows:
+            prompt = row.get("input_prompt")
+            if not prompt:
+                kept.append(row)  # left for the validator to reject
+                continue
+
+            sig = self.signature(prompt)
+            if self._match(sig) or batch._match(sig):
+                rejected.append(row)
+            else:
+                batch._add_signature(sig, "")
+                kept.append(row)
+
+        return kept, rejected
+
+    # --------------------------------------------------
+    # Persistence
+    # --------------------------------------------------
+    def save(self, path: str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Atomic replace: concurrent readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def load(path: str) -> Optional["PromptIndex"]:
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+
+# --------------------------------------------------
+# Shared index over the datasets table
+# --------------------------------------------------
+_shared_index: Optional[PromptIndex] = None
+_shared_path: Optional[str] = None
+_shared_lock = threading.Lock()
+
+
+def _add_dataset(index: PromptIndex, dataset_id: str, prompts: Iterable[str]) -> None:
+    if dataset_id in index.dataset_ids:
+        return
+    for prompt in prompts:
+        if prompt:
+            index.add(prompt, ref=dataset_id)
+    index.dataset_ids.add(dataset_id)
+
+
+def load_prompt_index(
+    path: str = ".cache/prompt_index.pkl",
+    threshold: float = 0.85
+) -> PromptIndex:
+    """
+    Process-wide index of every historical input_prompt.
+
+    Loaded from disk, then brought up to date with datasets
+    saved since its watermark (only new rows are hashed).
+    """
+    global _shared_index, _shared_path
+
+    from memory.dataset_memory_fetcher import fetch_dataset_prompts
+
+    with _shared_lock:
+        if _shared_index is None or _shared_path != path:
+            _shared_index = PromptIndex.load(path) or PromptIndex(threshold=threshold)
+            _shared_path = path
+
+        index = _shared_index
+        index.threshold = threshold
+
+        added = False
+        for dataset_id, created_at, prompts in fetch_dataset_prompts(since=index.watermark):
+            _add_dataset(index, dataset_id, prompts)
+            index.watermark = max(index.watermark or created_at, created_at)
+            added = True
+
+        if added:
+            index.save(path)
+
+        return index
+
+
+def index_saved_dataset(dataset: dict) -> None:
+    """
+    Called by save_dataset: keep an already-loaded index current.
+    (If no index is loaded, the next load picks the dataset up.)
+    """
+    with _shared_lock:
+        if _shared_index is None:
+            return
+
+        _add_dataset(
+            _shared_index,
+            dataset["dataset_name"],
+            (row.get("input_prompt") for row in dataset.get("rows", []))
+        )
+        _shared_index.save(_shared_path)
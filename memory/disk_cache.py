@@ -0,0 +1,195 @@
+# --------------------------------------------------
+# Disk Cache (SQLite, LRU, multi-process safe)
+# --------------------------------------------------
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    cost_seconds REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS cache_entries_accessed_at
+    ON cache_entries (accessed_at);
+"""
+
+
+def make_key(**parts: Any) -> str:
+    """
+    Content address for a cache entry: sha256 of the
+    canonical JSON of the given parts.
+    """
+    canonical = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent key → text cache backed by one SQLite file.
+
+    - Safe for several processes at once (WAL + busy timeout)
+    - One SQLite connection per thread
+    - LRU eviction capped by max_entries and/or max_bytes
+    - hits / misses / saved_seconds counters for this process
+
+    cost_seconds stored with each entry is the time it took to
+    produce the value, so a hit knows how much time it saved.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: Optional[int] = 5000,
+        max_bytes: Optional[int] = None
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    # --------------------------------------------------
+    # Connection per thread (and per process)
+    # --------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        pid = getattr(self._local, "pid", None)
+
+        if conn is None or pid != os.getpid():
+            conn = sqlite3.connect(
+                str(self.path),
+                timeout=30,
+                isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+
+        return conn
+
+    # --------------------------------------------------
+    # Public API
+    # --------------------------------------------------
+    def get(self, key: str) -> Optional[str]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, cost_seconds FROM cache_entries WHERE key = ?",
+            (key,)
+        ).fetchone()
+
+        with self._stats_lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += row[1]
+
+        conn.execute(
+            "UPDATE cache_entries SET accessed_at = ? WHERE key = ?",
+            (time.time(), key)
+        )
+        return row[0]
+
+    def set(self, key: str, value: str, cost_seconds: float = 0.0) -> None:
+        now = time.time()
+        conn = self._conn()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO cache_entries
+                    (key, value, size, cost_seconds, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, value, len(value.encode("utf-8")), cost_seconds, now, now)
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, key: str) -> None:
+        self._conn().execute(
+            "DELETE FROM cache_entries WHERE key = ?",
+            (key,)
+        )
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM cache_entries")
+
+    def stats(self) -> Dict[str, Any]:
+        entries, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "entries": entries,
+            "bytes": size,
+        }
+
+    # --------------------------------------------------
+    # LRU eviction (inside the write transaction)
+    # --------------------------------------------------
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        if self.max_entries is not None:
+            conn.execute(
+                """
+                DELETE FROM cache_entries
+                WHERE key IN (
+                    SELECT key FROM cache_entries
+                    ORDER BY accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+
+        if self.max_bytes is not None:
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()[0]
+
+            if total <= self.max_bytes:
+                return
+
+            oldest = conn.execute(
+                "SELECT key, size FROM cache_entries ORDER BY accessed_at"
+            )
+            doomed = []
+            for key, size in oldest:
+                if total <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                total -= size
+
+            conn.executemany(
+                "DELETE FROM cache_entries WHERE key = ?",
+                doomed
+            )
@@ -2,91 +2,361 @@
 # Evaluation Repository (Supabase / Postgres)
 # --------------------------------------------------
 
+from typing import Optional
+
 import psycopg2
-from memory.supabase_client import get_connection
+from psycopg2.extras import execute_values
+from psycopg2.extras import Json
+from memory.supabase_client import connection
+from memory.rollup_repository import refresh_rollups
+from tracing.tracer import traced
+
+
+# Rows per multi-VALUES INSERT statement
+ROW_INSERT_PAGE_SIZE = 1000
+
+ROW_COLUMNS = [
+    "row_index",
+    "prompt",
+    "expected_output",
+    "actual_output",
+    "difficulty",
+
+    "expected_tools",
+    "actual_tools",
+    "tool_expected",
+    "tool_called",
+    "correct_tool_called",
+
+    "response_passed",
+    "passed",
+]
+
+
+def _row_values(run_id: int, row: dict) -> tuple:
+    return (
+        run_id,
+        row["row_index"],
+        row["prompt"],
+        row["expected_output"],
+        row["actual_output"],
+        row.get("difficulty"),
+
+        row.get("expected_tools", []),
+        row.get("actual_tools", []),
+        row.get("tool_expected", False),
+        row.get("tool_called", False),
+        row.get("correct_tool_called", False),
+
+        row.get("response_passed"),
+        row["passed"]
+    )
+
+
+def _insert_row_values(cur, values: list) -> None:
+    """
+    Batched insert of row-level results (any mix of runs).
+    Rows already stored for (run_id, row_index) are skipped.
+    """
+    execute_values(
+        cur,
+        f"""
+        INSERT INTO evaluation_rows (
+            run_id,
+            {", ".join(ROW_COLUMNS)}
+        )
+        VALUES %s
+        ON CONFLICT (run_id, row_index) DO NOTHING
+        """,
+        values,
+        page_size=ROW_INSERT_PAGE_SIZE
+    )
 
 
+def _insert_rows(cur, run_id: int, row_results: list) -> None:
+    _insert_row_values(cur, [_row_values(run_id, row) for row in row_results])
+
+
+@traced("db.save_evaluation")
 def save_evaluation(
     dataset_name: str,
     agent_type: str,
     score: float,
     passed: bool,
-    row_results: list
+    row_results: list,
+    agent_name: Optional[str] = None
 ):
     """
     Persist evaluation run and row-level results.
 
-    Tool usage is stored explicitly.
+    Tool usage is stored explicitly. agent_type is the dataset's
+    agent type; agent_name (optional) tells agents of the same
+    type apart.
     """
 
-    conn = get_connection()
-    cur = conn.cursor()
+    with connection() as conn, conn.cursor() as cur:
+        # --------------------------------------------------
+        # 1️⃣ Insert evaluation run
+        # --------------------------------------------------
+        cur.execute(
+            """
+            INSERT INTO evaluation_runs (
+                dataset_name,
+                agent_type,
+                agent_name,
+                score,
+                passed
+            )
+            VALUES (%s, %s, %s, %s, %s)
+            RETURNING id
+            """,
+            (dataset_name, agent_type, agent_name, score, passed)
+        )
+
+        run_id = cur.fetchone()[0]
+
+        # --------------------------------------------------
+        # 2️⃣ Insert row-level evaluation results (batched)
+        # --------------------------------------------------
+        _insert_rows(cur, run_id, row_results)
 
-    # --------------------------------------------------
-    # 1️⃣ Insert evaluation run
-    # --------------------------------------------------
-    cur.execute(
-        """
-        INSERT INTO evaluation_runs (
-            dataset_name,
-            agent_type,
-            score,
-            passed
+        # --------------------------------------------------
+        # 3️⃣ Score-trend rollups for this run
+        # --------------------------------------------------
+        refresh_rollups(cur, [run_id])
+
+    return run_id
+
+
+@traced("db.save_evaluations")
+def save_evaluations(runs: list) -> list:
+    """
+    Persist many finished runs in ONE transaction: one
+    multi-VALUES insert for the runs, batched inserts for all
+    of their rows, one rollup refresh.
+
+    runs: dicts with dataset_name, agent_type, score, passed,
+    row_results and optionally agent_name / agent_fingerprint.
+    Returns run ids in the same order.
+    """
+    if not runs:
+        return []
+
+    with connection() as conn, conn.cursor() as cur:
+        inserted = execute_values(
+            cur,
+            """
+            INSERT INTO evaluation_runs (
+                dataset_name, agent_type, agent_name, agent_fingerprint, score, passed
+            )
+            VALUES %s
+            RETURNING id
+            """,
+            [
+                (
+                    r["dataset_name"], r["agent_type"], r.get("agent_name"),
+                    r.get("agent_fingerprint"), r["score"], r["passed"]
+                )
+                for r in runs
+            ],
+            page_size=len(runs),
+            fetch=True
         )
-        VALUES (%s, %s, %s, %s)
-        RETURNING id
-        """,
-        (dataset_name, agent_type, score, passed)
-    )
+        run_ids = [row[0] for row in inserted]
+
+        _insert_row_values(cur, [
+            _row_values(run_id, row)
+            for run_id, run in zip(run_ids, runs)
+            for row in run["row_results"]
+        ])
 
-    run_id = cur.fetchone()[0]
+        refresh_rollups(cur, run_ids)
 
-    # --------------------------------------------------
-    # 2️⃣ Insert row-level evaluation results
-    # --------------------------------------------------
-    for row in row_results:
+    return run_ids
+
+
+# --------------------------------------------------
+# Incremental persistence (streaming runs)
+# --------------------------------------------------
+@traced("db.start_evaluation_run")
+def start_evaluation_run(
+    dataset_name: str,
+    agent_type: str,
+    agent_name: Optional[str] = None,
+    agent_fingerprint: Optional[str] = None
+) -> int:
+    """
+    Create an open run (score / passed stay NULL until finished).
+    agent_fingerprint identifies the agent code / version that
+    produced the run's outputs (see agent_cache.code_fingerprint).
+    """
+    with connection() as conn, conn.cursor() as cur:
         cur.execute(
             """
-            INSERT INTO evaluation_rows (
-                run_id,
-                row_index,
-                prompt,
-                expected_output,
-                actual_output,
-
-                expected_tools,
-                actual_tools,
-                tool_expected,
-                tool_called,
-                correct_tool_called,
+            INSERT INTO evaluation_runs (dataset_name, agent_type, agent_name, agent_fingerprint)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id
+            """,
+            (dataset_name, agent_type, agent_name, agent_fingerprint)
+        )
+        return cur.fetchone()[0]
 
-                passed
-            )
-            VALUES (
-                %s, %s, %s, %s, %s,
-                %s, %s, %s, %s, %s,
-                %s
-            )
+
+@traced("db.append_evaluation_rows")
+def append_evaluation_rows(run_id: int, row_results: list) -> None:
+    """
+    Flush one batch of row results for an open run.
+    """
+    if not row_results:
+        return
+
+    with connection() as conn, conn.cursor() as cur:
+        _insert_rows(cur, run_id, row_results)
+
+
+@traced("db.finish_evaluation_run")
+def finish_evaluation_run(run_id: int, score: float, passed: bool) -> None:
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE evaluation_runs
+            SET score = %s, passed = %s
+            WHERE id = %s
             """,
-            (
-                run_id,
-                row["row_index"],
-                row["prompt"],
-                row["expected_output"],
-                row["actual_output"],
-
-                row.get("expected_tools", []),
-                row.get("actual_tools", []),
-                row.get("tool_expected", False),
-                row.get("tool_called", False),
-                row.get("correct_tool_called", False),
-
-                row["passed"]
-            )
+            (score, passed, run_id)
         )
 
-    conn.commit()
-    cur.close()
-    conn.close()
+        refresh_rollups(cur, [run_id])
 
-    return run_id
+
+@traced("db.fetch_evaluation_run")
+def fetch_evaluation_run(run_id: int):
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT id, dataset_name, agent_type, score, passed, created_at,
+                   agent_name, agent_fingerprint
+            FROM evaluation_runs
+            WHERE id = %s
+            """,
+            (run_id,)
+        )
+        r = cur.fetchone()
+
+    if r is None:
+        return None
+
+    return {
+        "run_id": r[0],
+        "dataset_name": r[1],
+        "agent_type": r[2],
+        "score": r[3],
+        "passed": r[4],
+        "created_at": r[5],
+        "agent_name": r[6],
+        "agent_fingerprint": r[7],
+    }
+
+
+@traced("db.fetch_latest_run_id")
+def fetch_latest_run_id(
+    dataset_name: str,
+    agent_type: str,
+    agent_name: Optional[str] = None,
+    agent_fingerprint: Optional[str] = None
+):
+    """
+    Most recent FINISHED run for a dataset + agent type (and
+    agent_name / agent_fingerprint, if given), or None.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT id
+            FROM evaluation_runs
+            WHERE dataset_name = %s
+              AND agent_type = %s
+              AND (%s::text IS NULL OR agent_name = %s)
+              AND (%s::text IS NULL OR agent_fingerprint = %s)
+              AND score IS NOT NULL
+            ORDER BY created_at DESC, id DESC
+            LIMIT 1
+            """,
+            (dataset_name, agent_type, agent_name, agent_name, agent_fingerprint, agent_fingerprint)
+        )
+        row = cur.fetchone()
+
+    return row[0] if row else None
+
+
+@traced("db.fetch_run_totals")
+def fetch_run_totals(run_id: int) -> dict:
+    """
+    Row counters of a run, aggregated in the database.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT
+                COUNT(*),
+                COUNT(*) FILTER (WHERE correct_tool_called),
+                COUNT(*) FILTER (WHERE response_passed),
+                COUNT(*) FILTER (WHERE NOT passed)
+            FROM evaluation_rows
+            WHERE run_id = %s
+            """,
+            (run_id,)
+        )
+        r = cur.fetchone()
+
+    return {
+        "rows": r[0],
+        "tool_passed_rows": r[1],
+        "response_passed_rows": r[2],
+        "failed_rows": r[3],
+    }
+
+
+@traced("db.fetch_evaluation_rows")
+def fetch_evaluation_rows(run_id: int) -> list:
+    """
+    Stored row results for a run, in row_index order,
+    in the same shape evaluation.runner produces.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT {", ".join(ROW_COLUMNS)}
+            FROM evaluation_rows
+            WHERE run_id = %s
+            ORDER BY row_index
+            """,
+            (run_id,)
+        )
+        rows = cur.fetchall()
+
+    results = []
+    for r in rows:
+        row = dict(zip(ROW_COLUMNS, r))
+        row["expected_tools"] = row["expected_tools"] or []
+        row["actual_tools"] = row["actual_tools"] or []
+        row["tool_passed"] = row["correct_tool_called"]
+        results.append(row)
+
+    return results
+
+
+@traced("db.save_run_timings")
+def save_run_timings(run_id: int, timings: dict) -> None:
+    """
+    Store the per-run stage timing summary on evaluation_runs.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE evaluation_runs
+            SET timings = %s
+            WHERE id = %s
+            """,
+            (Json(timings), run_id)
+        )
@@ -0,0 +1,182 @@
+# --------------------------------------------------
+# Evaluation Job Queue (Supabase / Postgres)
+# --------------------------------------------------
+#
+# evaluation_jobs rows are row-range slices of one evaluation run.
+# Workers claim with FOR UPDATE SKIP LOCKED, so any number of
+# them (on any number of nodes) poll the same table without
+# blocking each other or double-claiming. A running job whose
+# heartbeat is older than the lease is claimable again (its
+# worker died). Table: scripts/migrate_add_evaluation_jobs.py
+
+from typing import List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from memory.supabase_client import connection
+from tracing.tracer import traced
+
+
+JOB_COLUMNS = ["id", "run_id", "dataset_name", "agent", "row_start", "row_end", "attempts"]
+
+
+@traced("db.enqueue_jobs")
+def enqueue_jobs(
+    run_id: int,
+    dataset_name: str,
+    agent: str,
+    ranges: List[Tuple[int, int]]
+) -> int:
+    with connection() as conn, conn.cursor() as cur:
+        execute_values(
+            cur,
+            """
+            INSERT INTO evaluation_jobs (run_id, dataset_name, agent, row_start, row_end)
+            VALUES %s
+            """,
+            [(run_id, dataset_name, agent, start, end) for start, end in ranges]
+        )
+    return len(ranges)
+
+
+@traced("db.claim_job")
+def claim_job(worker: str, lease_seconds: float, max_attempts: int) -> Optional[dict]:
+    """
+    Claim the oldest pending (or abandoned) job, or None.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""
+            UPDATE evaluation_jobs
+            SET status = 'running',
+                worker = %(worker)s,
+                attempts = attempts + 1,
+                heartbeat_at = NOW()
+            WHERE id = (
+                SELECT id
+                FROM evaluation_jobs
+                WHERE attempts < %(max_attempts)s
+                  AND (
+                      status = 'pending'
+                      OR (
+                          status = 'running'
+                          AND heartbeat_at < NOW() - %(lease)s * INTERVAL '1 second'
+                      )
+                  )
+                ORDER BY id
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING {", ".join(JOB_COLUMNS)}
+            """,
+            {"worker": worker, "lease": lease_seconds, "max_attempts": max_attempts}
+        )
+        row = cur.fetchone()
+
+    return dict(zip(JOB_COLUMNS, row)) if row else None
+
+
+@traced("db.heartbeat_job")
+def heartbeat_job(job_id: int, worker: str) -> bool:
+    """
+    Extend the lease. False if the job was reclaimed by another worker.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE evaluation_jobs
+            SET heartbeat_at = NOW()
+            WHERE id = %s AND worker = %s AND status = 'running'
+            """,
+            (job_id, worker)
+        )
+        return cur.rowcount == 1
+
+
+@traced("db.complete_job")
+def complete_job(job_id: int, worker: str) -> bool:
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE evaluation_jobs
+            SET status = 'done', finished_at = NOW(), error = NULL
+            WHERE id = %s AND worker = %s AND status = 'running'
+            """,
+            (job_id, worker)
+        )
+        return cur.rowcount == 1
+
+
+@traced("db.fail_job")
+def fail_job(job_id: int, worker: str, error: str, max_attempts: int) -> None:
+    """
+    Release a job after an error: back to pending while it has
+    attempts left, otherwise failed.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE evaluation_jobs
+            SET status = CASE WHEN attempts < %s THEN 'pending' ELSE 'failed' END,
+                error = %s
+            WHERE id = %s AND worker = %s AND status = 'running'
+            """,
+            (max_attempts, error, job_id, worker)
+        )
+
+
+@traced("db.expire_jobs")
+def expire_jobs(run_id: int, lease_seconds: float, max_attempts: int) -> int:
+    """
+    Mark abandoned jobs with no attempts left as failed
+    (nobody would ever claim them again).
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE evaluation_jobs
+            SET status = 'failed', error = COALESCE(error, 'lease expired')
+            WHERE run_id = %s
+              AND status = 'running'
+              AND attempts >= %s
+              AND heartbeat_at < NOW() - %s * INTERVAL '1 second'
+            """,
+            (run_id, max_attempts, lease_seconds)
+        )
+        return cur.rowcount
+
+
+@traced("db.fetch_job_counts")
+def fetch_job_counts(run_id: int) -> dict:
+    """
+    {status: job count} for one run.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT status, COUNT(*)
+            FROM evaluation_jobs
+            WHERE run_id = %s
+            GROUP BY status
+            """,
+            (run_id,)
+        )
+        return dict(cur.fetchall())
+
+
+@traced("db.fetch_job_errors")
+def fetch_job_errors(run_id: int) -> list:
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT row_start, row_end, attempts, error
+            FROM evaluation_jobs
+            WHERE run_id = %s AND status = 'failed'
+            ORDER BY row_start
+            """,
+            (run_id,)
+        )
+        return [
+            {"row_start": r[0], "row_end": r[1], "attempts": r[2], "error": r[3]}
+            for r in cur.fetchall()
+        ]
@@ -0,0 +1,220 @@
+# --------------------------------------------------
+# Score-Trend Rollups (Supabase / Postgres)
+# --------------------------------------------------
+#
+# evaluation_run_rollups         one row per finished run
+# evaluation_difficulty_rollups  one row per (run, difficulty)
+# evaluation_tool_rollups        one row per (run, tool)
+#
+# Refreshed for a single run when it is saved / finished, so
+# trend queries read a few rows per run instead of scanning
+# evaluation_rows. Tables: scripts/migrate_add_rollups.py
+
+from typing import List, Optional
+
+from memory.supabase_client import connection
+from tracing.tracer import traced
+
+
+REFRESH_SQL = """
+DELETE FROM evaluation_run_rollups WHERE run_id = ANY(%(run_ids)s);
+DELETE FROM evaluation_difficulty_rollups WHERE run_id = ANY(%(run_ids)s);
+DELETE FROM evaluation_tool_rollups WHERE run_id = ANY(%(run_ids)s);
+
+INSERT INTO evaluation_run_rollups (
+    run_id, dataset_name, agent_type, agent_name, created_at, score, passed,
+    total_rows, passed_rows, tool_passed_rows, response_passed_rows
+)
+SELECT
+    e.id, e.dataset_name, e.agent_type, e.agent_name, e.created_at, e.score, e.passed,
+    COUNT(r.id),
+    COUNT(r.id) FILTER (WHERE r.passed),
+    COUNT(r.id) FILTER (WHERE r.correct_tool_called),
+    COUNT(r.id) FILTER (WHERE r.response_passed)
+FROM evaluation_runs e
+LEFT JOIN evaluation_rows r ON r.run_id = e.id
+WHERE e.id = ANY(%(run_ids)s)
+GROUP BY e.id;
+
+INSERT INTO evaluation_difficulty_rollups (run_id, difficulty, total_rows, passed_rows)
+SELECT
+    r.run_id,
+    COALESCE(r.difficulty, 'unknown'),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE r.passed)
+FROM evaluation_rows r
+WHERE r.run_id = ANY(%(run_ids)s)
+GROUP BY r.run_id, COALESCE(r.difficulty, 'unknown');
+
+INSERT INTO evaluation_tool_rollups (run_id, tool, expected_rows, called_rows, correct_rows)
+SELECT
+    r.run_id,
+    t.tool,
+    COUNT(*) FILTER (WHERE t.tool = ANY(r.expected_tools)),
+    COUNT(*) FILTER (WHERE t.tool = ANY(r.actual_tools)),
+    COUNT(*) FILTER (
+        WHERE t.tool = ANY(r.expected_tools) AND t.tool = ANY(r.actual_tools)
+    )
+FROM evaluation_rows r
+CROSS JOIN LATERAL (
+    SELECT DISTINCT unnest(
+        COALESCE(r.expected_tools, '{}') || COALESCE(r.actual_tools, '{}')
+    ) AS tool
+) t
+WHERE r.run_id = ANY(%(run_ids)s)
+GROUP BY r.run_id, t.tool;
+"""
+
+
+def refresh_rollups(cur, run_ids: List[int]) -> None:
+    """
+    Recompute the rollups of the given runs inside the
+    caller's transaction.
+    """
+    if run_ids:
+        cur.execute(REFRESH_SQL, {"run_ids": list(run_ids)})
+
+
+# --------------------------------------------------
+# Trend queries
+# --------------------------------------------------
+RECENT_RUNS_SQL = """
+SELECT *
+FROM evaluation_run_rollups
+WHERE agent_type = %(agent_type)s
+  AND (%(dataset_name)s::text IS NULL OR dataset_name = %(dataset_name)s)
+  AND (%(agent_name)s::text IS NULL OR agent_name = %(agent_name)s)
+ORDER BY created_at DESC, run_id DESC
+LIMIT %(last_n)s
+"""
+
+
+def _params(
+    agent_type: str,
+    last_n: int,
+    dataset_name: Optional[str],
+    agent_name: Optional[str]
+) -> dict:
+    return {
+        "agent_type": agent_type,
+        "last_n": last_n,
+        "dataset_name": dataset_name,
+        "agent_name": agent_name,
+    }
+
+
+def _rate(part, total) -> Optional[float]:
+    return round(part / total, 4) if total else None
+
+
+@traced("db.fetch_score_trend")
+def fetch_score_trend(
+    agent_type: str,
+    last_n: int = 20,
+    dataset_name: Optional[str] = None,
+    agent_name: Optional[str] = None
+) -> list:
+    """
+    Last N finished runs of an agent type (optionally of one
+    agent_name), oldest first: score, deploy decision and row
+    pass rates per run.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT
+                run_id, dataset_name, created_at, score, passed,
+                total_rows, passed_rows, tool_passed_rows, response_passed_rows
+            FROM ({RECENT_RUNS_SQL}) recent
+            ORDER BY created_at, run_id
+            """,
+            _params(agent_type, last_n, dataset_name, agent_name)
+        )
+        rows = cur.fetchall()
+
+    return [
+        {
+            "run_id": r[0],
+            "dataset_name": r[1],
+            "created_at": r[2],
+            "score": r[3],
+            "passed": r[4],
+            "total_rows": r[5],
+            "row_pass_rate": _rate(r[6], r[5]),
+            "tool_pass_rate": _rate(r[7], r[5]),
+            "response_pass_rate": _rate(r[8], r[5]),
+        }
+        for r in rows
+    ]
+
+
+@traced("db.fetch_difficulty_trend")
+def fetch_difficulty_trend(
+    agent_type: str,
+    last_n: int = 20,
+    dataset_name: Optional[str] = None,
+    agent_name: Optional[str] = None
+) -> list:
+    """
+    Row pass rate per difficulty for each of the last N runs.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT recent.run_id, recent.created_at, d.difficulty, d.total_rows, d.passed_rows
+            FROM ({RECENT_RUNS_SQL}) recent
+            JOIN evaluation_difficulty_rollups d ON d.run_id = recent.run_id
+            ORDER BY recent.created_at, recent.run_id, d.difficulty
+            """,
+            _params(agent_type, last_n, dataset_name, agent_name)
+        )
+        rows = cur.fetchall()
+
+    return [
+        {
+            "run_id": r[0],
+            "created_at": r[1],
+            "difficulty": r[2],
+            "total_rows": r[3],
+            "pass_rate": _rate(r[4], r[3]),
+        }
+        for r in rows
+    ]
+
+
+@traced("db.fetch_tool_trend")
+def fetch_tool_trend(
+    agent_type: str,
+    last_n: int = 20,
+    dataset_name: Optional[str] = None,
+    agent_name: Optional[str] = None
+) -> list:
+    """
+    Per tool and run: how often it was expected, called, and
+    called when expected (recall = correct / expected).
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT
+                recent.run_id, recent.created_at, t.tool,
+                t.expected_rows, t.called_rows, t.correct_rows
+            FROM ({RECENT_RUNS_SQL}) recent
+            JOIN evaluation_tool_rollups t ON t.run_id = recent.run_id
+            ORDER BY recent.created_at, recent.run_id, t.tool
+            """,
+            _params(agent_type, last_n, dataset_name, agent_name)
+        )
+        rows = cur.fetchall()
+
+    return [
+        {
+            "run_id": r[0],
+            "created_at": r[1],
+            "tool": r[2],
+            "expected_rows": r[3],
+            "called_rows": r[4],
+            "recall": _rate(r[5], r[3]),
+        }
+        for r in rows
+    ]
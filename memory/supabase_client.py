@@ -1,14 +1,109 @@
 import os
+import threading
+from contextlib import contextmanager
+
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_connection():
-    return psycopg2.connect(
+
+def _connect_kwargs() -> dict:
+    return dict(
         host=os.getenv("SUPABASE_DB_HOST", "localhost"),
         port=os.getenv("SUPABASE_DB_PORT", "54322"),
         dbname=os.getenv("SUPABASE_DB_NAME", "postgres"),
         user=os.getenv("SUPABASE_DB_USER", "postgres"),
         password=os.getenv("SUPABASE_DB_PASSWORD", "postgres"),
     )
+
+
+def get_connection():
+    """
+    Dedicated (unpooled) connection. Caller owns commit/close.
+    Prefer connection() for anything on the pipeline path.
+    """
+    return psycopg2.connect(**_connect_kwargs())
+
+
+# --------------------------------------------------
+# Process-wide connection pool
+# --------------------------------------------------
+class _BlockingPool:
+    """
+    ThreadedConnectionPool raises when exhausted; this
+    wrapper makes callers wait for a free connection instead.
+    """
+
+    def __init__(self, minconn: int, maxconn: int):
+        self.pid = os.getpid()
+        self._pool = ThreadedConnectionPool(minconn, maxconn, **_connect_kwargs())
+        self._slots = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self):
+        self._slots.acquire()
+        try:
+            return self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, close: bool = False):
+        try:
+            self._pool.putconn(conn, close=close)
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        self._pool.closeall()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> _BlockingPool:
+    global _pool
+
+    with _pool_lock:
+        # Pooled sockets must not be shared with forked children
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = _BlockingPool(
+                minconn=int(os.getenv("SUPABASE_DB_POOL_MIN", "1")),
+                maxconn=int(os.getenv("SUPABASE_DB_POOL_MAX", "10")),
+            )
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+
+
+@contextmanager
+def connection():
+    """
+    Borrow a pooled connection for one transaction.
+
+    Commits on success, rolls back on error, and always
+    returns the connection to the pool.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+
+    try:
+        yield conn
+        conn.commit()
+
+    except BaseException:
+        if not conn.closed:
+            conn.rollback()
+        raise
+
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
@@ -3,9 +3,194 @@
 # --------------------------------------------------
 
 import os
+import threading
+import time
+from collections import Counter
 from neo4j import GraphDatabase
-from typing import List, Dict
+from neo4j.exceptions import Neo4jError
+from typing import List, Dict, Optional, Tuple, Any
 
+from tracing.tracer import span
+
+
+ROW_BATCH_SIZE = 1000
+
+RETRIEVAL_CACHE_TTL = float(os.getenv("GRAPH_RETRIEVAL_CACHE_TTL", "300"))
+RETRIEVAL_CACHE_MAX_ENTRIES = 1024
+
+
+# --------------------------------------------------
+# Schema (uniqueness constraints + lookup indexes)
+# --------------------------------------------------
+# Every MERGE key below is backed by one of these, so MERGE is an
+# index seek instead of a label scan. Idempotent (IF NOT EXISTS).
+SCHEMA_CYPHER = [
+    "CREATE CONSTRAINT dataset_id IF NOT EXISTS FOR (d:Dataset) REQUIRE d.id IS UNIQUE",
+    "CREATE CONSTRAINT agent_name IF NOT EXISTS FOR (a:Agent) REQUIRE a.name IS UNIQUE",
+    "CREATE CONSTRAINT domain_name IF NOT EXISTS FOR (d:Domain) REQUIRE d.name IS UNIQUE",
+    "CREATE CONSTRAINT intent_name IF NOT EXISTS FOR (i:Intent) REQUIRE i.name IS UNIQUE",
+    "CREATE CONSTRAINT capability_name IF NOT EXISTS FOR (c:Capability) REQUIRE c.name IS UNIQUE",
+    "CREATE CONSTRAINT tool_name IF NOT EXISTS FOR (t:Tool) REQUIRE t.name IS UNIQUE",
+    "CREATE CONSTRAINT difficulty_level IF NOT EXISTS FOR (d:Difficulty) REQUIRE d.level IS UNIQUE",
+    "CREATE INDEX test_row_key IF NOT EXISTS FOR (r:TestRow) ON (r.dataset_id, r.row_index)",
+]
+
+
+# --------------------------------------------------
+# Duplicate cleanup (graphs indexed before the schema)
+# --------------------------------------------------
+# The old per-statement patterns ("MERGE (a:Agent {...})-[:R]->(c)")
+# created a fresh Agent / Dataset / TestRow whenever the whole
+# path was missing, so such graphs hold duplicates and the
+# constraints above cannot be created. Each statement keeps one
+# node per key, moves the duplicates' relationships onto it and
+# deletes them. Plain Cypher (no APOC): relationship types are
+# the ones index_dataset writes.
+def _dedupe_cypher(label: str, key: str, outgoing: List[str], incoming: List[str]) -> str:
+    moves = [
+        f"CALL {{ WITH keep, dup MATCH (dup)-[old:{rel}]->(other) "
+        f"MERGE (keep)-[new:{rel}]->(other) SET new += properties(old) }}"
+        for rel in outgoing
+    ] + [
+        f"CALL {{ WITH keep, dup MATCH (other)-[old:{rel}]->(dup) "
+        f"MERGE (other)-[new:{rel}]->(keep) SET new += properties(old) }}"
+        for rel in incoming
+    ]
+    return "\n".join([
+        f"MATCH (n:{label})",
+        f"WITH {key} AS key, collect(n) AS nodes",
+        "WHERE size(nodes) > 1",
+        "WITH head(nodes) AS keep, tail(nodes) AS dups",
+        "UNWIND dups AS dup",
+        *moves,
+        "DETACH DELETE dup",
+        "RETURN count(dup) AS removed",
+    ])
+
+
+# Datasets before TestRows: row duplicates then hang off one Dataset
+DEDUPE_CYPHER = [
+    ("Agent", _dedupe_cypher(
+        "Agent", "n.name",
+        ["OPERATES_IN", "HAS_CAPABILITY"], []
+    )),
+    ("Dataset", _dedupe_cypher(
+        "Dataset", "n.id",
+        ["TARGETS_DOMAIN", "HAS_INTENT", "TESTS_CAPABILITY", "HAS_ROW", "USES_TOOL"], []
+    )),
+    ("TestRow", _dedupe_cypher(
+        "TestRow", "[n.dataset_id, n.row_index]",
+        ["HAS_DIFFICULTY", "EXPECTS_TOOL"], ["HAS_ROW"]
+    )),
+]
+
+
+# --------------------------------------------------
+# Bulk indexing statements
+# --------------------------------------------------
+INDEX_CORE_CYPHER = """
+MERGE (a:Agent {name: $agent_type})
+MERGE (d:Dataset {id: $dataset_id})
+MERGE (dom:Domain {name: $domain})
+MERGE (i:Intent {name: $intent})
+
+MERGE (a)-[:OPERATES_IN]->(dom)
+MERGE (d)-[:TARGETS_DOMAIN]->(dom)
+MERGE (d)-[:HAS_INTENT]->(i)
+
+WITH a, d
+UNWIND $capabilities AS cap
+MERGE (c:Capability {name: cap})
+MERGE (a)-[:HAS_CAPABILITY]->(c)
+MERGE (d)-[:TESTS_CAPABILITY]->(c)
+"""
+
+INDEX_ROWS_CYPHER = """
+MATCH (d:Dataset {id: $dataset_id})
+UNWIND $rows AS row
+MERGE (r:TestRow {dataset_id: $dataset_id, row_index: row.index})
+MERGE (d)-[:HAS_ROW]->(r)
+
+MERGE (diff:Difficulty {level: row.difficulty})
+MERGE (r)-[:HAS_DIFFICULTY]->(diff)
+
+WITH r, row
+UNWIND row.tools AS tool
+MERGE (t:Tool {name: tool})
+MERGE (r)-[:EXPECTS_TOOL]->(t)
+"""
+
+# Per-dataset tool usage, so retrieval never walks TestRows
+INDEX_TOOLS_CYPHER = """
+MATCH (d:Dataset {id: $dataset_id})
+OPTIONAL MATCH (d)-[old:USES_TOOL]->(:Tool)
+DELETE old
+WITH DISTINCT d
+UNWIND $tool_counts AS tc
+MERGE (t:Tool {name: tc.name})
+MERGE (d)-[u:USES_TOOL]->(t)
+SET u.rows = tc.rows
+"""
+
+
+# --------------------------------------------------
+# Retrieval statement
+# --------------------------------------------------
+RETRIEVE_CYPHER = """
+MATCH (a:Agent {name: $agent_type})-[:HAS_CAPABILITY]->(c:Capability)
+      <-[:TESTS_CAPABILITY]-(d:Dataset)
+WHERE $domain IS NULL
+   OR EXISTS { MATCH (d)-[:TARGETS_DOMAIN]->(:Domain {name: $domain}) }
+WITH d, collect(DISTINCT c.name) AS capabilities
+OPTIONAL MATCH (d)-[u:USES_TOOL]->(t:Tool)
+WITH d, capabilities,
+     collect(CASE WHEN t IS NULL THEN NULL ELSE {name: t.name, rows: u.rows} END) AS tools,
+     sum(CASE WHEN t.name IN $tools THEN u.rows ELSE 0 END) AS tool_rows
+RETURN d.id AS dataset_id,
+       size(capabilities) AS capability_matches,
+       capabilities,
+       tool_rows,
+       tools
+ORDER BY capability_matches DESC, tool_rows DESC, dataset_id
+LIMIT $limit
+"""
+
+
+class _TTLCache:
+    """
+    Small in-process cache; entries expire after ttl seconds.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[0]:
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by every adapter in the process: a write through any
+# adapter invalidates what the others would serve
+_retrieval_cache = _TTLCache(RETRIEVAL_CACHE_TTL, RETRIEVAL_CACHE_MAX_ENTRIES)
 
 class GraphiteAdapter:
     """
@@ -17,7 +202,13 @@ class GraphiteAdapter:
     - Dataset → Row → Tool traceability
     """
 
-    def __init__(self):
+    def __init__(self, driver=None):
+        self._schema_ready = False
+
+        if driver is not None:
+            self.driver = driver
+            return
+
         uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
         user = os.getenv("NEO4J_USER", "neo4j")
         password = os.getenv("NEO4J_PASSWORD", "password")
@@ -27,6 +218,67 @@ class GraphiteAdapter:
             auth=(user, password)
         )
 
+    # --------------------------------------------------
+    # Schema bootstrap
+    # --------------------------------------------------
+    def ensure_schema(self) -> None:
+        """
+        Create constraints / indexes (once per adapter; the
+        statements are no-ops when they already exist).
+
+        If a constraint is rejected (duplicates from older
+        graphs), the duplicates are merged once and the schema
+        retried; if it still fails, indexing goes on without it
+        and a warning points at scripts.dedupe_graph.
+        """
+        if self._schema_ready:
+            return
+
+        with span("neo4j.ensure_schema"):
+            failed = self._create_schema(SCHEMA_CYPHER)
+            if failed:
+                print(f"⚠️ Graph schema rejected ({failed[0][1]}); merging duplicate nodes")
+                self.dedupe_graph()
+                failed = self._create_schema([statement for statement, _ in failed])
+            if failed:
+                print(
+                    f"⚠️ {len(failed)} graph schema statement(s) still rejected "
+                    f"({failed[0][1]}); indexing without them. "
+                    f"Clean up with: python -m scripts.dedupe_graph"
+                )
+
+        self._schema_ready = True
+
+    def _create_schema(self, statements: List[str]) -> List[Tuple[str, str]]:
+        """
+        Run each statement on its own; returns the (statement,
+        error) pairs Neo4j rejected.
+        """
+        failed = []
+        with self.driver.session() as session:
+            for statement in statements:
+                try:
+                    session.run(statement).consume()
+                except Neo4jError as e:
+                    failed.append((statement, e.message))
+        return failed
+
+    def dedupe_graph(self) -> Dict[str, int]:
+        """
+        Merge duplicate Agent / Dataset / TestRow nodes into one
+        per key. Returns the number removed per label.
+        """
+        removed = {}
+
+        with span("neo4j.dedupe_graph"):
+            with self.driver.session() as session:
+                for label, statement in DEDUPE_CYPHER:
+                    record = session.run(statement).single()
+                    removed[label] = record["removed"] if record else 0
+
+        _retrieval_cache.clear()
+        return removed
+
     # --------------------------------------------------
     # Dataset + Tool Indexing
     # --------------------------------------------------
@@ -37,80 +289,130 @@ class GraphiteAdapter:
         domain: str,
         intent: str,
         rows: List[Dict],
-        capabilities: List[str]
+        capabilities: List[str],
+        batch_size: int = ROW_BATCH_SIZE
     ) -> None:
         """
         Index a dataset with row-level semantic metadata.
+
+        Runs in ONE explicit write transaction:
+        - 1 statement for core nodes + capabilities
+        - 1 UNWIND statement per batch_size rows (rows + tools)
+        - 1 statement for per-dataset tool counts
+
+        The schema is bootstrapped first, and the retrieval
+        cache is cleared once the write commits.
         """
 
-        with self.driver.session() as session:
+        self.ensure_schema()
+
+        row_params = [
+            {
+                "index": idx,
+                "difficulty": row.get("difficulty", "unknown"),
+                "tools": row.get("expected_tools", []),
+            }
+            for idx, row in enumerate(rows)
+        ]
 
+        tool_counts = Counter(
+            tool
+            for row in row_params
+            for tool in set(row["tools"])
+        )
+
+        def work(tx):
             # -----------------------------
-            # Core nodes
+            # Core nodes + capabilities
             # -----------------------------
-            session.run(
-                """
-                MERGE (a:Agent {name: $agent_type})
-                MERGE (d:Dataset {id: $dataset_id})
-                MERGE (dom:Domain {name: $domain})
-                MERGE (i:Intent {name: $intent})
-
-                MERGE (a)-[:OPERATES_IN]->(dom)
-                MERGE (d)-[:TARGETS_DOMAIN]->(dom)
-                MERGE (d)-[:HAS_INTENT]->(i)
-                """,
+            tx.run(
+                INDEX_CORE_CYPHER,
                 agent_type=agent_type,
                 dataset_id=dataset_id,
                 domain=domain,
-                intent=intent
-            )
+                intent=intent,
+                capabilities=list(capabilities)
+            ).consume()
 
             # -----------------------------
-            # Capabilities
+            # Row-level indexing (batched)
             # -----------------------------
-            for cap in capabilities:
-                session.run(
-                    """
-                    MERGE (c:Capability {name: $cap})
-                    MERGE (a:Agent {name: $agent_type})-[:HAS_CAPABILITY]->(c)
-                    MERGE (d:Dataset {id: $dataset_id})-[:TESTS_CAPABILITY]->(c)
-                    """,
-                    cap=cap,
+            for start in range(0, len(row_params), batch_size):
+                tx.run(
+                    INDEX_ROWS_CYPHER,
+                    dataset_id=dataset_id,
+                    rows=row_params[start:start + batch_size]
+                ).consume()
+
+            tx.run(
+                INDEX_TOOLS_CYPHER,
+                dataset_id=dataset_id,
+                tool_counts=[
+                    {"name": name, "rows": count}
+                    for name, count in sorted(tool_counts.items())
+                ]
+            ).consume()
+
+        with span("neo4j.index_dataset", rows=len(rows)):
+            # Explicit (unmanaged) transaction: fail fast instead of
+            # the managed-transaction retry loop when Neo4j is down
+            with self.driver.session() as session:
+                with session.begin_transaction() as tx:
+                    work(tx)
+                    tx.commit()
+
+        _retrieval_cache.clear()
+
+    # --------------------------------------------------
+    # Retrieval (capability + tool ranked, cached)
+    # --------------------------------------------------
+    def retrieve_for_agent(
+        self,
+        agent_type: str,
+        domain: Optional[str] = None,
+        tools: Optional[List[str]] = None,
+        limit: int = 10,
+        use_cache: bool = True
+    ) -> List[Dict]:
+        """
+        Datasets that test the agent's capabilities, best first:
+        - most shared capabilities
+        - then most rows expecting any of `tools`
+
+        One Cypher statement per call; results are cached for
+        GRAPH_RETRIEVAL_CACHE_TTL seconds (cleared by index_dataset).
+        """
+
+        key = (id(self.driver), agent_type, domain, tuple(sorted(tools or [])), limit)
+
+        if use_cache:
+            cached = _retrieval_cache.get(key)
+            if cached is not None:
+                return [dict(r) for r in cached]
+
+        with span("neo4j.retrieve_for_agent", cached=False):
+            with self.driver.session() as session:
+                records = session.run(
+                    RETRIEVE_CYPHER,
                     agent_type=agent_type,
-                    dataset_id=dataset_id
-                )
+                    domain=domain,
+                    tools=list(tools or []),
+                    limit=limit
+                ).data()
 
-            # -----------------------------
-            # Row-level indexing
-            # -----------------------------
-            for idx, row in enumerate(rows):
-                difficulty = row.get("difficulty", "unknown")
-                expected_tools = row.get("expected_tools", [])
-
-                session.run(
-                    """
-                    MERGE (r:TestRow {dataset_id: $dataset_id, row_index: $index})
-                    MERGE (d:Dataset {id: $dataset_id})-[:HAS_ROW]->(r)
-
-                    MERGE (diff:Difficulty {level: $difficulty})
-                    MERGE (r)-[:HAS_DIFFICULTY]->(diff)
-                    """,
-                    dataset_id=dataset_id,
-                    index=idx,
-                    difficulty=difficulty
-                )
+        results = [
+            {
+                "dataset_id": r["dataset_id"],
+                "capability_matches": r["capability_matches"],
+                "capabilities": sorted(r["capabilities"]),
+                "tool_rows": r["tool_rows"],
+                "tools": {t["name"]: t["rows"] for t in r["tools"]},
+            }
+            for r in records
+        ]
 
-                for tool in expected_tools:
-                    session.run(
-                        """
-                        MERGE (t:Tool {name: $tool})
-                        MERGE (r:TestRow {dataset_id: $dataset_id, row_index: $index})
-                              -[:EXPECTS_TOOL]->(t)
-                        """,
-                        tool=tool,
-                        dataset_id=dataset_id,
-                        index=idx
-                    )
+        _retrieval_cache.set(key, results)
+        return [dict(r) for r in results]
 
     # --------------------------------------------------
     # Cleanup
@@ -123,5 +425,7 @@ class GraphiteAdapter:
         with self.driver.session() as session:
             session.run("MATCH (n) DETACH DELETE n")
 
+        _retrieval_cache.clear()
+
     def close(self):
         self.driver.close()
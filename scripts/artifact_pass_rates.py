@@ -0,0 +1,24 @@
+import argparse
+from pathlib import Path
+
+from evaluation.artifact_store import dataset_pass_rates
+from evaluation.evaluation_writer import ARTIFACT_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-dataset pass rates from evaluation artifacts")
+    parser.add_argument("directory", nargs="?", type=Path, default=ARTIFACT_DIR)
+    parser.add_argument("--agent-type", default=None)
+    args = parser.parse_args()
+
+    totals = dataset_pass_rates(args.directory, agent_type=args.agent_type)
+
+    print(f"{'dataset':<56} {'runs':>5} {'rows':>8} {'pass rate':>10} {'mean score':>11}")
+    for name, t in sorted(totals.items()):
+        pass_rate = "-" if t["pass_rate"] is None else f"{t['pass_rate']:.2%}"
+        mean_score = "-" if t["mean_score"] is None else f"{t['mean_score']:.3f}"
+        print(f"{name[:56]:<56} {t['runs']:>5} {t['rows']:>8} {pass_rate:>10} {mean_score:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import ast
+import re
+import sys
+from pathlib import Path
+
+from evaluation import artifact_store
+from evaluation.evaluation_writer import ARTIFACT_DIR
+
+
+# Both historical layouts ("EXPECTED :" and "EXPECTED OUTPUT :")
+FIELDS = {
+    "PROMPT": "prompt",
+    "EXPECTED": "expected_output",
+    "EXPECTED OUTPUT": "expected_output",
+    "ACTUAL": "actual_output",
+    "ACTUAL OUTPUT": "actual_output",
+    "EXPECTED TOOLS": "expected_tools",
+    "ACTUAL TOOLS": "actual_tools",
+    "TOOL EXPECTED": "tool_expected",
+    "TOOL CALLED": "tool_called",
+    "CORRECT TOOL CALLED": "correct_tool_called",
+    "PASSED": "passed",
+    "ROW PASSED": "passed",
+}
+
+LINE = re.compile(r"^([A-Z ]+?)\s*: (.*)$")
+ROW_START = re.compile(r"^\[(\d+)\]$")
+
+
+def _value(field: str, raw: str):
+    if field in ("expected_tools", "actual_tools"):
+        return ast.literal_eval(raw)
+    if field in ("tool_expected", "tool_called", "correct_tool_called", "passed"):
+        return raw == "True"
+    return raw
+
+
+def parse_text_artifact(path: Path):
+    header, rows = {}, []
+
+    for line in path.read_text().splitlines():
+        start = ROW_START.match(line)
+        if start:
+            rows.append({"row_index": int(start.group(1))})
+            continue
+
+        match = LINE.match(line)
+        if not match:
+            continue
+
+        key, raw = match.group(1).strip(), match.group(2)
+
+        if not rows:
+            if key == "DATASET NAME":
+                header["dataset_name"] = raw
+            elif key == "AGENT TYPE":
+                header["agent_type"] = raw
+            elif key == "SCORE":
+                header["score"] = raw
+        elif key in FIELDS:
+            rows[-1][FIELDS[key]] = _value(FIELDS[key], raw)
+        elif key == "FINAL SCORE":
+            header["score"] = raw
+
+    return header, rows
+
+
+def main(directory: Path = ARTIFACT_DIR):
+    converted = 0
+
+    for path in sorted(directory.glob("*.txt")):
+        target = path.with_name(path.stem + artifact_store.SUFFIX)
+        if target.exists():
+            continue
+
+        header, rows = parse_text_artifact(path)
+        try:
+            score = float(header.pop("score"))
+        except (KeyError, ValueError):
+            score = None
+
+        artifact_store.open_artifact(target, {**header, "converted_from": path.name}, rows)
+        artifact_store.close_artifact(target, {
+            "score": score,
+            "rows": len(rows),
+            "passed_rows": sum(bool(r.get("passed")) for r in rows),
+        })
+        converted += 1
+
+    print(f"Converted {converted} text artifact(s) in {directory}")
+
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else ARTIFACT_DIR)
@@ -0,0 +1,11 @@
+from retrieval.graphite_adapter import GraphiteAdapter
+
+def dedupe_graph():
+    g = GraphiteAdapter()
+    removed = g.dedupe_graph()
+    g.ensure_schema()
+    g.close()
+    print(f"Duplicate nodes removed: {removed}")
+
+if __name__ == "__main__":
+    dedupe_graph()
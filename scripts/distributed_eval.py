@@ -0,0 +1,56 @@
+import argparse
+
+from config.settings import EVAL_JOB_SLICE_SIZE
+from evaluation.distributed import coordinate, submit_evaluation, run_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a stored dataset on many worker nodes")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    c = sub.add_parser("coordinate", help="split a run into jobs, wait, score it")
+    c.add_argument("dataset")
+    c.add_argument("--agent", required=True, help="module:function, importable on every worker")
+    c.add_argument("--agent-type", required=True)
+    c.add_argument("--slice-size", type=int, default=EVAL_JOB_SLICE_SIZE)
+    c.add_argument("--run-id", type=int, default=None, help="re-attach to an existing run")
+    c.add_argument("--no-wait", action="store_true", help="only enqueue the jobs")
+    c.add_argument("--timeout", type=float, default=None)
+
+    w = sub.add_parser("worker", help="claim and evaluate jobs")
+    w.add_argument("--name", default=None)
+    w.add_argument("--workers", type=int, default=1, help="in-process agent concurrency")
+    w.add_argument("--row-timeout", type=float, default=None)
+    w.add_argument("--exit-when-idle", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        done = run_worker(
+            worker=args.name,
+            max_concurrency=args.workers,
+            row_timeout=args.row_timeout,
+            exit_when_idle=args.exit_when_idle
+        )
+        print(f"Completed {done} job(s)")
+        return
+
+    if args.no_wait:
+        run_id = submit_evaluation(args.dataset, args.agent, args.agent_type, args.slice_size)
+        print(f"Enqueued run_id={run_id}")
+        return
+
+    summary = coordinate(
+        args.dataset,
+        args.agent,
+        args.agent_type,
+        slice_size=args.slice_size,
+        run_id=args.run_id,
+        timeout=args.timeout
+    )
+
+    print(f"Deploy: {summary['passed']} (failed rows: {summary['failed_rows']})")
+
+
+if __name__ == "__main__":
+    main()
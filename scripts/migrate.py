@@ -0,0 +1,187 @@
+# --------------------------------------------------
+# Versioned schema migrations
+# --------------------------------------------------
+#
+# python -m scripts.migrate            apply pending migrations
+# python -m scripts.migrate --status   list applied / pending
+#
+# Each migration runs in its own transaction together with its
+# schema_migrations row, under an advisory lock, so concurrent
+# runners and half-applied versions are impossible. Append new
+# migrations to MIGRATIONS; never renumber or edit applied ones.
+
+import argparse
+
+from memory.supabase_client import get_connection, connection
+from memory.rollup_repository import refresh_rollups
+
+from scripts import (
+    init_evaluation_tables,
+    migrate_add_tool_columns,
+    migrate_add_response_passed,
+    migrate_add_run_timings,
+    migrate_add_rollups,
+    migrate_add_lookup_indexes,
+    migrate_add_evaluation_jobs,
+    migrate_add_run_agent_name,
+    migrate_add_run_fingerprint,
+)
+
+
+MIGRATIONS_LOCK_ID = 7262716
+
+SCHEMA_MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMP DEFAULT NOW()
+);
+"""
+
+DATASETS_DDL = """
+CREATE TABLE IF NOT EXISTS datasets (
+    id TEXT PRIMARY KEY,
+    payload JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+"""
+
+
+def _backfill_rollups(cur):
+    cur.execute(migrate_add_rollups.DDL)
+    cur.execute("SELECT id FROM evaluation_runs WHERE score IS NOT NULL")
+    refresh_rollups(cur, [r[0] for r in cur.fetchall()])
+
+
+# (version, name, SQL string or callable(cursor))
+MIGRATIONS = [
+    (1, "datasets table", DATASETS_DDL),
+    (2, "evaluation tables", init_evaluation_tables.DDL),
+    (3, "evaluation_rows tool columns", migrate_add_tool_columns.DDL),
+    (4, "response_passed + resume key", migrate_add_response_passed.DDL),
+    (5, "evaluation_runs timings", migrate_add_run_timings.DDL),
+    (6, "score-trend rollups", _backfill_rollups),
+    (7, "lookup indexes", migrate_add_lookup_indexes.DDL),
+    (8, "evaluation job queue", migrate_add_evaluation_jobs.DDL),
+    (9, "evaluation_runs agent_name", migrate_add_run_agent_name.DDL),
+    (10, "evaluation_runs agent_fingerprint", migrate_add_run_fingerprint.DDL),
+]
+
+
+def applied_versions(cur) -> set:
+    cur.execute(SCHEMA_MIGRATIONS_DDL)
+    cur.execute("SELECT version FROM schema_migrations")
+    return {r[0] for r in cur.fetchall()}
+
+
+def migrate(target: int = None, verbose: bool = True) -> list:
+    """
+    Apply pending migrations up to target (all by default).
+    Returns the versions applied.
+    """
+    conn = get_connection()
+    applied = []
+
+    try:
+        for version, name, step in MIGRATIONS:
+            if target is not None and version > target:
+                break
+
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATIONS_LOCK_ID,))
+
+                if version in applied_versions(cur):
+                    conn.commit()
+                    continue
+
+                if verbose:
+                    print(f"Applying migration {version}: {name}...")
+
+                if callable(step):
+                    step(cur)
+                else:
+                    cur.execute(step)
+
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+
+            conn.commit()
+            applied.append(version)
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+    return applied
+
+
+class SchemaOutOfDate(RuntimeError):
+    """
+    The database is missing migrations the code depends on.
+    """
+
+
+def pending_migrations() -> list:
+    """
+    (version, name) of every migration not applied yet.
+    Read-only: does not create schema_migrations.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+        if cur.fetchone()[0]:
+            cur.execute("SELECT version FROM schema_migrations")
+            done = {r[0] for r in cur.fetchall()}
+        else:
+            done = set()
+
+    return [(version, name) for version, name, _ in MIGRATIONS if version not in done]
+
+
+def check_schema() -> None:
+    """
+    Fail fast (before any work) when the schema is behind
+    MIGRATIONS, instead of a bare psycopg2 error mid-run.
+    """
+    pending = pending_migrations()
+    if pending:
+        listing = ", ".join(f"{version} ({name})" for version, name in pending)
+        raise SchemaOutOfDate(
+            f"Database schema is out of date; pending migration(s): {listing}.\n"
+            f"Run: python -m scripts.migrate"
+        )
+
+
+def status() -> list:
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            done = applied_versions(cur)
+        conn.commit()
+    finally:
+        conn.close()
+
+    return [(version, name, version in done) for version, name, _ in MIGRATIONS]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--status", action="store_true", help="list migrations and exit")
+    parser.add_argument("--target", type=int, default=None, help="migrate up to this version")
+    args = parser.parse_args()
+
+    if args.status:
+        for version, name, done in status():
+            print(f"{version:>4}  {'applied' if done else 'pending':<8} {name}")
+        return
+
+    applied = migrate(args.target)
+    print(f"Schema up to date ({len(applied)} migration(s) applied)")
+
+
+if __name__ == "__main__":
+    main()
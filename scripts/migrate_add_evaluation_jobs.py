@@ -0,0 +1,42 @@
+from memory.supabase_client import get_connection
+
+DDL = """
+CREATE TABLE IF NOT EXISTS evaluation_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    run_id BIGINT REFERENCES evaluation_runs(id) ON DELETE CASCADE,
+    dataset_name TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    row_start INT NOT NULL,
+    row_end INT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    worker TEXT,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    heartbeat_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS evaluation_jobs_claimable
+ON evaluation_jobs (id)
+WHERE status IN ('pending', 'running');
+
+CREATE INDEX IF NOT EXISTS evaluation_jobs_run_id
+ON evaluation_jobs (run_id);
+"""
+
+def main():
+    conn = get_connection()
+    cur = conn.cursor()
+
+    print("Creating evaluation_jobs queue table...")
+    cur.execute(DDL)
+
+    conn.commit()
+    cur.close()
+    conn.close()
+
+    print("Migration completed successfully")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+from memory.supabase_client import get_connection
+
+DDL = """
+ALTER TABLE datasets
+ADD COLUMN IF NOT EXISTS agent_type TEXT
+GENERATED ALWAYS AS (payload->>'agent_type') STORED;
+
+CREATE INDEX IF NOT EXISTS datasets_agent_type_created_at
+ON datasets (agent_type, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS datasets_created_at
+ON datasets (created_at);
+
+CREATE INDEX IF NOT EXISTS evaluation_runs_agent_type_created_at
+ON evaluation_runs (agent_type, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS evaluation_runs_dataset_agent_created_at
+ON evaluation_runs (dataset_name, agent_type, created_at DESC);
+"""
+
+def main():
+    conn = get_connection()
+    cur = conn.cursor()
+
+    print("Running datasets / evaluation_runs lookup-index migration...")
+    cur.execute(DDL)
+
+    conn.commit()
+    cur.close()
+    conn.close()
+
+    print("Migration completed successfully")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from memory.supabase_client import get_connection
+
+DDL = """
+ALTER TABLE evaluation_rows
+ADD COLUMN IF NOT EXISTS response_passed BOOLEAN;
+
+CREATE UNIQUE INDEX IF NOT EXISTS evaluation_rows_run_id_row_index
+ON evaluation_rows (run_id, row_index);
+"""
+
+def main():
+    conn = get_connection()
+    cur = conn.cursor()
+
+    print("Running evaluation_rows response_passed / resume-key migration...")
+    cur.execute(DDL)
+
+    conn.commit()
+    cur.close()
+    conn.close()
+
+    print("Migration completed successfully")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from memory.supabase_client import get_connection
+from memory.rollup_repository import refresh_rollups
+
+DDL = """
+ALTER TABLE evaluation_rows
+ADD COLUMN IF NOT EXISTS difficulty TEXT;
+
+CREATE TABLE IF NOT EXISTS evaluation_run_rollups (
+    run_id BIGINT PRIMARY KEY REFERENCES evaluation_runs(id) ON DELETE CASCADE,
+    dataset_name TEXT,
+    agent_type TEXT,
+    created_at TIMESTAMP,
+    score FLOAT,
+    passed BOOLEAN,
+    total_rows INT,
+    passed_rows INT,
+    tool_passed_rows INT,
+    response_passed_rows INT
+);
+
+CREATE INDEX IF NOT EXISTS evaluation_run_rollups_agent_type_created_at
+ON evaluation_run_rollups (agent_type, created_at DESC, run_id DESC);
+
+CREATE TABLE IF NOT EXISTS evaluation_difficulty_rollups (
+    run_id BIGINT REFERENCES evaluation_runs(id) ON DELETE CASCADE,
+    difficulty TEXT,
+    total_rows INT,
+    passed_rows INT,
+    PRIMARY KEY (run_id, difficulty)
+);
+
+CREATE TABLE IF NOT EXISTS evaluation_tool_rollups (
+    run_id BIGINT REFERENCES evaluation_runs(id) ON DELETE CASCADE,
+    tool TEXT,
+    expected_rows INT,
+    called_rows INT,
+    correct_rows INT,
+    PRIMARY KEY (run_id, tool)
+);
+"""
+
+def main():
+    conn = get_connection()
+    cur = conn.cursor()
+
+    print("Creating score-trend rollup tables...")
+    cur.execute(DDL)
+
+    # Backfill every finished run (one set-based pass)
+    cur.execute("SELECT id FROM evaluation_runs WHERE score IS NOT NULL")
+    run_ids = [r[0] for r in cur.fetchall()]
+    refresh_rollups(cur, run_ids)
+
+    conn.commit()
+    cur.close()
+    conn.close()
+
+    print(f"Migration completed successfully ({len(run_ids)} run(s) rolled up)")
+
+if __name__ == "__main__":
+    main()
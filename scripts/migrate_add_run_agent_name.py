@@ -0,0 +1,28 @@
+from memory.supabase_client import get_connection
+
+DDL = """
+ALTER TABLE evaluation_runs
+ADD COLUMN IF NOT EXISTS agent_name TEXT;
+
+ALTER TABLE evaluation_run_rollups
+ADD COLUMN IF NOT EXISTS agent_name TEXT;
+
+CREATE INDEX IF NOT EXISTS evaluation_run_rollups_agent_name_created_at
+ON evaluation_run_rollups (agent_type, agent_name, created_at DESC, run_id DESC);
+"""
+
+def main():
+    conn = get_connection()
+    cur = conn.cursor()
+
+    print("Running evaluation_runs agent_name migration...")
+    cur.execute(DDL)
+
+    conn.commit()
+    cur.close()
+    conn.close()
+
+    print("Migration completed successfully")
+
+if __name__ == "__main__":
+    main()
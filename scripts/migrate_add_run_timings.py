@@ -0,0 +1,22 @@
+from memory.supabase_client import get_connection
+
+DDL = """
+ALTER TABLE evaluation_runs
+ADD COLUMN IF NOT EXISTS timings JSONB;
+"""
+
+def main():
+    conn = get_connection()
+    cur = conn.cursor()
+
+    print("Running evaluation_runs timings migration...")
+    cur.execute(DDL)
+
+    conn.commit()
+    cur.close()
+    conn.close()
+
+    print("Migration completed successfully")
+
+if __name__ == "__main__":
+    main()
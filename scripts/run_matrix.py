@@ -0,0 +1,59 @@
+import argparse
+import importlib
+
+from evaluation.matrix import run_matrix
+from memory.dataset_memory_fetcher import fetch_dataset_summaries
+
+
+def _load_agent(spec: str):
+    """
+    "name=package.module:function" (name defaults to the function name)
+    """
+    name, _, target = spec.rpartition("=")
+    module_name, _, attr = target.partition(":")
+    agent_fn = getattr(importlib.import_module(module_name), attr or "run_agent")
+    return name or attr or module_name, agent_fn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate many agents on many stored datasets")
+    parser.add_argument("--agent", action="append", required=True,
+                        help="name=module:function, repeatable")
+    parser.add_argument("--dataset", action="append", default=[],
+                        help="stored dataset id, repeatable")
+    parser.add_argument("--latest", type=int, default=0,
+                        help="also use the N latest datasets of --agent-type")
+    parser.add_argument("--agent-type", default=None)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--row-timeout", type=float, default=None)
+    parser.add_argument("--no-persist", action="store_true")
+    args = parser.parse_args()
+
+    agents = dict(_load_agent(spec) for spec in args.agent)
+
+    dataset_ids = list(args.dataset)
+    if args.latest:
+        if not args.agent_type:
+            parser.error("--latest needs --agent-type")
+        dataset_ids += [
+            d["dataset_id"]
+            for d in fetch_dataset_summaries(args.agent_type, limit=args.latest)
+        ]
+
+    if not dataset_ids:
+        parser.error("no datasets selected (--dataset / --latest)")
+
+    cells = run_matrix(
+        agents,
+        dataset_ids,
+        max_concurrency=args.workers,
+        row_timeout=args.row_timeout,
+        persist=not args.no_persist
+    )
+
+    if not args.no_persist:
+        print(f"\nSaved {len(cells)} run(s): {[c['run_id'] for c in cells]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+
+from memory.rollup_repository import (
+    fetch_score_trend,
+    fetch_difficulty_trend,
+    fetch_tool_trend,
+)
+
+
+def _pct(rate) -> str:
+    return "-" if rate is None else f"{rate:.1%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score / pass-rate trend of an agent type")
+    parser.add_argument("agent_type")
+    parser.add_argument("--last", type=int, default=20, help="number of recent runs")
+    parser.add_argument("--dataset", default=None, help="restrict to one dataset_name")
+    parser.add_argument("--agent-name", default=None, help="restrict to one agent (e.g. a matrix agent)")
+    parser.add_argument("--by", choices=["run", "difficulty", "tool"], default="run")
+    args = parser.parse_args()
+
+    if args.by == "run":
+        print(f"{'run':>7} {'created_at':<20} {'score':>6} {'deploy':>6} {'rows':>7} {'row pass':>9}")
+        for r in fetch_score_trend(args.agent_type, args.last, args.dataset, args.agent_name):
+            print(
+                f"{r['run_id']:>7} {r['created_at']:%Y-%m-%d %H:%M:%S} "
+                f"{r['score']:>6.3f} {str(r['passed']):>6} {r['total_rows']:>7} "
+                f"{_pct(r['row_pass_rate']):>9}"
+            )
+
+    elif args.by == "difficulty":
+        print(f"{'run':>7} {'difficulty':<10} {'rows':>7} {'pass rate':>9}")
+        for r in fetch_difficulty_trend(args.agent_type, args.last, args.dataset, args.agent_name):
+            print(f"{r['run_id']:>7} {r['difficulty']:<10} {r['total_rows']:>7} {_pct(r['pass_rate']):>9}")
+
+    else:
+        print(f"{'run':>7} {'tool':<16} {'expected':>8} {'called':>7} {'recall':>7}")
+        for r in fetch_tool_trend(args.agent_type, args.last, args.dataset, args.agent_name):
+            print(
+                f"{r['run_id']:>7} {r['tool']:<16} {r['expected_rows']:>8} "
+                f"{r['called_rows']:>7} {_pct(r['recall']):>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
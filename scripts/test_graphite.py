@@ -9,8 +9,14 @@ g.index_dataset(
     agent_type="mathematical",
     domain="math",
     intent="problem_solving",
-    difficulties=["easy", "medium", "hard"],
+    rows=[
+        {"difficulty": "easy", "expected_tools": []},
+        {"difficulty": "medium", "expected_tools": ["calculator"]},
+        {"difficulty": "hard", "expected_tools": ["calculator"]},
+    ],
     capabilities=["arithmetic", "algebra", "geometry"]
 )
 
-print(g.retrieve_for_agent("mathematical", "math"))
+print(g.retrieve_for_agent("mathematical", "math", tools=["calculator"]))
+
+g.close()
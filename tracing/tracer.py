@@ -0,0 +1,231 @@
+# --------------------------------------------------
+# Lightweight Tracing (nested spans, JSONL / Chrome export)
+# --------------------------------------------------
+
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+
+# --------------------------------------------------
+# Span
+# --------------------------------------------------
+class Span:
+    __slots__ = (
+        "name", "span_id", "parent_id", "attrs",
+        "thread_id", "start_ns", "end_ns", "_token", "_tracer"
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(tracer._ids)
+        self.parent_id = None
+        self.thread_id = None
+        self.start_ns = 0
+        self.end_ns = 0
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self.parent_id = _current_span.get()
+        self._token = _current_span.set(self.span_id)
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.perf_counter_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self._tracer._finish(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class _NullSpan:
+    """
+    Returned while tracing is disabled: no allocation, no timing.
+    """
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+# Parent tracking that works across threads AND asyncio tasks
+_current_span: contextvars.ContextVar = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+# --------------------------------------------------
+# Tracer
+# --------------------------------------------------
+class Tracer:
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per span name: count, total_ms, max_ms.
+        """
+        out: Dict[str, Dict[str, float]] = {}
+
+        with self._lock:
+            spans = list(self.spans)
+
+        for span in spans:
+            entry = out.setdefault(
+                span.name,
+                {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            entry["count"] += 1
+            entry["total_ms"] += span.duration_ms
+            entry["max_ms"] = max(entry["max_ms"], span.duration_ms)
+
+        for entry in out.values():
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+
+        return out
+
+    # --------------------------------------------------
+    # Export
+    # --------------------------------------------------
+    def _relative_us(self, ns: int) -> float:
+        return (ns - self._origin_ns) / 1000
+
+    def export_jsonl(self, path: str) -> str:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for span in spans:
+                f.write(json.dumps({
+                    "name": span.name,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "thread_id": span.thread_id,
+                    "start_us": round(self._relative_us(span.start_ns), 3),
+                    "duration_ms": round(span.duration_ms, 3),
+                    "attrs": span.attrs,
+                }, default=str) + "\n")
+
+        return path
+
+    def export_chrome(self, path: str) -> str:
+        """
+        chrome://tracing / Perfetto "complete" events.
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": round(self._relative_us(span.start_ns), 3),
+                "dur": round((span.end_ns - span.start_ns) / 1000, 3),
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": span.attrs,
+            }
+            for span in spans
+        ]
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(
+                {"traceEvents": events, "displayTimeUnit": "ms"},
+                f,
+                default=str
+            )
+
+        return path
+
+    def export(self, path: str) -> str:
+        """
+        .jsonl → JSON lines, anything else → Chrome trace.
+        """
+        if str(path).endswith(".jsonl"):
+            return self.export_jsonl(path)
+        return self.export_chrome(path)
+
+
+# --------------------------------------------------
+# Module-level API (tracing is OFF unless enabled)
+# --------------------------------------------------
+_tracer: Optional[Tracer] = None
+
+
+def enable() -> Tracer:
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> None:
+    global _tracer
+    _tracer = None
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, **attrs):
+    """
+    with span("llm.generate", model=...):
+        ...
+
+    Near zero-cost when tracing is disabled.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return Span(tracer, name, attrs)
+
+
+def traced(name: str):
+    """
+    Decorator form of span() for whole functions.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return fn(*args, **kwargs)
+            with Span(_tracer, name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate